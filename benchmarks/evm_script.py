@@ -0,0 +1,75 @@
+import timeit
+
+from utils.evm_script import create_executor_id, strip_byte_prefix, encode_call_script, decode_call_script
+
+
+ACTIONS_COUNTS = [1, 10, 100, 1_000, 10_000]
+
+# a transfer-sized action: selector plus four 32-byte arguments
+TARGET = '0xB9E5CBB9CA5b0d659238807E84D0176930753d86'
+CALLDATA = '0xf6364846' + 'ab' * 32 * 4
+
+
+# the encoder as it was before switching to a preallocated buffer
+def legacy_encode_call_script(actions, spec_id = 1):
+    import eth_abi
+    from web3 import Web3
+    from eth_typing.evm import HexAddress
+
+    result = create_executor_id(spec_id)
+    for to, calldata in actions:
+        addr_bytes = Web3.toBytes(hexstr=HexAddress(to)).hex()
+        calldata_bytes = strip_byte_prefix(calldata)
+        length = eth_abi.encode_single('int256', len(calldata_bytes) // 2).hex()
+        result += addr_bytes + length[56:] + calldata_bytes
+    return result
+
+
+def has_legacy_dependencies():
+    try:
+        import eth_abi
+        import web3
+        return True
+    except ImportError:
+        return False
+
+
+def measure(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def format_time(seconds):
+    return '-' if seconds is None else f'{seconds * 1e6:.1f}us'
+
+
+def main():
+    with_legacy = has_legacy_dependencies()
+    if not with_legacy:
+        print('eth_abi and web3 are not installed, skipping the legacy encoder')
+
+    print(f'{"actions":>8} {"legacy encode":>15} {"encode":>12} {"decode":>12}')
+
+    for actions_count in ACTIONS_COUNTS:
+        actions = [(TARGET, CALLDATA)] * actions_count
+        script = encode_call_script(actions)
+
+        assert decode_call_script(script) == [(TARGET.lower(), CALLDATA)] * actions_count
+
+        number = max(1, 10_000 // actions_count)
+        legacy_time = None
+
+        if with_legacy:
+            assert legacy_encode_call_script(actions) == script
+            legacy_time = measure(lambda: legacy_encode_call_script(actions), number)
+
+        encode_time = measure(lambda: encode_call_script(actions), number)
+        decode_time = measure(lambda: decode_call_script(script), number)
+
+        print(
+            f'{actions_count:>8} {format_time(legacy_time):>15} {format_time(encode_time):>12} '
+            f'{format_time(decode_time):>12}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,393 @@
+import json
+import os
+import statistics
+import time
+
+from brownie import chain, accounts, interface, PurchaseExecutor, PurchaseExecutorOptimized
+
+from scripts.deploy import deploy, encode_vesting_manager_evm_script
+from utils.mainnet_fork import chain_snapshot, nested_chain_snapshot, LDO_HOLDERS
+from utils.vote_simulator import replay_call_script
+
+from utils.config import ldo_token_address, lido_dao_voting_address, get_is_live
+from utils.rpc_profiler import install, install_from_env
+
+from purchase_config import ETH_TO_LDO_RATE_PRECISION
+
+
+# the allocations of the purchase tests
+TEST_LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365
+OFFER_EXPIRATION_DELAY = 2629746
+
+MAX_PURCHASERS = 50
+DEFAULT_PURCHASERS_COUNT = 48
+DEFAULT_REPORT_PATH = 'benchmark_purchase.json'
+
+DIRECT_TRANSFER_GAS_LIMIT = 400_000
+REFUND_AMOUNT = 10**17
+# the LDO balance that warm purchasers hold before the purchase
+WARM_LDO_BALANCE = 10**18
+
+EXECUTOR_CONTRACTS = {
+    'PurchaseExecutor': PurchaseExecutor,
+    'PurchaseExecutorOptimized': PurchaseExecutorOptimized
+}
+
+# the gas saved by the optimized executor is reported when both are benchmarked
+BASELINE_CONTRACT = 'PurchaseExecutor'
+OPTIMIZED_CONTRACT = 'PurchaseExecutorOptimized'
+
+ENTRY_POINTS = ['execute_purchase', 'execute_purchase_for_another', 'default']
+
+# the batch purchase is compared with separate purchases paid by the same funder
+BATCH_BASELINE_SCENARIO = 'execute_purchase_for_another/cold'
+DEFAULT_BATCH_SIZES = [1, 2, 5, 10, 25, 50]
+
+# (entry point, with refund, warm purchaser)
+SCENARIOS = [
+    (entry_point, refund, warm)
+    for entry_point in ENTRY_POINTS
+    for refund in (False, True)
+    for warm in (False, True)
+]
+
+
+def main():
+    install_from_env()
+
+    if get_is_live():
+        print('Running on a live network, cannot benchmark. Please run on a mainnet fork.')
+        return
+
+    purchasers_count = int(os.environ.get('BENCHMARK_PURCHASERS', DEFAULT_PURCHASERS_COUNT))
+    assert 0 < purchasers_count <= MAX_PURCHASERS, f'BENCHMARK_PURCHASERS must be between 1 and {MAX_PURCHASERS}'
+
+    contract_names = os.environ.get('BENCHMARK_CONTRACTS', ','.join(EXECUTOR_CONTRACTS)).split(',')
+    batch_sizes = get_batch_sizes(purchasers_count)
+    report_path = os.environ.get('BENCHMARK_REPORT', DEFAULT_REPORT_PATH)
+
+    report = {
+        'fork_block': chain.height,
+        'purchasers_count': purchasers_count,
+        'contracts': {}
+    }
+
+    for contract_name in contract_names:
+        print(f'Benchmarking {contract_name} with {purchasers_count} purchasers')
+        executor_contract = EXECUTOR_CONTRACTS[contract_name]
+        with chain_snapshot():
+            report['contracts'][contract_name] = run_benchmark(executor_contract, purchasers_count)
+        with chain_snapshot():
+            report['contracts'][contract_name]['test_scenarios'] = run_test_scenarios(executor_contract)
+        if 'execute_purchases' in executor_contract.signatures:
+            print(f'Benchmarking batch purchases of {contract_name} for {", ".join(map(str, batch_sizes))} receivers')
+            with chain_snapshot():
+                report['contracts'][contract_name]['batch'] = run_batch_benchmark(executor_contract, purchasers_count, batch_sizes)
+
+    report['saved_gas'] = get_saved_gas(report['contracts'])
+
+    print_report(report)
+
+    with open(report_path, 'w') as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+        report_file.write('\n')
+
+    print(f'Report written to {report_path}')
+
+
+def get_batch_sizes(purchasers_count):
+    if 'BENCHMARK_BATCH_SIZES' in os.environ:
+        batch_sizes = [ int(size) for size in os.environ['BENCHMARK_BATCH_SIZES'].split(',') ]
+    else:
+        batch_sizes = DEFAULT_BATCH_SIZES
+    return sorted(set(min(size, purchasers_count) for size in batch_sizes if size > 0))
+
+
+def get_scenario_name(scenario):
+    (entry_point, refund, warm) = scenario
+    return f'{entry_point}{"+refund" if refund else ""}/{"warm" if warm else "cold"}'
+
+
+def get_eth_cost(ldo_allocation):
+    return ldo_allocation * ETH_TO_LDO_RATE_PRECISION // ETH_TO_LDO_RATE
+
+
+def run_benchmark(executor_contract, purchasers_count):
+    purchasers = [ accounts.add() for _ in range(purchasers_count) ]
+    # distinct allocations so that no two purchases are exactly the same
+    allocations = [ (100 + i) * 10**18 for i in range(purchasers_count) ]
+    scenarios = [ SCENARIOS[i % len(SCENARIOS)] for i in range(purchasers_count) ]
+
+    executor = deploy_funded_executor(executor_contract, list(zip(purchasers, allocations)))
+    prepare_purchasers(purchasers, allocations, scenarios)
+
+    start_tx = executor.start({'from': accounts[0], 'silent': True})
+
+    # the requests are counted by the RPC profiler, which is installed even without RPC_PROFILE=1
+    profiler = install()
+    transactions = []
+
+    for (purchaser, allocation, scenario) in zip(purchasers, allocations, scenarios):
+        requests_count_before = profiler.requests_count
+        started_at = time.perf_counter()
+        tx = execute_purchase(executor, purchaser, allocation, scenario)
+        wall_time = time.perf_counter() - started_at
+
+        assert tx.status == 1, f'purchase failed for {purchaser}'
+
+        transactions.append({
+            'scenario': get_scenario_name(scenario),
+            'gas_used': tx.gas_used,
+            'wall_time': wall_time,
+            'rpc_requests': profiler.requests_count - requests_count_before
+        })
+
+    assert executor.balance() == 0
+
+    return {
+        'deploy_gas': executor.tx.gas_used,
+        'start_gas': start_tx.gas_used,
+        'scenarios': summarize(transactions),
+        'transactions': transactions
+    }
+
+
+def run_batch_benchmark(executor_contract, purchasers_count, batch_sizes):
+    purchasers = [ accounts.add() for _ in range(purchasers_count) ]
+    allocations = [ (100 + i) * 10**18 for i in range(purchasers_count) ]
+
+    executor = deploy_funded_executor(executor_contract, list(zip(purchasers, allocations)))
+    executor.start({'from': accounts[0], 'silent': True})
+
+    funder = accounts[1]
+    eth_banker = accounts.at('0xBE0eB53F46cd790Cd13851d5EFf43D12404d33E8', force=True)
+    eth_banker.transfer(to=funder, amount=sum(get_eth_cost(a) for a in allocations) + 10**18, silent=True)
+
+    gas_used = {}
+
+    for batch_size in batch_sizes:
+        # each batch starts from the same state: all purchasers cold, nothing purchased
+        with nested_chain_snapshot():
+            value = sum(get_eth_cost(a) for a in allocations[:batch_size])
+            tx = executor.execute_purchases(purchasers[:batch_size], {'from': funder, 'value': value, 'silent': True})
+            assert tx.status == 1, f'batch purchase of {batch_size} failed'
+            gas_used[batch_size] = tx.gas_used
+
+    largest = batch_sizes[-1]
+    gas_per_extra_receiver = (gas_used[largest] - gas_used[1]) / (largest - 1) if largest > 1 and 1 in gas_used else None
+
+    return {
+        'gas_used': { str(size): gas for (size, gas) in gas_used.items() },
+        'gas_per_extra_receiver': gas_per_extra_receiver
+    }
+
+
+def run_test_scenarios(executor_contract):
+    # the scenarios of the purchase tests, each measured from the same deployed and funded executor
+    executor = deploy_funded_executor(executor_contract, [ (accounts[i], a) for (i, a) in enumerate(TEST_LDO_ALLOCATIONS) ])
+
+    eth_banker = accounts.at('0xBE0eB53F46cd790Cd13851d5EFf43D12404d33E8', force=True)
+    for account in [accounts[0], accounts[5]]:
+        eth_banker.transfer(to=account, amount=get_eth_cost(TEST_LDO_ALLOCATIONS[1]) + REFUND_AMOUNT + 10**18, silent=True)
+
+    gas_used = {}
+    for (name, scenario) in TEST_SCENARIOS:
+        with nested_chain_snapshot():
+            tx = scenario(executor)
+            assert tx.status == 1, f'{name} failed'
+            gas_used[name] = tx.gas_used
+    return gas_used
+
+
+def start(executor):
+    return executor.start({'from': accounts[5], 'silent': True})
+
+
+def purchase_starting_offer(executor):
+    eth_cost = get_eth_cost(TEST_LDO_ALLOCATIONS[0])
+    return executor.execute_purchase(accounts[0], {'from': accounts[0], 'value': eth_cost, 'silent': True})
+
+
+def purchase_via_execute_purchase(executor):
+    start(executor)
+    return purchase_starting_offer(executor)
+
+
+def purchase_via_transfer(executor):
+    start(executor)
+    eth_cost = get_eth_cost(TEST_LDO_ALLOCATIONS[0])
+    return accounts[0].transfer(to=executor, amount=eth_cost, gas_limit=DIRECT_TRANSFER_GAS_LIMIT, silent=True)
+
+
+def purchase_with_refund(executor):
+    start(executor)
+    eth_cost = get_eth_cost(TEST_LDO_ALLOCATIONS[0])
+    return executor.execute_purchase(accounts[0], {'from': accounts[0], 'value': eth_cost + REFUND_AMOUNT, 'silent': True})
+
+
+def purchase_for_another_address(executor):
+    start(executor)
+    eth_cost = get_eth_cost(TEST_LDO_ALLOCATIONS[1])
+    return executor.execute_purchase(accounts[1], {'from': accounts[5], 'value': eth_cost, 'silent': True})
+
+
+def recover_unsold_tokens(executor):
+    purchase_via_execute_purchase(executor)
+    chain.sleep(OFFER_EXPIRATION_DELAY + 1)
+    chain.mine()
+    return executor.recover_unsold_tokens({'from': accounts[5], 'silent': True})
+
+
+TEST_SCENARIOS = [
+    ('start', start),
+    ('execute_purchase starting the offer', purchase_starting_offer),
+    ('execute_purchase', purchase_via_execute_purchase),
+    ('purchase via transfer', purchase_via_transfer),
+    ('execute_purchase with refund', purchase_with_refund),
+    ('execute_purchase for another address', purchase_for_another_address),
+    ('recover_unsold_tokens', recover_unsold_tokens)
+]
+
+
+def deploy_funded_executor(executor_contract, ldo_purchasers):
+    allocations_total = sum(p[1] for p in ldo_purchasers)
+    executor = deploy(
+        tx_params={'from': accounts[0], 'silent': True},
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=ldo_purchasers,
+        allocations_total=allocations_total,
+        executor_contract=executor_contract
+    )
+
+    # executing the vote script from the Voting app has the same effect as passing the vote
+    evm_script = encode_vesting_manager_evm_script(
+        manager_address=executor.address,
+        total_ldo_amount=allocations_total,
+        ldo_transfer_reference='Transfer LDO tokens to be sold for ETH'
+    )
+    results = replay_call_script(evm_script, lido_dao_voting_address)
+    assert all(result.success for result in results), 'funding the executor failed'
+
+    return executor
+
+
+def prepare_purchasers(purchasers, allocations, scenarios):
+    eth_banker = accounts.at('0xBE0eB53F46cd790Cd13851d5EFf43D12404d33E8', force=True)
+    ldo_token = interface.ERC20(ldo_token_address)
+    ldo_holder = accounts.at(LDO_HOLDERS[1], force=True)
+    eth_banker.transfer(to=ldo_holder, amount=10**18, silent=True)
+
+    for (purchaser, allocation, (entry_point, refund, warm)) in zip(purchasers, allocations, scenarios):
+        # a bit more than needed to cover the gas of the purchase
+        eth_banker.transfer(to=purchaser, amount=get_eth_cost(allocation) + REFUND_AMOUNT + 10**18, silent=True)
+        if warm:
+            ldo_token.transfer(purchaser, WARM_LDO_BALANCE, {'from': ldo_holder, 'silent': True})
+
+
+def execute_purchase(executor, purchaser, allocation, scenario):
+    (entry_point, refund, _) = scenario
+    value = get_eth_cost(allocation) + (REFUND_AMOUNT if refund else 0)
+
+    if entry_point == 'default':
+        return purchaser.transfer(to=executor, amount=value, gas_limit=DIRECT_TRANSFER_GAS_LIMIT, silent=True)
+
+    # purchases for another address are sent by an account that is not a purchaser
+    sender = accounts[1] if entry_point == 'execute_purchase_for_another' else purchaser
+    return executor.execute_purchase(purchaser, {'from': sender, 'value': value, 'silent': True})
+
+
+def summarize(transactions):
+    summary = {}
+    for scenario in SCENARIOS:
+        name = get_scenario_name(scenario)
+        samples = [ tx for tx in transactions if tx['scenario'] == name ]
+        if len(samples) == 0:
+            continue
+        gas_used = [ tx['gas_used'] for tx in samples ]
+        wall_times = [ tx['wall_time'] for tx in samples ]
+        summary[name] = {
+            'count': len(samples),
+            'gas_min': min(gas_used),
+            'gas_mean': statistics.mean(gas_used),
+            'gas_max': max(gas_used),
+            'wall_time_mean': statistics.mean(wall_times),
+            'wall_time_median': statistics.median(wall_times),
+            'wall_time_max': max(wall_times),
+            'rpc_requests_mean': statistics.mean(tx['rpc_requests'] for tx in samples)
+        }
+    return summary
+
+
+def get_saved_gas(contracts):
+    # per scenario, the gas of the baseline executor minus the gas of the optimized one
+    if BASELINE_CONTRACT not in contracts or OPTIMIZED_CONTRACT not in contracts:
+        return None
+    (baseline, optimized) = (contracts[BASELINE_CONTRACT], contracts[OPTIMIZED_CONTRACT])
+    saved_gas = {
+        name: baseline['test_scenarios'][name] - optimized['test_scenarios'][name]
+        for (name, _) in TEST_SCENARIOS
+    }
+    for (name, stats) in baseline['scenarios'].items():
+        if name in optimized['scenarios']:
+            saved_gas[name] = stats['gas_mean'] - optimized['scenarios'][name]['gas_mean']
+    return saved_gas
+
+
+def print_report(report):
+    contract_names = list(report['contracts'])
+    saved_header = f'{"saved":>16}' if report['saved_gas'] is not None else ''
+
+    print(f'{"scenario":<42}' + ''.join(f'{name:>28}' for name in contract_names) + saved_header)
+    for row_name in ['deploy_gas', 'start_gas']:
+        print(f'{row_name:<42}' + ''.join(f'{report["contracts"][name][row_name]:>28}' for name in contract_names))
+
+    for (name, _) in TEST_SCENARIOS:
+        cells = [ report['contracts'][contract_name]['test_scenarios'][name] for contract_name in contract_names ]
+        print(f'{name:<42}' + ''.join(f'{cell:>28}' for cell in cells) + format_saved_gas(report, name))
+
+    for scenario in SCENARIOS:
+        name = get_scenario_name(scenario)
+        cells = []
+        for contract_name in contract_names:
+            stats = report['contracts'][contract_name]['scenarios'].get(name)
+            cells.append('-' if stats is None else f'{stats["gas_mean"]:.0f} gas {stats["wall_time_mean"] * 1000:.0f} ms')
+        print(f'{name:<42}' + ''.join(f'{cell:>28}' for cell in cells) + format_saved_gas(report, name))
+
+    for contract_name in contract_names:
+        batch = report['contracts'][contract_name].get('batch')
+        if batch is None:
+            continue
+        print(f'{contract_name} batch purchases:')
+        for (size, gas) in batch['gas_used'].items():
+            print(f'  {size:>3} receivers: {gas} gas, {gas / int(size):.0f} gas per receiver')
+        baseline = report['contracts'][contract_name]['scenarios'].get(BATCH_BASELINE_SCENARIO)
+        if batch['gas_per_extra_receiver'] is not None and baseline is not None:
+            saving = baseline['gas_mean'] - batch['gas_per_extra_receiver']
+            print(
+                f'  {batch["gas_per_extra_receiver"]:.0f} gas per extra receiver, '
+                f'{saving:.0f} gas saved per receiver compared to {BATCH_BASELINE_SCENARIO}'
+            )
+
+
+def format_saved_gas(report, scenario_name):
+    if report['saved_gas'] is None or scenario_name not in report['saved_gas']:
+        return ''
+    saved = report['saved_gas'][scenario_name]
+    baseline = report['contracts'][BASELINE_CONTRACT]
+    if scenario_name in baseline['test_scenarios']:
+        baseline_gas = baseline['test_scenarios'][scenario_name]
+    else:
+        baseline_gas = baseline['scenarios'][scenario_name]['gas_mean']
+    return f'{saved:>8.0f} ({saved / baseline_gas:.1%})'.rjust(16)
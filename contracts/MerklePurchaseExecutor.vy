@@ -0,0 +1,289 @@
+# @version 0.3.7
+# @author Lido <info@lido.fi>
+# @licence MIT
+from vyper.interfaces import ERC20
+
+
+# Lido DAO Vault (Agent) contract
+interface Vault:
+    def deposit(_token: address, _value: uint256): payable
+
+
+# The purchase has been executed exchanging ETH to vested LDO
+event PurchaseExecuted:
+    # the address that has received the vested LDO tokens
+    ldo_receiver: indexed(address)
+    # the number of LDO tokens vested to ldo_receiver
+    ldo_allocation: uint256
+    # the amount of ETH that was paid and forwarded to the DAO
+    eth_cost: uint256
+    # the vesting id to be used with the DAO's TokenManager contract
+    vesting_id: uint256
+
+event OfferStarted:
+    started_at: uint256
+    expires_at: uint256
+
+
+# The same offer as PurchaseExecutor, except that the allocations are not stored in the contract.
+# Only the root of a Merkle tree of (purchaser, allocation) pairs is stored, so the deployment
+# cost doesn't depend on the number of purchasers, and each purchaser passes their allocation
+# along with its Merkle proof. See utils/merkle.py for the tree layout.
+
+# allows for up to 2**32 purchasers
+MAX_PROOF_LENGTH: constant(uint256) = 32
+ETH_TO_LDO_RATE_PRECISION: constant(uint256) = 10**18
+
+LDO_TOKEN: constant(address) = 0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32
+LIDO_DAO_TOKEN_MANAGER: constant(address) = 0xf73a1260d222f447210581DDf212D915c09a3249
+LIDO_DAO_VAULT: constant(address) = 0x3e40D73EB977Dc6a537aF587D48316feE66E9C8c
+LIDO_DAO_VAULT_ETH_TOKEN: constant(address) = ZERO_ADDRESS
+
+
+# how much LDO in one ETH, ETH_TO_LDO_RATE_PRECISION being 1
+eth_to_ldo_rate: public(immutable(uint256))
+allocations_merkle_root: public(immutable(bytes32))
+ldo_allocations_total: public(immutable(uint256))
+purchased: public(HashMap[address, bool])
+
+# in seconds
+offer_expiration_delay: public(immutable(uint256))
+offer_started_at: public(uint256)
+vesting_start_delay: public(immutable(uint256))
+vesting_end_delay: public(immutable(uint256))
+
+
+@external
+def __init__(
+    _eth_to_ldo_rate: uint256,
+    _vesting_start_delay: uint256,
+    _vesting_end_delay: uint256,
+    _offer_expiration_delay: uint256,
+    _allocations_merkle_root: bytes32,
+    _ldo_allocations_total: uint256
+):
+    """
+    @param _eth_to_ldo_rate How much LDO one gets for one ETH (multiplied by 10**18)
+    @param _vesting_start_delay Delay from the purchase moment to the vesting start moment, in seconds
+    @param _vesting_end_delay Delay from the purchase moment to the vesting end moment, in seconds
+    @param _offer_expiration_delay Delay from the contract deployment to offer expiration, in seconds
+    @param _allocations_merkle_root Root of the Merkle tree of LDO purchasers and their allocations
+    @param _ldo_allocations_total Sum of LDO token allocations
+    """
+    assert _eth_to_ldo_rate > 0
+    assert _vesting_end_delay >= _vesting_start_delay
+    assert _offer_expiration_delay > 0
+    assert _allocations_merkle_root != empty(bytes32)
+    assert _ldo_allocations_total > 0
+
+    eth_to_ldo_rate = _eth_to_ldo_rate
+    vesting_start_delay = _vesting_start_delay
+    vesting_end_delay = _vesting_end_delay
+    offer_expiration_delay = _offer_expiration_delay
+    allocations_merkle_root = _allocations_merkle_root
+    ldo_allocations_total = _ldo_allocations_total
+
+
+@internal
+@pure
+def _get_leaf(_ldo_receiver: address, _ldo_allocation: uint256) -> bytes32:
+    # leaves are hashed twice so that they cannot be mistaken for inner nodes
+    return keccak256(keccak256(concat(convert(_ldo_receiver, bytes32), convert(_ldo_allocation, bytes32))))
+
+
+@internal
+@view
+def _verify_proof(_leaf: bytes32, _proof: DynArray[bytes32, MAX_PROOF_LENGTH]) -> bool:
+    node: bytes32 = _leaf
+    for sibling in _proof:
+        # pairs are sorted before hashing so that proofs don't need the sides of the siblings
+        if convert(node, uint256) < convert(sibling, uint256):
+            node = keccak256(concat(node, sibling))
+        else:
+            node = keccak256(concat(sibling, node))
+    return node == allocations_merkle_root
+
+
+@internal
+@view
+def _get_allocation(
+    _ldo_receiver: address,
+    _ldo_allocation: uint256,
+    _proof: DynArray[bytes32, MAX_PROOF_LENGTH]
+) -> (uint256, uint256):
+    if self.purchased[_ldo_receiver] or not self._verify_proof(self._get_leaf(_ldo_receiver, _ldo_allocation), _proof):
+        return (0, 0)
+    eth_cost: uint256 = (_ldo_allocation * ETH_TO_LDO_RATE_PRECISION) / eth_to_ldo_rate
+    return (_ldo_allocation, eth_cost)
+
+
+@internal
+@view
+def _get_offer_expires_at(_offer_started_at: uint256) -> uint256:
+    if _offer_started_at == 0:
+        return 0
+    return _offer_started_at + offer_expiration_delay
+
+
+@external
+@view
+def offer_expires_at() -> uint256:
+    """
+    @return The offer expiration timestamp, zero if the offer hasn't been started yet.
+    """
+    return self._get_offer_expires_at(self.offer_started_at)
+
+
+@external
+@view
+def offer_started() -> bool:
+    """
+    @return Whether the offer has started.
+    """
+    return self.offer_started_at != 0
+
+
+@external
+@view
+def offer_expired() -> bool:
+    """
+    @return Whether the offer has expired.
+    """
+    return block.timestamp >= self._get_offer_expires_at(self.offer_started_at)
+
+
+@internal
+def _start_unless_started():
+    if self.offer_started_at == 0:
+        assert ERC20(LDO_TOKEN).balanceOf(self) == ldo_allocations_total, "not funded"
+        started_at: uint256 = block.timestamp
+        self.offer_started_at = started_at
+        log OfferStarted(started_at, started_at + offer_expiration_delay)
+
+
+@external
+def start():
+    """
+    @notice Starts the offer if it 1) hasn't been started yet and 2) has received funding in full.
+    """
+    self._start_unless_started()
+
+
+@external
+@view
+def get_allocation(
+    _ldo_allocation: uint256,
+    _proof: DynArray[bytes32, MAX_PROOF_LENGTH],
+    _ldo_receiver: address = msg.sender
+) -> (uint256, uint256):
+    """
+    @param _ldo_allocation The LDO allocation of the purchaser
+    @param _proof Merkle proof of the purchaser's allocation
+    @param _ldo_receiver The LDO purchaser address to check
+    @return
+        A tuple: the first element is the amount of LDO available for purchase (zero if
+        the purchase was already executed for that address or the proof is invalid), the
+        second element is the Ether cost of the purchase.
+    """
+    return self._get_allocation(_ldo_receiver, _ldo_allocation, _proof)
+
+
+@internal
+def _execute_purchase(
+    _ldo_receiver: address,
+    _ldo_allocation: uint256,
+    _proof: DynArray[bytes32, MAX_PROOF_LENGTH],
+    _caller: address,
+    _eth_received: uint256
+) -> uint256:
+    """
+    @dev
+        We don't use any reentrancy lock here because, among all external calls in this
+        function (Vault.deposit, TokenManager.assignVested, LDO.transfer, and the default
+        payable function of the message sender), only the last one executes the code not
+        under our control, and we make this call after all state mutations.
+    """
+    self._start_unless_started()
+    assert block.timestamp < self.offer_started_at + offer_expiration_delay, "offer expired"
+
+    ldo_allocation: uint256 = 0
+    eth_cost: uint256 = 0
+    ldo_allocation, eth_cost = self._get_allocation(_ldo_receiver, _ldo_allocation, _proof)
+
+    assert ldo_allocation > 0, "no allocation"
+    assert _eth_received >= eth_cost, "insufficient funds"
+
+    # mark the purchaser's allocation as purchased
+    self.purchased[_ldo_receiver] = True
+
+    # forward ETH cost of the purchase to the DAO treasury contract
+    Vault(LIDO_DAO_VAULT).deposit(
+        LIDO_DAO_VAULT_ETH_TOKEN,
+        eth_cost,
+        value=eth_cost
+    )
+
+    vesting_start: uint256 = block.timestamp + vesting_start_delay
+    vesting_end: uint256 = block.timestamp + vesting_end_delay
+    vesting_cliff: uint256 = vesting_start
+
+    # TokenManager can only assign vested tokens from its own balance
+    assert ERC20(LDO_TOKEN).transfer(LIDO_DAO_TOKEN_MANAGER, ldo_allocation)
+
+    # assign vested LDO tokens to the purchaser from the DAO treasury reserves
+    # uint64 args are passed as full words so we use raw_call instead of an interface
+    call_result: Bytes[32] = raw_call(
+        LIDO_DAO_TOKEN_MANAGER,
+        concat(
+            method_id('assignVested(address,uint256,uint64,uint64,uint64,bool)'),
+            convert(_ldo_receiver, bytes32),
+            convert(ldo_allocation, bytes32),
+            convert(vesting_start, bytes32),
+            convert(vesting_cliff, bytes32),
+            convert(vesting_end, bytes32),
+            convert(False, bytes32)
+        ),
+        max_outsize=32
+    )
+    vesting_id: uint256 = convert(extract32(call_result, 0), uint256)
+
+    log PurchaseExecuted(_ldo_receiver, ldo_allocation, eth_cost, vesting_id)
+
+    # refund any excess ETH to the caller
+    eth_refund: uint256 = _eth_received - eth_cost
+    if eth_refund > 0:
+        # use raw_call to forward all remaining gas just in case the caller is a smart contract
+        raw_call(_caller, b"", value=eth_refund)
+
+    return vesting_id
+
+
+@external
+@payable
+def execute_purchase(
+    _ldo_allocation: uint256,
+    _proof: DynArray[bytes32, MAX_PROOF_LENGTH],
+    _ldo_receiver: address = msg.sender
+) -> uint256:
+    """
+    @notice Purchases LDO for the specified address (defaults to message sender) in exchange for ETH.
+    @dev There is no payable default function since the purchase requires a Merkle proof.
+    @param _ldo_allocation The LDO allocation of the purchaser
+    @param _proof Merkle proof of the purchaser's allocation
+    @param _ldo_receiver The address the purchase is executed for. Must be a valid purchaser.
+    @return Vesting ID to be used with the DAO's `TokenManager` contract.
+    """
+    return self._execute_purchase(_ldo_receiver, _ldo_allocation, _proof, msg.sender, msg.value)
+
+
+@external
+def recover_unsold_tokens():
+    """
+    @notice Transfers unsold LDO tokens back to the DAO treasury.
+    @dev May only be called after the offer expires.
+    """
+    started_at: uint256 = self.offer_started_at
+    assert started_at != 0 and block.timestamp >= started_at + offer_expiration_delay
+    unsold_ldo_amount: uint256 = ERC20(LDO_TOKEN).balanceOf(self)
+    if unsold_ldo_amount > 0:
+        ERC20(LDO_TOKEN).transfer(LIDO_DAO_VAULT, unsold_ldo_amount)
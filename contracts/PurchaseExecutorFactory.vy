@@ -0,0 +1,62 @@
+# @version 0.3.7
+# @author Lido <info@lido.fi>
+# @licence MIT
+
+
+# Deploys executors from an EIP-5202 blueprint of the executor init code with CREATE2,
+# so that the address of an executor only depends on this factory, the executor init
+# code, its constructor args and the salt, and can be computed before the deployment.
+
+
+event ExecutorDeployed:
+    executor: indexed(address)
+    salt: bytes32
+
+
+MAX_PURCHASERS: constant(uint256) = 50
+# the length of the blueprint preamble (0xFE7100) preceding the init code
+BLUEPRINT_CODE_OFFSET: constant(uint256) = 3
+
+
+executor_blueprint: public(immutable(address))
+
+
+@external
+def __init__(_executor_blueprint: address):
+    """
+    @param _executor_blueprint The blueprint contract holding the executor init code
+    """
+    assert _executor_blueprint.is_contract
+    executor_blueprint = _executor_blueprint
+
+
+@external
+def deploy_executor(
+    _eth_to_ldo_rate: uint256,
+    _vesting_start_delay: uint256,
+    _vesting_end_delay: uint256,
+    _offer_expiration_delay: uint256,
+    _ldo_purchasers: address[MAX_PURCHASERS],
+    _ldo_allocations: uint256[MAX_PURCHASERS],
+    _ldo_allocations_total: uint256,
+    _salt: bytes32
+) -> address:
+    """
+    @notice Deploys an executor with the given constructor args at the CREATE2 address defined by the salt.
+    @dev Anyone may call this: the same args and salt always result in the same contract at the same address.
+    @return The address of the deployed executor.
+    """
+    executor: address = create_from_blueprint(
+        executor_blueprint,
+        _eth_to_ldo_rate,
+        _vesting_start_delay,
+        _vesting_end_delay,
+        _offer_expiration_delay,
+        _ldo_purchasers,
+        _ldo_allocations,
+        _ldo_allocations_total,
+        code_offset=BLUEPRINT_CODE_OFFSET,
+        salt=_salt
+    )
+    log ExecutorDeployed(executor, _salt)
+    return executor
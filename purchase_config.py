@@ -1,4 +1,10 @@
 import csv
+import os
+from functools import lru_cache
+
+from eth_utils import is_address, is_hex_address, to_checksum_address
+
+from utils.allocation_table import AllocationTable
 
 ETH_TO_LDO_RATE_PRECISION = 10**18
 
@@ -12,18 +18,109 @@ OFFER_EXPIRATION_DELAY = 2629746 # one month
 
 ALLOCATIONS_TOTAL = 99064814814814816060000000
 
+PURCHASERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'purchasers.csv')
+
+
+class InvalidPurchasersError(ValueError):
+    def __init__(self, filename, errors):
+        self.filename = filename
+        self.errors = errors
+        lines = [
+            f'  line {line_num}: {message}' if line_num is not None else f'  {message}'
+            for (line_num, message) in errors
+        ]
+        super().__init__(f'{len(errors)} error(s) in {filename}:\n' + '\n'.join(lines))
+
+
+def read_csv_purchasers(filename, allocations_total=ALLOCATIONS_TOTAL):
+    return read_purchaser_rows(iter_csv_data(filename), filename, allocations_total)
+
+
+def read_purchaser_rows(rows, source, allocations_total=None):
+    # checks (line number, [address, amount]) rows, reporting all invalid rows of the source at once
+    errors = []
+    data = list(iter_purchasers(rows, errors))
+
+    actual_allocations_total = sum([ item[1] for item in data ])
+    if allocations_total is not None and actual_allocations_total != allocations_total:
+        errors.append((None, f'invalid allocations sum: expected {allocations_total}, actual {actual_allocations_total}'))
+
+    if len(errors) != 0:
+        raise InvalidPurchasersError(source, errors)
 
-def read_csv_purchasers(filename):
-    data = [ (item[0], int(item[1])) for item in read_csv_data(filename) ]
-    allocations_total = sum([ item[1] for item in data ])
-    assert allocations_total == ALLOCATIONS_TOTAL, f'invalid allocations sum: expected {ALLOCATIONS_TOTAL}, actual {allocations_total}'
     return data
 
 
-def read_csv_data(filename):
+def iter_purchasers(rows, errors):
+    seen_purchasers = {}
+
+    for (line_num, row) in rows:
+        if len(row) == 0:
+            continue
+
+        purchaser = check_purchaser_row(line_num, row, seen_purchasers, errors)
+        if purchaser is not None:
+            yield purchaser
+
+
+def check_purchaser_row(line_num, row, seen_purchasers, errors):
+    if len(row) != 2:
+        errors.append((line_num, f'expected 2 columns, got {len(row)}'))
+        return None
+
+    (address, amount) = row
+
+    # mixed-case addresses must have a valid EIP-55 checksum; all-lowercase and
+    # all-uppercase ones carry no checksum, so only their format can be checked
+    if not is_hex_address(address):
+        errors.append((line_num, f'invalid address: {address}'))
+        return None
+
+    if not is_address(address):
+        errors.append((line_num, f'invalid address checksum: {address}'))
+        return None
+
+    address = to_checksum_address(address)
+
+    if address in seen_purchasers:
+        errors.append((line_num, f'duplicate purchaser {address}, first seen on line {seen_purchasers[address]}'))
+        return None
+
+    seen_purchasers[address] = line_num
+
+    # amounts given as JSON numbers must be integers too
+    try:
+        amount = int(str(amount))
+    except ValueError:
+        errors.append((line_num, f'allocation is not an integer: {amount}'))
+        return None
+
+    if amount <= 0:
+        errors.append((line_num, f'allocation is not positive: {amount}'))
+        return None
+
+    return (address, amount)
+
+
+def iter_csv_data(filename):
     with open(filename, newline='') as csvfile:
         reader = csv.reader(csvfile, delimiter=',', quotechar='"', skipinitialspace=True)
-        return list(reader)
+        for row in reader:
+            yield (reader.line_num, row)
+
+
+@lru_cache(maxsize=None)
+def get_ldo_purchasers():
+    return read_csv_purchasers(PURCHASERS_FILE)
+
+
+@lru_cache(maxsize=None)
+def get_allocation_table():
+    return AllocationTable.build(get_ldo_purchasers(), ETH_TO_LDO_RATE)
 
 
-LDO_PURCHASERS = read_csv_purchasers('purchasers.csv')
+def __getattr__(name):
+    # LDO_PURCHASERS is read from the file on first access instead of at import time
+    if name == 'LDO_PURCHASERS':
+        return get_ldo_purchasers()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,18 +1,23 @@
 import os
 import sys
-from brownie import network, accounts, Wei, interface, PurchaseExecutor
+from brownie import network, accounts, web3, Wei, interface, PurchaseExecutor
 
-from utils.mainnet_fork import chain_snapshot, pass_and_exec_dao_vote
+from utils.mainnet_fork import chain_snapshot, pass_and_exec_dao_votes
 from utils.config import ldo_token_address, lido_dao_agent_address, get_is_live
+from utils.batch_reads import BatchReader, RpcError, batch_request
+from utils.async_rpc import is_async_rpc_enabled, run_reads
+from utils.artifact_cache import load_artifact
+from utils.evm_script import strip_byte_prefix
+from utils.create2 import encode_constructor_args, get_executor_address
+from utils.sharding import pad_purchasers
+from utils.rpc_profiler import install_from_env
 
 from purchase_config import (
-    ETH_TO_LDO_RATE_PRECISION,
     ETH_TO_LDO_RATE,
     VESTING_START_DELAY,
     VESTING_END_DELAY,
     OFFER_EXPIRATION_DELAY,
-    LDO_PURCHASERS,
-    ALLOCATIONS_TOTAL
+    get_allocation_table
 )
 
 DIRECT_TRANSFER_GAS_LIMIT = 400_000
@@ -20,14 +25,20 @@ SEC_IN_A_DAY = 60 * 60 * 24
 
 
 def main():
+    install_from_env()
+
     if 'EXECUTOR_ADDRESS' not in os.environ:
         raise EnvironmentError('Please set the EXECUTOR_ADDRESS environment variable')
 
     executor_address = os.environ['EXECUTOR_ADDRESS']
     print(f'Using deployed executor at address {executor_address}')
 
+    if 'EXECUTOR_FACTORY_ADDRESS' in os.environ:
+        check_create2_address(executor_address, os.environ['EXECUTOR_FACTORY_ADDRESS'])
+
     executor = PurchaseExecutor.at(executor_address)
 
+    check_bytecode(executor)
     check_config(executor)
     check_allocations(executor)
 
@@ -40,53 +51,152 @@ def main():
 
     with chain_snapshot():
         if 'VOTE_IDS' in os.environ:
-            for vote_id in os.environ['VOTE_IDS'].split(','):
-                pass_and_exec_dao_vote(int(vote_id))
+            pass_and_exec_dao_votes([ int(vote_id) for vote_id in os.environ['VOTE_IDS'].split(',') ])
 
         check_allocations_reception(executor)
 
     print(f'All good!')
 
 
+def get_artifact():
+    artifact = load_artifact('PurchaseExecutor')
+    if artifact is None:
+        print('Using the brownie build artifact')
+        artifact = PurchaseExecutor._build
+    return artifact
+
+
+def check_create2_address(executor_address, factory_address):
+    # the address of an executor deployed by the factory commits to its init code and
+    # constructor args, so matching it checks the whole config without reading the chain
+    allocation_table = get_allocation_table()
+    (ldo_recipients, ldo_allocations) = pad_purchasers(list(zip(allocation_table.addresses, allocation_table.allocations)))
+
+    constructor_args = encode_constructor_args(
+        ETH_TO_LDO_RATE,
+        VESTING_START_DELAY,
+        VESTING_END_DELAY,
+        OFFER_EXPIRATION_DELAY,
+        ldo_recipients,
+        ldo_allocations,
+        allocation_table.allocations_total
+    )
+    expected_address = get_executor_address(factory_address, get_artifact()['bytecode'], constructor_args)
+
+    print(f'Expected CREATE2 address for factory {factory_address}: {expected_address}')
+    assert expected_address.lower() == executor_address.lower(), 'executor address does not match the config'
+
+    print(f'[ok] Executor address matches the config')
+
+
+def check_bytecode(executor):
+    artifact = get_artifact()
+
+    expected_bytecode = strip_byte_prefix(artifact['deployedBytecode']).lower()
+    actual_bytecode = strip_byte_prefix(web3.eth.get_code(executor.address).hex()).lower()
+
+    print(f'Runtime bytecode: {len(actual_bytecode) // 2} bytes')
+    assert actual_bytecode == expected_bytecode, 'runtime bytecode differs from the compiled contract'
+
+    print(f'[ok] Bytecode is correct')
+
+
+def read_config(executor):
+    if is_async_rpc_enabled():
+        return run_reads(lambda client: read_config_async(client, executor))
+
+    reader = BatchReader()
+    reader.add(executor.eth_to_ldo_rate)
+    reader.add(executor.offer_expiration_delay)
+    reader.add(executor.vesting_start_delay)
+    reader.add(executor.vesting_end_delay)
+    return reader.execute()
+
+
+async def read_config_async(client, executor):
+    return await client.gather(
+        client.call(executor.eth_to_ldo_rate),
+        client.call(executor.offer_expiration_delay),
+        client.call(executor.vesting_start_delay),
+        client.call(executor.vesting_end_delay)
+    )
+
+
 def check_config(executor):
+    (
+        eth_to_ldo_rate,
+        offer_expiration_delay,
+        vesting_start_delay,
+        vesting_end_delay
+    ) = read_config(executor)
+
     print(f'ETHLDO rate: {ETH_TO_LDO_RATE / 10**18}')
-    assert executor.eth_to_ldo_rate() == ETH_TO_LDO_RATE
+    assert eth_to_ldo_rate == ETH_TO_LDO_RATE
 
     print(f'Offer expiration delay: {OFFER_EXPIRATION_DELAY / SEC_IN_A_DAY} days')
-    assert executor.offer_expiration_delay() == OFFER_EXPIRATION_DELAY
+    assert offer_expiration_delay == OFFER_EXPIRATION_DELAY
 
     print(f'Vesting start delay: {VESTING_START_DELAY / SEC_IN_A_DAY} days')
-    assert executor.vesting_start_delay() == VESTING_START_DELAY
+    assert vesting_start_delay == VESTING_START_DELAY
 
     print(f'Vesting end delay: {VESTING_END_DELAY / SEC_IN_A_DAY} days')
-    assert executor.vesting_end_delay() == VESTING_END_DELAY
+    assert vesting_end_delay == VESTING_END_DELAY
 
     print(f'[ok] Global config is correct')
 
 
+def read_allocations(executor, purchasers):
+    # returns the allocations total followed by the allocation of each purchaser
+    if is_async_rpc_enabled():
+        return run_reads(lambda client: read_allocations_async(client, executor, purchasers))
+
+    reader = BatchReader()
+    reader.add(executor.ldo_allocations_total)
+    for purchaser in purchasers:
+        reader.add(executor.get_allocation, purchaser)
+    return reader.execute()
+
+
+async def read_allocations_async(client, executor, purchasers):
+    return await client.gather(
+        client.call(executor.ldo_allocations_total),
+        *[ client.call(executor.get_allocation, purchaser) for purchaser in purchasers ]
+    )
+
+
 def check_allocations(executor):
-    print(f'Total allocation: {ALLOCATIONS_TOTAL / 10**18} LDO')
-    assert executor.ldo_allocations_total() == ALLOCATIONS_TOTAL
+    allocation_table = get_allocation_table()
 
-    for (purchaser, expected_allocation) in LDO_PURCHASERS:
-        (allocation, eth_cost) = executor.get_allocation(purchaser)
-        print(f'  {purchaser}: {expected_allocation / 10**18} LDO, {eth_cost} wei')
-        expected_cost = expected_allocation * ETH_TO_LDO_RATE_PRECISION // ETH_TO_LDO_RATE
-        assert allocation == expected_allocation
-        assert eth_cost == expected_cost
+    (allocations_total, *allocations) = read_allocations(executor, allocation_table.addresses)
+
+    print(f'Total allocation: {allocation_table.allocations_total / 10**18} LDO')
+    assert allocations_total == allocation_table.allocations_total
+
+    mismatched_purchasers = []
+
+    for (row, (allocation, eth_cost)) in zip(allocation_table, allocations):
+        print(f'  {row.address}: {row.allocation / 10**18} LDO, {eth_cost} wei')
+        if allocation != row.allocation or eth_cost != row.eth_cost:
+            print(f'    [FAIL] expected {row.allocation} LDO wei for {row.eth_cost} wei, got {allocation} LDO wei for {eth_cost} wei')
+            mismatched_purchasers.append(row.address)
+
+    if len(mismatched_purchasers) != 0:
+        raise AssertionError(f'allocations mismatch for purchasers: {", ".join(mismatched_purchasers)}')
 
     print(f'[ok] Allocations are correct')
 
 
 def check_allocations_reception(executor):
+    allocation_table = get_allocation_table()
+
     eth_banker = accounts.at('0xBE0eB53F46cd790Cd13851d5EFf43D12404d33E8', force=True)
 
     ldo_token = interface.ERC20(ldo_token_address)
     lido_dao_agent = interface.Agent(lido_dao_agent_address)
     executor_ldo_balance = ldo_token.balanceOf(executor.address)
 
-    print(f'Executor LDO balance: {ALLOCATIONS_TOTAL / 10**18} LDO')
-    assert executor_ldo_balance == ALLOCATIONS_TOTAL
+    print(f'Executor LDO balance: {allocation_table.allocations_total / 10**18} LDO')
+    assert executor_ldo_balance == allocation_table.allocations_total
     print('[ok] Executor fully funded')
 
     if not executor.offer_started():
@@ -104,17 +214,43 @@ def check_allocations_reception(executor):
 
     dao_agent_eth_balance_before = lido_dao_agent.balance()
 
-    for i, (purchaser, expected_allocation) in enumerate(LDO_PURCHASERS):
+    if os.environ.get('PIPELINED') == '1':
+        check_purchases_pipelined(executor, allocation_table, ldo_token, eth_banker)
+    else:
+        check_purchases_sequentially(executor, allocation_table, ldo_token, eth_banker)
+
+    expected_total_eth_cost = allocation_table.eth_costs_total
+    total_eth_received = lido_dao_agent.balance() - dao_agent_eth_balance_before
+
+    print(f'Total ETH received by the DAO: {expected_total_eth_cost}')
+    assert total_eth_received == expected_total_eth_cost
+    print(f'[ok] Total ETH received is correct')
+
+    print(f'[ok] No LDO left on executor')
+    assert ldo_token.balanceOf(executor.address) == 0
+
+    print(f'[ok] No ETH left on executor')
+    assert executor.balance() == 0
+
+
+def get_overpay(i):
+    return 10**17 * (i % 2)
+
+
+def check_purchases_sequentially(executor, allocation_table, ldo_token, eth_banker):
+    for (i, row) in enumerate(allocation_table):
+        purchaser = row.address
         (allocation, eth_cost) = executor.get_allocation(purchaser)
 
-        print(f'  {purchaser}: {expected_allocation / 10**18} LDO, {eth_cost} wei')
+        print(f'  {purchaser}: {row.allocation / 10**18} LDO, {eth_cost} wei')
 
-        assert allocation == expected_allocation
+        assert allocation == row.allocation
+        assert eth_cost == row.eth_cost
 
         purchaser_acct = accounts.at(purchaser, force=True)
         purchaser_eth_balance_before = purchaser_acct.balance()
 
-        overpay = 10**17 * (i % 2)
+        overpay = get_overpay(i)
 
         if purchaser_eth_balance_before < eth_cost + overpay:
             print(f'    funding the purchaser account with ETH...')
@@ -133,15 +269,105 @@ def check_allocations_reception(executor):
         assert eth_spent == eth_cost
         print(f'    [ok] the purchase executed correctly, gas used: {tx.gas_used}')
 
-    expected_total_eth_cost = ALLOCATIONS_TOTAL * ETH_TO_LDO_RATE_PRECISION // ETH_TO_LDO_RATE
-    total_eth_received = lido_dao_agent.balance() - dao_agent_eth_balance_before
-
-    print(f'Total ETH received by the DAO: {expected_total_eth_cost}')
-    assert total_eth_received == expected_total_eth_cost
-    print(f'[ok] Total ETH received is correct')
-
-    print(f'[ok] No LDO left on executor')
-    assert ldo_token.balanceOf(executor.address) == 0
 
-    print(f'[ok] No ETH left on executor')
-    assert executor.balance() == 0
+def check_purchases_pipelined(executor, allocation_table, ldo_token, eth_banker, transport=None):
+    # Submits all funding and purchase transactions with explicit nonces in JSON-RPC
+    # batches without waiting for each one, relying on automine to include them in
+    # order, then fetches receipts and balances in bulk and checks them in one pass.
+    # A purchase rejected by the node doesn't stop the others, it is reported along
+    # with the rest of the failures.
+    purchasers = list(allocation_table.addresses)
+    eth_banker_address = eth_banker.address
+
+    # the funding and purchase nonces of an address are both counted from its pending nonce
+    assert eth_banker_address.lower() not in { p.lower() for p in purchasers }, f'the ETH banker {eth_banker_address} is one of the purchasers'
+
+    reader = BatchReader(transport=transport)
+    for purchaser in purchasers:
+        reader.add(executor.get_allocation, purchaser)
+        reader.add(ldo_token.balanceOf, purchaser)
+    results = reader.execute()
+    allocations = results[0::2]
+    ldo_balances_before = results[1::2]
+
+    batch_request([ ('evm_unlockUnknownAccount', [purchaser]) for purchaser in purchasers ], transport)
+
+    (banker_nonce, *rest) = batch_request(
+        [ ('eth_getTransactionCount', [eth_banker_address, 'pending']) ] +
+        [ ('eth_getTransactionCount', [purchaser, 'pending']) for purchaser in purchasers ] +
+        [ ('eth_getBalance', [purchaser, 'latest']) for purchaser in purchasers ],
+        transport
+    )
+    banker_nonce = int(banker_nonce, 16)
+    purchaser_nonces = [ int(nonce, 16) for nonce in rest[:len(purchasers)] ]
+    eth_balances_before = [ int(balance, 16) for balance in rest[len(purchasers):] ]
+
+    funding_txs = []
+    purchase_txs = []
+
+    for (i, (row, (allocation, eth_cost))) in enumerate(zip(allocation_table, allocations)):
+        assert allocation == row.allocation, f'allocation mismatch for {row.address}'
+        assert eth_cost == row.eth_cost, f'ETH cost mismatch for {row.address}'
+
+        amount = eth_cost + get_overpay(i)
+
+        if eth_balances_before[i] < amount:
+            funding_txs.append(make_tx(eth_banker_address, row.address, amount - eth_balances_before[i], banker_nonce))
+            banker_nonce += 1
+            eth_balances_before[i] = amount
+
+        purchase_txs.append(make_tx(row.address, executor.address, amount, purchaser_nonces[i], DIRECT_TRANSFER_GAS_LIMIT))
+
+    print(f'  submitting {len(funding_txs)} funding and {len(purchase_txs)} purchase transactions...')
+
+    # funding transactions are submitted first so that the purchasers' balances
+    # are sufficient by the time the purchase transactions are validated
+    batch_request([ ('eth_sendTransaction', [tx]) for tx in funding_txs ], transport)
+    # ganache answers a reverted transaction with an error instead of its hash
+    send_results = batch_request([ ('eth_sendTransaction', [tx]) for tx in purchase_txs ], transport, return_errors=True)
+
+    sent = [ i for (i, result) in enumerate(send_results) if not isinstance(result, RpcError) ]
+    receipts = [None] * len(send_results)
+    for (i, receipt) in zip(sent, batch_request([ ('eth_getTransactionReceipt', [send_results[i]]) for i in sent ], transport)):
+        receipts[i] = receipt
+
+    reader = BatchReader(transport=transport)
+    for purchaser in purchasers:
+        reader.add(ldo_token.balanceOf, purchaser)
+    ldo_balances_after = reader.execute()
+    eth_balances_after = [
+        int(balance, 16)
+        for balance in batch_request([ ('eth_getBalance', [purchaser, 'latest']) for purchaser in purchasers ], transport)
+    ]
+
+    failed_purchasers = []
+
+    for (i, row) in enumerate(allocation_table):
+        receipt = receipts[i]
+        ldo_purchased = ldo_balances_after[i] - ldo_balances_before[i]
+        eth_spent = eth_balances_before[i] - eth_balances_after[i]
+
+        print(f'  {row.address}: {row.allocation / 10**18} LDO, {row.eth_cost} wei, overpay: {get_overpay(i) / 10**18} ETH')
+
+        if isinstance(send_results[i], RpcError):
+            print(f'    [FAIL] the purchase transaction was rejected: {send_results[i].message}')
+            failed_purchasers.append(row.address)
+        elif receipt is None or int(receipt['status'], 16) != 1:
+            print(f'    [FAIL] the purchase transaction failed or was not mined')
+            failed_purchasers.append(row.address)
+        elif ldo_purchased != row.allocation or eth_spent != row.eth_cost:
+            print(f'    [FAIL] received {ldo_purchased} LDO wei for {eth_spent} wei')
+            failed_purchasers.append(row.address)
+        else:
+            print(f'    [ok] the purchase executed correctly, gas used: {int(receipt["gasUsed"], 16)}')
+
+    if len(failed_purchasers) != 0:
+        raise AssertionError(f'purchases failed for purchasers: {", ".join(failed_purchasers)}')
+
+
+def make_tx(sender, to, value, nonce, gas=None):
+    # zero gas price so that the ETH spent by purchasers equals the purchase cost
+    tx = {'from': sender, 'to': to, 'value': hex(value), 'nonce': hex(nonce), 'gasPrice': '0x0'}
+    if gas is not None:
+        tx['gas'] = hex(gas)
+    return tx
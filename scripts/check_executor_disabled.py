@@ -1,9 +1,12 @@
 import os
 import sys
 import brownie
-from brownie import chain, network, accounts, Wei, interface, PurchaseExecutor
+from brownie import chain, network, accounts, web3, Wei, interface, PurchaseExecutor
 
-from utils.mainnet_fork import chain_snapshot, pass_and_exec_dao_vote
+from utils.mainnet_fork import chain_snapshot, pass_and_exec_dao_votes
+from utils.async_rpc import is_async_rpc_enabled, run_reads
+from utils.checkpoint import Checkpoint
+from utils.rpc_profiler import install_from_env
 
 from utils.config import (
     ldo_token_address,
@@ -18,7 +21,7 @@ from purchase_config import (
     VESTING_START_DELAY,
     VESTING_END_DELAY,
     OFFER_EXPIRATION_DELAY,
-    LDO_PURCHASERS,
+    get_allocation_table,
     ALLOCATIONS_TOTAL
 )
 
@@ -26,8 +29,17 @@ from purchase_config import (
 DIRECT_TRANSFER_GAS_LIMIT = 400_000
 SEC_IN_A_DAY = 60 * 60 * 24
 
+DEFAULT_CHECKPOINT_FILE = 'check_executor_disabled.checkpoint.json'
+
+# reverted: the purchase attempt reverted
+# executed: the purchaser had executed the purchase before the check
+# purchasable: the purchase attempt succeeded
+PURCHASER_STATUSES = ('reverted', 'executed', 'purchasable')
+
 
 def main():
+    install_from_env()
+
     if 'EXECUTOR_ADDRESS' not in os.environ:
         raise EnvironmentError('Please set the EXECUTOR_ADDRESS environment variable')
 
@@ -43,24 +55,92 @@ def run_checks():
     executor_address = os.environ['EXECUTOR_ADDRESS']
     print(f'Using the deployed executor at address {executor_address}')
 
-    if 'VOTE_IDS' in os.environ:
-        for vote_id in os.environ['VOTE_IDS'].split(','):
-            pass_and_exec_dao_vote(int(vote_id))
+    vote_ids = [ int(vote_id) for vote_id in os.environ['VOTE_IDS'].split(',') ] if 'VOTE_IDS' in os.environ else []
+
+    # the results of the attempts only depend on the fork block and on the votes
+    # executed before them, so the progress made on the same fork can be resumed
+    checkpoint = Checkpoint(
+        os.environ.get('CHECKPOINT_FILE', DEFAULT_CHECKPOINT_FILE),
+        {'executor': executor_address.lower(), 'fork_block': chain.height, 'vote_ids': vote_ids}
+    )
+
+    if checkpoint.resumed:
+        print(f'Resuming from {checkpoint.path}, {len(checkpoint.items)} purchaser(s) already checked')
+
+    if len(vote_ids) != 0:
+        pass_and_exec_dao_votes(vote_ids)
 
     executor = PurchaseExecutor.at(executor_address)
 
     print(f'Checking that executor {executor_address} is disabled')
 
-    check_executor_disabled(executor)
+    check_executor_disabled(
+        executor,
+        checkpoint=checkpoint,
+        fail_fast=os.environ.get('FAIL_FAST') == '1',
+        parallel=os.environ.get('PARALLEL_CHECKS') == '1'
+    )
+
+    checkpoint.remove()
 
     print(f'All good!')
 
 
-def check_executor_disabled(executor):
+def read_funding_state(executor, ldo_token):
+    if is_async_rpc_enabled():
+        return run_reads(lambda client: client.gather(
+            client.call(executor.ldo_allocations_total),
+            client.call(ldo_token.balanceOf, executor.address)
+        ))
+    return (executor.ldo_allocations_total(), ldo_token.balanceOf(executor.address))
+
+
+def read_purchaser_states(executor, purchasers):
+    # returns (allocation, ETH cost, ETH balance) for each purchaser; the failed
+    # purchase attempts don't change these, so they are all read upfront
+    if is_async_rpc_enabled():
+        return run_reads(lambda client: read_purchaser_states_async(client, executor, purchasers))
+    return [ (*executor.get_allocation(purchaser), web3.eth.get_balance(purchaser)) for purchaser in purchasers ]
+
+
+async def read_purchaser_states_async(client, executor, purchasers):
+    async def read_purchaser_state(purchaser):
+        ((allocation, eth_cost), eth_balance) = await client.gather(
+            client.call(executor.get_allocation, purchaser),
+            client.get_balance(purchaser)
+        )
+        return (allocation, eth_cost, eth_balance)
+
+    return await client.gather(*[ read_purchaser_state(purchaser) for purchaser in purchasers ])
+
+
+async def attempt_purchases_async(client, executor, purchases):
+    # the attempts are made as calls, which don't change the state, so they are
+    # independent of each other and can run concurrently; returns (purchaser, status, reason)
+    async def attempt_purchase(purchaser, eth_cost):
+        tx = {
+            'from': purchaser,
+            'to': executor.address,
+            'value': hex(eth_cost),
+            'gas': hex(DIRECT_TRANSFER_GAS_LIMIT)
+        }
+        try:
+            await client.request('eth_call', [tx, client.block_identifier])
+            return (purchaser, 'purchasable', None)
+        except ValueError as err:
+            return (purchaser, 'reverted', err.args[0])
+
+    return await client.gather(*[ attempt_purchase(purchaser, eth_cost) for (purchaser, eth_cost) in purchases ])
+
+
+def check_executor_disabled(executor, checkpoint=None, fail_fast=False, parallel=False):
     eth_banker = accounts.at('0xBE0eB53F46cd790Cd13851d5EFf43D12404d33E8', force=True)
     ldo_token = interface.ERC20(ldo_token_address)
     lido_dao_agent = interface.Agent(lido_dao_agent_address)
 
+    if checkpoint is None:
+        checkpoint = Checkpoint(None, None)
+
     if not executor.offer_started():
         print(f'Starting the offer')
         executor.start({'from': accounts[0], 'silent': True})
@@ -68,8 +148,7 @@ def check_executor_disabled(executor):
 
     print('[ok] Offer started')
 
-    allocations_total = executor.ldo_allocations_total()
-    executor_ldo_balance = ldo_token.balanceOf(executor.address)
+    (allocations_total, executor_ldo_balance) = read_funding_state(executor, ldo_token)
 
     print(f'Total allocation: {allocations_total / 10**18}')
     print(f'Executor LDO balance: {executor_ldo_balance / 10**18}')
@@ -81,31 +160,69 @@ def check_executor_disabled(executor):
 
     print(f'Checking inability to purchase allocations')
 
-    executed_purchasers = []
-
-    for i, (purchaser, expected_allocation) in enumerate(LDO_PURCHASERS):
-        (allocation, eth_cost) = executor.get_allocation(purchaser)
+    purchasers = get_allocation_table().addresses
+    unchecked_purchasers = [ purchaser for purchaser in purchasers if purchaser not in checkpoint ]
 
-        print(f'  {purchaser}: {allocation / 10**18} LDO, {eth_cost} wei')
+    if len(unchecked_purchasers) != len(purchasers):
+        print(f'  skipping {len(purchasers) - len(unchecked_purchasers)} purchaser(s) checked on this fork earlier')
 
-        if allocation == 0:
-            executed_purchasers = executed_purchasers + [purchaser]
+    def record_result(purchaser, status, reason):
+        # the block of the attempts is the fork block in the checkpoint key
+        assert status in PURCHASER_STATUSES
+        checkpoint.set(purchaser, {'status': status})
+        if status == 'executed':
             print(f'    [WARN] purchaser {purchaser} has executed the purchase')
-            continue
-
-        purchaser_acct = accounts.at(purchaser, force=True)
-        purchaser_eth_balance = purchaser_acct.balance()
-
-        if purchaser_eth_balance < eth_cost:
-            print(f'    funding the purchaser account with ETH...')
-            eth_banker.transfer(to=purchaser, amount=(eth_cost - purchaser_eth_balance), silent=True)
-
-        try:
-            print(f'    attempting to execute the purchase...')
-            purchaser_acct.transfer(to=executor, amount=eth_cost, gas_limit=DIRECT_TRANSFER_GAS_LIMIT, silent=True)
-            raise AssertionError('purchase succeeded')
-        except brownie.exceptions.VirtualMachineError as err:
-            print(f'    [ok] purchase reverted: {err}')
+        elif status == 'purchasable':
+            print(f'    [FAIL] purchase succeeded for {purchaser}')
+        else:
+            print(f'    [ok] purchase reverted for {purchaser}: {reason}')
+
+    def apply_fail_fast(results):
+        purchasable = [ purchaser for (purchaser, status) in results if status == 'purchasable' ]
+        if fail_fast and len(purchasable) != 0:
+            raise AssertionError(f'purchase succeeded for {purchasable[0]}')
+
+    pending_purchases = []
+
+    try:
+        for (purchaser, (allocation, eth_cost, purchaser_eth_balance)) in zip(unchecked_purchasers, read_purchaser_states(executor, unchecked_purchasers)):
+            print(f'  {purchaser}: {allocation / 10**18} LDO, {eth_cost} wei')
+
+            if allocation == 0:
+                record_result(purchaser, 'executed', None)
+                continue
+
+            purchaser_acct = accounts.at(purchaser, force=True)
+
+            if purchaser_eth_balance < eth_cost:
+                print(f'    funding the purchaser account with ETH...')
+                eth_banker.transfer(to=purchaser, amount=(eth_cost - purchaser_eth_balance), silent=True)
+
+            if parallel:
+                pending_purchases.append((purchaser, eth_cost))
+                continue
+
+            try:
+                print(f'    attempting to execute the purchase...')
+                purchaser_acct.transfer(to=executor, amount=eth_cost, gas_limit=DIRECT_TRANSFER_GAS_LIMIT, silent=True)
+                (status, reason) = ('purchasable', None)
+            except brownie.exceptions.VirtualMachineError as err:
+                (status, reason) = ('reverted', err)
+            record_result(purchaser, status, reason)
+            apply_fail_fast([(purchaser, status)])
+
+        if len(pending_purchases) != 0:
+            print(f'Attempting {len(pending_purchases)} purchase(s) concurrently...')
+            # all the attempts are recorded before failing fast
+            results = run_reads(lambda client: attempt_purchases_async(client, executor, pending_purchases))
+            for (purchaser, status, reason) in results:
+                record_result(purchaser, status, reason)
+            apply_fail_fast([ (purchaser, status) for (purchaser, status, _) in results ])
+    finally:
+        checkpoint.flush()
+
+    # successful purchase attempts, if any, have taken tokens from the executor
+    executor_ldo_balance = ldo_token.balanceOf(executor.address)
 
     delay = executor.offer_expiration_delay()
 
@@ -131,10 +248,25 @@ def check_executor_disabled(executor):
 
     print('[ok] Remaining allocation was recovered')
 
+    executed_purchasers = get_purchasers_with_status(checkpoint, purchasers, 'executed')
+    purchasable_purchasers = get_purchasers_with_status(checkpoint, purchasers, 'purchasable')
+
     if len(executed_purchasers) == 0:
         print('[ok] No purchasers executed the purchase')
     else:
         print('[WARN] Some purchasers have executed the purchase:')
         for addr in executed_purchasers:
             print(f'       {addr}')
+
+    if len(purchasable_purchasers) != 0:
+        print('[FAIL] The purchase succeeded for:')
+        for addr in purchasable_purchasers:
+            print(f'       {addr}')
+        raise AssertionError('purchase succeeded')
+
+    if len(executed_purchasers) != 0:
         raise AssertionError('some purchasers have executed the purchase')
+
+
+def get_purchasers_with_status(checkpoint, purchasers, status):
+    return [ purchaser for purchaser in purchasers if checkpoint.get(purchaser) is not None and checkpoint.get(purchaser)['status'] == status ]
@@ -0,0 +1,263 @@
+import json
+import os
+from collections import defaultdict
+
+from brownie import web3, interface, PurchaseExecutor, PurchaseExecutorOptimized
+
+from utils.allocation_table import AllocationTable
+from utils.aragon_constants import get_role_hash
+from utils.artifact_cache import load_artifact
+from utils.async_rpc import run_reads
+from utils.evm_script import strip_byte_prefix
+from utils.config import ldo_token_address, lido_dao_acl_address, lido_dao_token_manager_address
+from utils.rpc_profiler import install_from_env
+
+from purchase_config import (
+    ETH_TO_LDO_RATE,
+    VESTING_START_DELAY,
+    VESTING_END_DELAY,
+    OFFER_EXPIRATION_DELAY,
+    read_csv_purchasers,
+    read_purchaser_rows
+)
+
+
+DEFAULT_MANIFEST = 'fleet.json'
+
+EXECUTOR_CONTRACTS = {
+    'PurchaseExecutor': PurchaseExecutor,
+    'PurchaseExecutorOptimized': PurchaseExecutorOptimized
+}
+
+# the runtime code of these contracts is followed by the values of their immutables
+CONTRACTS_WITH_IMMUTABLES = {'PurchaseExecutorOptimized'}
+
+
+def main():
+    install_from_env()
+
+    manifest_path = os.environ.get('FLEET_MANIFEST', DEFAULT_MANIFEST)
+    print(f'Using the fleet manifest {manifest_path}')
+
+    entries = load_manifest(manifest_path)
+    block_number = web3.eth.block_number
+
+    print(f'Checking {len(entries)} executor(s) at block {block_number}')
+
+    results = run_reads(lambda client: check_fleet_async(client, entries, hex(block_number)))
+    overlaps = find_overlapping_purchasers(entries, results)
+
+    report = make_report(block_number, entries, results, overlaps)
+    print_report(report)
+
+    if 'FLEET_REPORT' in os.environ:
+        with open(os.environ['FLEET_REPORT'], 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+            report_file.write('\n')
+        print(f'Report written to {os.environ["FLEET_REPORT"]}')
+
+    failed_names = [ r['name'] for r in report['executors'] if len(r['errors']) != 0 ]
+    if len(failed_names) != 0 or len(overlaps) != 0:
+        raise AssertionError(f'fleet check failed, executors with errors: {", ".join(failed_names) or "none"}, overlapping purchasers: {len(overlaps)}')
+
+    print('All good!')
+
+
+# An entry of the manifest:
+#   {
+#     "name": "main offer",
+#     "address": "0x...",
+#     "contract": "PurchaseExecutor",
+#     "purchasers_csv": "purchasers.csv",
+#     "eth_to_ldo_rate": ..., "vesting_start_delay": ..., "vesting_end_delay": ...,
+#     "offer_expiration_delay": ..., "allocations_total": ...
+#   }
+# `purchasers` may be given inline as a list of [address, amount] pairs instead of
+# `purchasers_csv`, and are checked in the same way; CSV paths are relative to the
+# manifest. The config values default to the ones in purchase_config.py, the
+# allocations total to the sum of the allocations.
+def load_manifest(manifest_path):
+    with open(manifest_path) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    entries = []
+
+    for (i, item) in enumerate(manifest['executors']):
+        allocations_total = int(item['allocations_total']) if 'allocations_total' in item else None
+        if 'purchasers_csv' in item:
+            csv_path = os.path.join(manifest_dir, item['purchasers_csv'])
+            ldo_purchasers = read_csv_purchasers(csv_path, allocations_total=allocations_total)
+        else:
+            # inline rows are checked like the CSV ones, numbered from 1
+            source = f'{manifest_path}, inline purchasers of executor {i}'
+            ldo_purchasers = read_purchaser_rows(enumerate(item['purchasers'], 1), source, allocations_total)
+
+        eth_to_ldo_rate = int(item.get('eth_to_ldo_rate', ETH_TO_LDO_RATE))
+        contract_name = item.get('contract', 'PurchaseExecutor')
+
+        entries.append({
+            'name': item.get('name', f'executor {i}'),
+            'contract_name': contract_name,
+            'executor': EXECUTOR_CONTRACTS[contract_name].at(item['address']),
+            'allocation_table': AllocationTable.build(ldo_purchasers, eth_to_ldo_rate),
+            'config': {
+                'eth_to_ldo_rate': eth_to_ldo_rate,
+                'vesting_start_delay': int(item.get('vesting_start_delay', VESTING_START_DELAY)),
+                'vesting_end_delay': int(item.get('vesting_end_delay', VESTING_END_DELAY)),
+                'offer_expiration_delay': int(item.get('offer_expiration_delay', OFFER_EXPIRATION_DELAY))
+            }
+        })
+
+    return entries
+
+
+async def check_fleet_async(client, entries, block_identifier):
+    # all executors are read at the same block over the same connections
+    client.block_identifier = block_identifier
+    return await client.gather(*[ check_executor_async(client, entry) for entry in entries ])
+
+
+async def check_executor_async(client, entry):
+    executor = entry['executor']
+    allocation_table = entry['allocation_table']
+    config_names = list(entry['config'])
+
+    (
+        code,
+        config_values,
+        allocations_total,
+        allocations,
+        offer_started,
+        offer_expired,
+        ldo_balance,
+        can_assign_vested
+    ) = await client.gather(
+        client.get_code(executor.address),
+        client.gather(*[ client.call(getattr(executor, name)) for name in config_names ]),
+        client.call(executor.ldo_allocations_total),
+        client.gather(*[ client.call(executor.get_allocation, purchaser) for purchaser in allocation_table.addresses ]),
+        client.call(executor.offer_started),
+        client.call(executor.offer_expired),
+        client.call(interface.ERC20(ldo_token_address).balanceOf, executor.address),
+        client.call(
+            interface.ACL(lido_dao_acl_address).hasPermission['address,address,bytes32'],
+            executor.address,
+            lido_dao_token_manager_address,
+            get_role_hash('TokenManager', 'ASSIGN_ROLE')
+        )
+    )
+
+    errors = []
+    warnings = []
+
+    error = check_code(entry['contract_name'], code)
+    if error is not None:
+        errors.append(error)
+
+    for (name, value) in zip(config_names, config_values):
+        if value != entry['config'][name]:
+            errors.append(f'{name}: expected {entry["config"][name]}, got {value}')
+
+    if allocations_total != allocation_table.allocations_total:
+        errors.append(f'allocations total: expected {allocation_table.allocations_total}, got {allocations_total}')
+
+    unpurchased = []
+
+    for (row, (allocation, eth_cost)) in zip(allocation_table, allocations):
+        if allocation == 0:
+            warnings.append(f'{row.address} has executed the purchase')
+        elif allocation != row.allocation or eth_cost != row.eth_cost:
+            errors.append(f'{row.address}: expected {row.allocation} LDO wei for {row.eth_cost} wei, got {allocation} LDO wei for {eth_cost} wei')
+        else:
+            unpurchased.append(row.address)
+
+    # an offer is active until it expires, its unsold tokens are recovered or the
+    # executor is replaced, which revokes its permission to assign vested tokens
+    active = not (offer_started and offer_expired) and ldo_balance != 0 and can_assign_vested
+
+    return {
+        'offer_started': offer_started,
+        'offer_expired': offer_expired,
+        'ldo_balance': ldo_balance,
+        'can_assign_vested': can_assign_vested,
+        'active': active,
+        'unpurchased': unpurchased,
+        'errors': errors,
+        'warnings': warnings
+    }
+
+
+def check_code(contract_name, code):
+    artifact = load_artifact(contract_name)
+    if artifact is None:
+        artifact = EXECUTOR_CONTRACTS[contract_name]._build
+
+    expected_code = strip_byte_prefix(artifact['deployedBytecode']).lower()
+    actual_code = strip_byte_prefix(code).lower()
+
+    if contract_name in CONTRACTS_WITH_IMMUTABLES:
+        matches = actual_code.startswith(expected_code)
+    else:
+        matches = actual_code == expected_code
+
+    return None if matches else f'runtime bytecode differs from the compiled {contract_name}'
+
+
+def find_overlapping_purchasers(entries, results):
+    # purchasers that can still purchase from more than one active executor
+    executor_names_by_purchaser = defaultdict(list)
+    for (entry, result) in zip(entries, results):
+        if result['active']:
+            for purchaser in result['unpurchased']:
+                executor_names_by_purchaser[purchaser].append(entry['name'])
+
+    return {
+        purchaser: names
+        for (purchaser, names) in executor_names_by_purchaser.items()
+        if len(names) > 1
+    }
+
+
+def make_report(block_number, entries, results, overlaps):
+    return {
+        'block_number': block_number,
+        'executors': [
+            {
+                'name': entry['name'],
+                'address': entry['executor'].address,
+                'contract': entry['contract_name'],
+                'purchasers_count': len(entry['allocation_table']),
+                'unpurchased_count': len(result['unpurchased']),
+                'offer_started': result['offer_started'],
+                'offer_expired': result['offer_expired'],
+                'ldo_balance': str(result['ldo_balance']),
+                'can_assign_vested': result['can_assign_vested'],
+                'active': result['active'],
+                'errors': result['errors'],
+                'warnings': result['warnings']
+            }
+            for (entry, result) in zip(entries, results)
+        ],
+        'overlapping_purchasers': overlaps
+    }
+
+
+def print_report(report):
+    for executor in report['executors']:
+        state = 'active' if executor['active'] else 'inactive'
+        print(f'{executor["name"]} ({executor["address"]}, {executor["contract"]}, {state}):')
+        print(f'  {executor["unpurchased_count"]} of {executor["purchasers_count"]} purchasers yet to purchase, LDO balance: {int(executor["ldo_balance"]) / 10**18}')
+        for warning in executor['warnings']:
+            print(f'  [WARN] {warning}')
+        for error in executor['errors']:
+            print(f'  [FAIL] {error}')
+        if len(executor['errors']) == 0:
+            print(f'  [ok] Executor is configured correctly')
+
+    if len(report['overlapping_purchasers']) == 0:
+        print('[ok] No purchaser can purchase from more than one active executor')
+    else:
+        print('[FAIL] Purchasers present in more than one active executor:')
+        for (purchaser, names) in report['overlapping_purchasers'].items():
+            print(f'       {purchaser}: {", ".join(names)}')
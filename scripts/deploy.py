@@ -1,16 +1,24 @@
-from brownie import ZERO_ADDRESS, accounts
+from brownie import accounts, web3
+from brownie.exceptions import VirtualMachineError
+from brownie.network.transaction import TransactionReceipt
 
 try:
-    from brownie import PurchaseExecutor, interface
+    from brownie import PurchaseExecutor, PurchaseExecutorOptimized, MerklePurchaseExecutor, PurchaseExecutorFactory, interface
 except ImportError:
     print("You're probably running inside Brownie console. Please call:")
-    print("set_console_globals(interface=interface, PurchaseExecutor=PurchaseExecutor)")
+    print("set_console_globals(interface=interface, PurchaseExecutor=PurchaseExecutor, PurchaseExecutorOptimized=PurchaseExecutorOptimized, MerklePurchaseExecutor=MerklePurchaseExecutor, PurchaseExecutorFactory=PurchaseExecutorFactory)")
 
 
 def set_console_globals(**kwargs):
     global PurchaseExecutor
+    global PurchaseExecutorOptimized
+    global MerklePurchaseExecutor
+    global PurchaseExecutorFactory
     global interface
     PurchaseExecutor = kwargs['PurchaseExecutor']
+    PurchaseExecutorOptimized = kwargs.get('PurchaseExecutorOptimized')
+    MerklePurchaseExecutor = kwargs.get('MerklePurchaseExecutor')
+    PurchaseExecutorFactory = kwargs.get('PurchaseExecutorFactory')
     interface = kwargs['interface']
 
 
@@ -22,6 +30,11 @@ from utils.dao import (
     encode_call_script
 )
 
+from utils.merkle import AllocationsMerkleTree
+from utils.sharding import MAX_SHARD_SIZE, pad_purchasers, partition_purchasers, make_shards_manifest, write_shards_manifest
+from utils.create2 import encode_constructor_args, decode_constructor_args, get_config_salt, get_executor_address, get_blueprint_deploy_code
+from utils.evm_script import strip_byte_prefix
+
 from utils.config import (
     ldo_token_address,
     lido_dao_acl_address,
@@ -35,23 +48,21 @@ from purchase_config import (
     VESTING_START_DELAY,
     VESTING_END_DELAY,
     OFFER_EXPIRATION_DELAY,
-    LDO_PURCHASERS,
+    get_ldo_purchasers,
     ALLOCATIONS_TOTAL
 )
 
 
-def propose_vesting_manager_contract(
+def encode_vesting_manager_calls(
     manager_address,
     total_ldo_amount,
-    ldo_transfer_reference,
-    tx_params
+    ldo_transfer_reference
 ):
     acl = interface.ACL(lido_dao_acl_address)
-    voting = interface.Voting(lido_dao_voting_address)
     finance = interface.Finance(lido_dao_finance_address)
     token_manager = interface.TokenManager(lido_dao_token_manager_address)
 
-    evm_script = encode_call_script([
+    return [
         encode_token_transfer(
             token_address=ldo_token_address,
             recipient=manager_address,
@@ -65,7 +76,35 @@ def propose_vesting_manager_contract(
             grant_to=manager_address,
             acl=acl
         )
-    ])
+    ]
+
+
+def encode_vesting_manager_evm_script(
+    manager_address,
+    total_ldo_amount,
+    ldo_transfer_reference
+):
+    return encode_call_script(encode_vesting_manager_calls(
+        manager_address=manager_address,
+        total_ldo_amount=total_ldo_amount,
+        ldo_transfer_reference=ldo_transfer_reference
+    ))
+
+
+def propose_vesting_manager_contract(
+    manager_address,
+    total_ldo_amount,
+    ldo_transfer_reference,
+    tx_params
+):
+    voting = interface.Voting(lido_dao_voting_address)
+    token_manager = interface.TokenManager(lido_dao_token_manager_address)
+
+    evm_script = encode_vesting_manager_evm_script(
+        manager_address=manager_address,
+        total_ldo_amount=total_ldo_amount,
+        ldo_transfer_reference=ldo_transfer_reference
+    )
     return create_vote(
         voting=voting,
         token_manager=token_manager,
@@ -75,19 +114,17 @@ def propose_vesting_manager_contract(
     )
 
 
-def propose_replacement_vesting_manager_contract(
+def encode_replacement_vesting_manager_evm_script(
     prev_manager_address,
     new_manager_address,
     total_ldo_amount,
-    ldo_transfer_reference,
-    tx_params
+    ldo_transfer_reference
 ):
     acl = interface.ACL(lido_dao_acl_address)
-    voting = interface.Voting(lido_dao_voting_address)
     finance = interface.Finance(lido_dao_finance_address)
     token_manager = interface.TokenManager(lido_dao_token_manager_address)
 
-    evm_script = encode_call_script([
+    return encode_call_script([
         encode_permission_revoke(
             target_app=token_manager,
             permission_name='ASSIGN_ROLE',
@@ -108,6 +145,24 @@ def propose_replacement_vesting_manager_contract(
             acl=acl
         )
     ])
+
+
+def propose_replacement_vesting_manager_contract(
+    prev_manager_address,
+    new_manager_address,
+    total_ldo_amount,
+    ldo_transfer_reference,
+    tx_params
+):
+    voting = interface.Voting(lido_dao_voting_address)
+    token_manager = interface.TokenManager(lido_dao_token_manager_address)
+
+    evm_script = encode_replacement_vesting_manager_evm_script(
+        prev_manager_address=prev_manager_address,
+        new_manager_address=new_manager_address,
+        total_ldo_amount=total_ldo_amount,
+        ldo_transfer_reference=ldo_transfer_reference
+    )
     return create_vote(
         voting=voting,
         token_manager=token_manager,
@@ -117,6 +172,44 @@ def propose_replacement_vesting_manager_contract(
     )
 
 
+def encode_sharded_vesting_managers_evm_script(
+    managers,
+    ldo_transfer_reference
+):
+    # managers: (address, LDO amount) pairs, each funded and granted ASSIGN_ROLE
+    return encode_call_script([
+        call
+        for (manager_address, total_ldo_amount) in managers
+        for call in encode_vesting_manager_calls(
+            manager_address=manager_address,
+            total_ldo_amount=total_ldo_amount,
+            ldo_transfer_reference=ldo_transfer_reference
+        )
+    ])
+
+
+def propose_sharded_vesting_manager_contracts(
+    managers,
+    ldo_transfer_reference,
+    tx_params
+):
+    voting = interface.Voting(lido_dao_voting_address)
+    token_manager = interface.TokenManager(lido_dao_token_manager_address)
+
+    total_ldo_amount = sum(m[1] for m in managers)
+    evm_script = encode_sharded_vesting_managers_evm_script(
+        managers=managers,
+        ldo_transfer_reference=ldo_transfer_reference
+    )
+    return create_vote(
+        voting=voting,
+        token_manager=token_manager,
+        vote_desc=f'Make {", ".join(str(m[0]) for m in managers)} vesting managers for total {total_ldo_amount} LDO',
+        evm_script=evm_script,
+        tx_params=tx_params
+    )
+
+
 def deploy(
     tx_params,
     eth_to_ldo_rate,
@@ -124,13 +217,15 @@ def deploy(
     vesting_end_delay,
     offer_expiration_delay,
     ldo_purchasers,
-    allocations_total
+    allocations_total,
+    executor_contract=None
 ):
-    zero_padding_len = 50 - len(ldo_purchasers)
-    ldo_recipients = [ p[0] for p in ldo_purchasers ] + [ZERO_ADDRESS] * zero_padding_len
-    ldo_allocations = [ p[1] for p in ldo_purchasers ] + [0] * zero_padding_len
+    if executor_contract is None:
+        executor_contract = PurchaseExecutor
+
+    (ldo_recipients, ldo_allocations) = pad_purchasers(ldo_purchasers)
 
-    return PurchaseExecutor.deploy(
+    return executor_contract.deploy(
         eth_to_ldo_rate,
         vesting_start_delay,
         vesting_end_delay,
@@ -142,15 +237,193 @@ def deploy(
     )
 
 
+def deploy_executor_factory(tx_params, executor_contract=None):
+    if executor_contract is None:
+        executor_contract = PurchaseExecutor
+
+    # the blueprint holds the executor init code behind a preamble that makes it non-executable
+    blueprint_tx = tx_params['from'].transfer(
+        data=get_blueprint_deploy_code(executor_contract.bytecode),
+        **{ k: v for (k, v) in tx_params.items() if k != 'from' }
+    )
+    assert blueprint_tx.status == 1 and blueprint_tx.contract_address is not None
+
+    return PurchaseExecutorFactory.deploy(blueprint_tx.contract_address, tx_params)
+
+
+def get_create2_constructor_args(
+    eth_to_ldo_rate,
+    vesting_start_delay,
+    vesting_end_delay,
+    offer_expiration_delay,
+    ldo_purchasers,
+    allocations_total
+):
+    (ldo_recipients, ldo_allocations) = pad_purchasers(ldo_purchasers)
+    return encode_constructor_args(
+        eth_to_ldo_rate,
+        vesting_start_delay,
+        vesting_end_delay,
+        offer_expiration_delay,
+        ldo_recipients,
+        ldo_allocations,
+        allocations_total
+    )
+
+
+def get_create2_executor_address(
+    factory_address,
+    eth_to_ldo_rate,
+    vesting_start_delay,
+    vesting_end_delay,
+    offer_expiration_delay,
+    ldo_purchasers,
+    allocations_total,
+    executor_contract=None
+):
+    # computed offline: the factory and the blueprint are the only deployed contracts involved
+    if executor_contract is None:
+        executor_contract = PurchaseExecutor
+
+    constructor_args = get_create2_constructor_args(
+        eth_to_ldo_rate,
+        vesting_start_delay,
+        vesting_end_delay,
+        offer_expiration_delay,
+        ldo_purchasers,
+        allocations_total
+    )
+    return get_executor_address(factory_address, executor_contract.bytecode, constructor_args)
+
+
+def has_executor_code(executor_address, executor_contract):
+    # the CREATE2 address commits to the init code, so any code there is the executor's;
+    # the code is still compared to catch deploying with the wrong contract or factory
+    code = strip_byte_prefix(web3.eth.get_code(executor_address).hex()).lower()
+    if len(code) == 0:
+        return False
+    # the values of immutables, if any, follow the compiled runtime code
+    expected_code = strip_byte_prefix(executor_contract._build['deployedBytecode']).lower()
+    assert code.startswith(expected_code), f'{executor_address} holds code other than {executor_contract._name}'
+    return True
+
+
+def deploy_create2(
+    tx_params,
+    factory,
+    eth_to_ldo_rate,
+    vesting_start_delay,
+    vesting_end_delay,
+    offer_expiration_delay,
+    ldo_purchasers,
+    allocations_total
+):
+    constructor_args = get_create2_constructor_args(
+        eth_to_ldo_rate,
+        vesting_start_delay,
+        vesting_end_delay,
+        offer_expiration_delay,
+        ldo_purchasers,
+        allocations_total
+    )
+
+    # the deployed args are decoded from the salt preimage, so that the two can't differ
+    return factory.deploy_executor(
+        *decode_constructor_args(constructor_args),
+        get_config_salt(constructor_args),
+        tx_params
+    )
+
+
+def deploy_sharded(
+    tx_params,
+    eth_to_ldo_rate,
+    vesting_start_delay,
+    vesting_end_delay,
+    offer_expiration_delay,
+    ldo_purchasers,
+    executor_contract=None
+):
+    if executor_contract is None:
+        executor_contract = PurchaseExecutor
+
+    shards = partition_purchasers(ldo_purchasers, MAX_SHARD_SIZE)
+
+    # all deployments are sent with consecutive nonces before waiting for any of them
+    nonce = tx_params['from'].nonce
+    pending = [
+        deploy(
+            tx_params={**tx_params, 'nonce': nonce + i, 'required_confs': 0},
+            eth_to_ldo_rate=eth_to_ldo_rate,
+            vesting_start_delay=vesting_start_delay,
+            vesting_end_delay=vesting_end_delay,
+            offer_expiration_delay=offer_expiration_delay,
+            ldo_purchasers=shard,
+            allocations_total=sum(p[1] for p in shard),
+            executor_contract=executor_contract
+        )
+        for (i, shard) in enumerate(shards)
+    ]
+
+    executors = []
+    for deployment in pending:
+        if isinstance(deployment, TransactionReceipt):
+            deployment.wait(1)
+            assert deployment.status == 1, f'deployment {deployment.txid} failed'
+            deployment = executor_contract.at(deployment.contract_address)
+        executors.append(deployment)
+
+    manifest = make_shards_manifest(
+        shards,
+        [ executor.address for executor in executors ],
+        executor_contract._name,
+        {
+            'eth_to_ldo_rate': eth_to_ldo_rate,
+            'vesting_start_delay': vesting_start_delay,
+            'vesting_end_delay': vesting_end_delay,
+            'offer_expiration_delay': offer_expiration_delay
+        }
+    )
+
+    return (executors, manifest)
+
+
+def deploy_merkle(
+    tx_params,
+    eth_to_ldo_rate,
+    vesting_start_delay,
+    vesting_end_delay,
+    offer_expiration_delay,
+    ldo_purchasers
+):
+    tree = AllocationsMerkleTree(ldo_purchasers)
+
+    executor = MerklePurchaseExecutor.deploy(
+        eth_to_ldo_rate,
+        vesting_start_delay,
+        vesting_end_delay,
+        offer_expiration_delay,
+        tree.root,
+        tree.allocations_total,
+        tx_params
+    )
+
+    return (executor, tree)
+
+
 def deploy_and_start_dao_vote(
     tx_params,
     eth_to_ldo_rate=ETH_TO_LDO_RATE,
     vesting_start_delay=VESTING_START_DELAY,
     vesting_end_delay=VESTING_END_DELAY,
     offer_expiration_delay=OFFER_EXPIRATION_DELAY,
-    ldo_purchasers=LDO_PURCHASERS,
-    allocations_total = ALLOCATIONS_TOTAL
+    ldo_purchasers=None,
+    allocations_total = ALLOCATIONS_TOTAL,
+    executor_contract=None
 ):
+    if ldo_purchasers is None:
+        ldo_purchasers = get_ldo_purchasers()
+
     executor = deploy(
         tx_params=tx_params,
         eth_to_ldo_rate=eth_to_ldo_rate,
@@ -158,7 +431,8 @@ def deploy_and_start_dao_vote(
         vesting_end_delay=vesting_end_delay,
         offer_expiration_delay=offer_expiration_delay,
         ldo_purchasers=ldo_purchasers,
-        allocations_total=allocations_total
+        allocations_total=allocations_total,
+        executor_contract=executor_contract
     )
 
     (vote_id, _) = propose_vesting_manager_contract(
@@ -178,9 +452,12 @@ def deploy_replacement_executor_and_start_dao_vote(
     vesting_start_delay=VESTING_START_DELAY,
     vesting_end_delay=VESTING_END_DELAY,
     offer_expiration_delay=OFFER_EXPIRATION_DELAY,
-    ldo_purchasers=LDO_PURCHASERS,
+    ldo_purchasers=None,
     allocations_total=ALLOCATIONS_TOTAL
 ):
+    if ldo_purchasers is None:
+        ldo_purchasers = get_ldo_purchasers()
+
     executor = deploy(
         tx_params=tx_params,
         eth_to_ldo_rate=eth_to_ldo_rate,
@@ -200,3 +477,134 @@ def deploy_replacement_executor_and_start_dao_vote(
     )
 
     return (executor, vote_id)
+
+
+def deploy_merkle_and_start_dao_vote(
+    tx_params,
+    eth_to_ldo_rate=ETH_TO_LDO_RATE,
+    vesting_start_delay=VESTING_START_DELAY,
+    vesting_end_delay=VESTING_END_DELAY,
+    offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+    ldo_purchasers=None
+):
+    if ldo_purchasers is None:
+        ldo_purchasers = get_ldo_purchasers()
+
+    (executor, tree) = deploy_merkle(
+        tx_params=tx_params,
+        eth_to_ldo_rate=eth_to_ldo_rate,
+        vesting_start_delay=vesting_start_delay,
+        vesting_end_delay=vesting_end_delay,
+        offer_expiration_delay=offer_expiration_delay,
+        ldo_purchasers=ldo_purchasers
+    )
+
+    (vote_id, _) = propose_vesting_manager_contract(
+        manager_address=executor.address,
+        total_ldo_amount=tree.allocations_total,
+        ldo_transfer_reference=f"Transfer LDO tokens to be sold for ETH",
+        tx_params=tx_params
+    )
+
+    return (executor, tree, vote_id)
+
+
+def deploy_sharded_and_start_dao_vote(
+    tx_params,
+    eth_to_ldo_rate=ETH_TO_LDO_RATE,
+    vesting_start_delay=VESTING_START_DELAY,
+    vesting_end_delay=VESTING_END_DELAY,
+    offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+    ldo_purchasers=None,
+    executor_contract=None,
+    manifest_path=None
+):
+    if ldo_purchasers is None:
+        ldo_purchasers = get_ldo_purchasers()
+
+    (executors, manifest) = deploy_sharded(
+        tx_params=tx_params,
+        eth_to_ldo_rate=eth_to_ldo_rate,
+        vesting_start_delay=vesting_start_delay,
+        vesting_end_delay=vesting_end_delay,
+        offer_expiration_delay=offer_expiration_delay,
+        ldo_purchasers=ldo_purchasers,
+        executor_contract=executor_contract
+    )
+
+    if manifest_path is not None:
+        write_shards_manifest(manifest_path, manifest)
+
+    (vote_id, _) = propose_sharded_vesting_manager_contracts(
+        # the shard totals the executors were deployed with, as recorded in the manifest
+        managers=[ (item['address'], int(item['allocations_total'])) for item in manifest['executors'] ],
+        ldo_transfer_reference=f"Transfer LDO tokens to be sold for ETH",
+        tx_params=tx_params
+    )
+
+    return (executors, manifest, vote_id)
+
+
+def deploy_create2_and_start_dao_vote(
+    tx_params,
+    factory,
+    eth_to_ldo_rate=ETH_TO_LDO_RATE,
+    vesting_start_delay=VESTING_START_DELAY,
+    vesting_end_delay=VESTING_END_DELAY,
+    offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+    ldo_purchasers=None,
+    allocations_total=ALLOCATIONS_TOTAL,
+    executor_contract=None
+):
+    if executor_contract is None:
+        executor_contract = PurchaseExecutor
+
+    if ldo_purchasers is None:
+        ldo_purchasers = get_ldo_purchasers()
+
+    executor_address = get_create2_executor_address(
+        factory_address=factory.address,
+        eth_to_ldo_rate=eth_to_ldo_rate,
+        vesting_start_delay=vesting_start_delay,
+        vesting_end_delay=vesting_end_delay,
+        offer_expiration_delay=offer_expiration_delay,
+        ldo_purchasers=ldo_purchasers,
+        allocations_total=allocations_total,
+        executor_contract=executor_contract
+    )
+
+    # anyone may deploy the same config through the factory, in which case the executor
+    # is already there and our deployment would revert on the address collision
+    deploy_tx = None
+    if not has_executor_code(executor_address, executor_contract):
+        # the vote only needs the address, so it is created without waiting for the deployment
+        deploy_tx = deploy_create2(
+            tx_params={**tx_params, 'required_confs': 0},
+            factory=factory,
+            eth_to_ldo_rate=eth_to_ldo_rate,
+            vesting_start_delay=vesting_start_delay,
+            vesting_end_delay=vesting_end_delay,
+            offer_expiration_delay=offer_expiration_delay,
+            ldo_purchasers=ldo_purchasers,
+            allocations_total=allocations_total
+        )
+
+    (vote_id, _) = propose_vesting_manager_contract(
+        manager_address=executor_address,
+        total_ldo_amount=allocations_total,
+        ldo_transfer_reference=f"Transfer LDO tokens to be sold for ETH",
+        tx_params=tx_params
+    )
+
+    if deploy_tx is not None:
+        try:
+            deploy_tx.wait(1)
+        except VirtualMachineError:
+            pass
+        if deploy_tx.status == 1:
+            assert deploy_tx.events['ExecutorDeployed']['executor'] == executor_address
+
+    # a reverted deployment is fine if it was front-run by the same deployment
+    assert has_executor_code(executor_address, executor_contract), f'no executor deployed at {executor_address}'
+
+    return (executor_contract.at(executor_address), vote_id)
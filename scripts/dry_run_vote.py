@@ -0,0 +1,53 @@
+import os
+from brownie import interface
+
+from utils.config import lido_dao_voting_address
+from utils.vote_simulator import decode_evm_script, format_decoded_actions, simulate_call_script
+from utils.rpc_profiler import install_from_env
+from scripts.deploy import encode_vesting_manager_evm_script
+
+from purchase_config import ALLOCATIONS_TOTAL
+
+
+def main():
+    install_from_env()
+
+    if 'VOTE_IDS' in os.environ:
+        voting = interface.Voting(lido_dao_voting_address)
+        for vote_id in os.environ['VOTE_IDS'].split(','):
+            print(f'Vote {vote_id}:')
+            dry_run_evm_script(voting.getVote(int(vote_id))['script'])
+    elif 'EXECUTOR_ADDRESS' in os.environ:
+        executor_address = os.environ['EXECUTOR_ADDRESS']
+        print(f'Vote script making {executor_address} a vesting manager:')
+        dry_run_evm_script(encode_vesting_manager_evm_script(
+            manager_address=executor_address,
+            total_ldo_amount=ALLOCATIONS_TOTAL,
+            ldo_transfer_reference=f"Transfer LDO tokens to be sold for ETH"
+        ))
+    else:
+        raise EnvironmentError('Please set either the VOTE_IDS or the EXECUTOR_ADDRESS environment variable')
+
+
+def dry_run_evm_script(evm_script, sender=lido_dao_voting_address):
+    for line in format_decoded_actions(decode_evm_script(evm_script)):
+        print(f'  {line}')
+
+    results = simulate_call_script(evm_script, sender)
+    all_succeeded = True
+
+    if not all(result.chained for result in results):
+        print('The node has no debug_traceCall, each action was simulated separately with eth_call')
+        print('and does not see the effects of the previous ones. Run on a mainnet fork to simulate them in sequence.')
+
+    for (i, result) in enumerate(results):
+        action_name = f'{result.action.interface_name}.{result.action.function_name}'
+        unchained = '' if result.chained else ' (unchained)'
+        if result.success:
+            print(f'  [ok] action {i + 1} {action_name}, gas used: {result.gas_used}{unchained}')
+        else:
+            all_succeeded = False
+            print(f'  [FAIL] action {i + 1} {action_name} reverted: {result.error}{unchained}')
+
+    assert all_succeeded, 'some of the vote actions revert'
+    print(f'[ok] All {len(results)} action(s) succeed')
@@ -0,0 +1,59 @@
+import os
+from brownie import PurchaseExecutorOptimized
+
+from utils.batch_reads import BatchReader
+from utils.config import get_is_live, get_deployer_account
+from utils.rpc_profiler import install_from_env
+
+
+MAX_RECEIVERS = 50
+
+
+def main():
+    install_from_env()
+
+    if 'EXECUTOR_ADDRESS' not in os.environ:
+        raise EnvironmentError('Please set the EXECUTOR_ADDRESS environment variable')
+
+    if 'PURCHASE_RECEIVERS' not in os.environ:
+        raise EnvironmentError('Please set the PURCHASE_RECEIVERS environment variable to comma-delimited purchaser addresses')
+
+    executor = PurchaseExecutorOptimized.at(os.environ['EXECUTOR_ADDRESS'])
+    receivers = os.environ['PURCHASE_RECEIVERS'].split(',')
+    funder = get_deployer_account(get_is_live())
+
+    print(f'Executing purchases for {len(receivers)} receiver(s) from {funder}')
+
+    tx = execute_purchases(executor, receivers, {'from': funder})
+
+    for evt in tx.events['PurchaseExecuted']:
+        print(f'  {evt["ldo_receiver"]}: {evt["ldo_allocation"] / 10**18} LDO for {evt["eth_cost"]} wei, vesting id {evt["vesting_id"]}')
+
+    print(f'[ok] Executed {len(receivers)} purchase(s), gas used: {tx.gas_used}')
+
+
+def get_batch_eth_cost(executor, receivers):
+    # the batch costs the sum of the individual costs, each rounded the same way
+    # as when purchasing separately
+    reader = BatchReader()
+    for receiver in receivers:
+        reader.add(executor.get_allocation, receiver)
+    allocations = reader.execute()
+
+    missing = [ receiver for (receiver, (allocation, _)) in zip(receivers, allocations) if allocation == 0 ]
+    if len(missing) != 0:
+        raise ValueError(f'no allocation for: {", ".join(missing)}')
+
+    return sum(eth_cost for (_, eth_cost) in allocations)
+
+
+def execute_purchases(executor, receivers, tx_params):
+    if not 0 < len(receivers) <= MAX_RECEIVERS:
+        raise ValueError(f'the number of receivers must be between 1 and {MAX_RECEIVERS}')
+
+    if len(set(r.lower() for r in map(str, receivers))) != len(receivers):
+        raise ValueError('duplicate receivers')
+
+    eth_cost = get_batch_eth_cost(executor, receivers)
+
+    return executor.execute_purchases(receivers, {**tx_params, 'value': eth_cost})
@@ -0,0 +1,62 @@
+import os
+from brownie import PurchaseExecutor
+
+from utils.purchase_index import PurchaseIndex
+from utils.rpc_profiler import install_from_env
+
+from purchase_config import get_allocation_table
+
+
+DEFAULT_INDEX_DB = 'purchases.sqlite'
+
+
+def main():
+    install_from_env()
+
+    if 'EXECUTOR_ADDRESS' not in os.environ:
+        raise EnvironmentError('Please set the EXECUTOR_ADDRESS environment variable')
+
+    executor_address = os.environ['EXECUTOR_ADDRESS']
+    db_path = os.environ.get('INDEX_DB', DEFAULT_INDEX_DB)
+    from_block = int(os.environ.get('FROM_BLOCK', 0))
+    confirmations = int(os.environ.get('CONFIRMATIONS', 0))
+
+    print(f'Indexing events of executor {executor_address} into {db_path}')
+
+    executor = PurchaseExecutor.at(executor_address)
+    index = PurchaseIndex(db_path)
+
+    try:
+        cursor = index.get_cursor(executor.address)
+        if cursor is not None:
+            print(f'Resuming after block {cursor}')
+
+        logs_count = index.index(executor, from_block=from_block, confirmations=confirmations)
+        print(f'[ok] Indexed {logs_count} new event(s) up to block {index.get_cursor(executor.address)}')
+
+        print_purchase_status(index, executor.address)
+    finally:
+        index.close()
+
+
+def print_purchase_status(index, executor_address):
+    offer = index.get_offer_started(executor_address)
+    if offer is None:
+        print('Offer not started')
+    else:
+        print(f'Offer started at {offer["started_at"]}, expires at {offer["expires_at"]}')
+
+    allocation_table = get_allocation_table()
+    ldo_purchasers = zip(allocation_table.addresses, allocation_table.allocations)
+    purchased_count = 0
+    outstanding_total = 0
+
+    for (purchaser, purchased, outstanding, vesting_id) in index.get_purchase_status(executor_address, ldo_purchasers):
+        if vesting_id is None:
+            print(f'  {purchaser}: outstanding {outstanding / 10**18} LDO')
+        else:
+            purchased_count += 1
+            print(f'  {purchaser}: purchased {purchased / 10**18} LDO, vesting id {vesting_id}')
+        outstanding_total += outstanding
+
+    print(f'Purchasers executed: {purchased_count}, outstanding total: {outstanding_total / 10**18} LDO')
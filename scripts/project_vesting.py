@@ -0,0 +1,45 @@
+import os
+from datetime import datetime, timezone
+from brownie import PurchaseExecutor
+
+from utils.purchase_index import PurchaseIndex
+from utils.vesting import get_vesting_schedules, get_unlocked_amount, get_daily_unlocks, write_daily_unlocks_csv
+from utils.rpc_profiler import install_from_env
+
+
+DEFAULT_INDEX_DB = 'purchases.sqlite'
+DEFAULT_OUT_FILE = 'vesting_unlocks.csv'
+
+
+def main():
+    install_from_env()
+
+    if 'EXECUTOR_ADDRESS' not in os.environ:
+        raise EnvironmentError('Please set the EXECUTOR_ADDRESS environment variable')
+
+    db_path = os.environ.get('INDEX_DB', DEFAULT_INDEX_DB)
+    out_file = os.environ.get('OUT_FILE', DEFAULT_OUT_FILE)
+
+    executor = PurchaseExecutor.at(os.environ['EXECUTOR_ADDRESS'])
+    index = PurchaseIndex(db_path)
+
+    try:
+        purchases = index.get_purchases(executor.address)
+    finally:
+        index.close()
+
+    if len(purchases) == 0:
+        print(f'No purchases of executor {executor.address} in {db_path}, index them with scripts/index_purchases.py first')
+        return
+
+    schedules = get_vesting_schedules(purchases, executor.vesting_start_delay(), executor.vesting_end_delay())
+
+    if 'RECEIVER' in os.environ:
+        at_time = int(os.environ.get('AT_TIMESTAMP', datetime.now(timezone.utc).timestamp()))
+        unlocked = get_unlocked_amount(schedules, os.environ['RECEIVER'], at_time)
+        print(f'{os.environ["RECEIVER"]}: {unlocked / 10**18} LDO unlocked at {at_time}')
+
+    daily_unlocks = get_daily_unlocks(schedules)
+    write_daily_unlocks_csv(out_file, daily_unlocks)
+
+    print(f'[ok] Projected {len(schedules)} vesting(s) over {len(daily_unlocks)} days, written to {out_file}')
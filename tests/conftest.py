@@ -1,7 +1,9 @@
+import hashlib
 import pytest
 from brownie import chain, Wei, ZERO_ADDRESS
 
 from scripts.deploy import deploy_and_start_dao_vote
+from utils.mainnet_fork import get_vote_mode, pass_and_exec_dao_votes
 
 from utils.config import (
     ldo_token_address,
@@ -76,32 +78,8 @@ class Helpers:
 
     @staticmethod
     def pass_and_exec_dao_vote(vote_id):
-        print(f'executing vote {vote_id}')
-
-        # together these accounts hold 15% of LDO total supply
-        ldo_holders = [
-            '0x3e40d73eb977dc6a537af587d48316fee66e9c8c',
-            '0xb8d83908aab38a159f3da47a59d84db8e1838712',
-            '0xa2dfc431297aee387c05beef507e5335e684fbcd'
-        ]
-
-        helper_acct = Helpers.accounts[0]
-
-        for holder_addr in ldo_holders:
-            print(f'voting from {holder_addr}')
-            helper_acct.transfer(holder_addr, '0.1 ether')
-            account = Helpers.accounts.at(holder_addr, force=True)
-            Helpers.dao_voting.vote(vote_id, True, False, {'from': account})
-
-        # wait for the vote to end
-        chain.sleep(3 * 60 * 60 * 24)
-        chain.mine()
-
-        assert Helpers.dao_voting.canExecute(vote_id)
-        Helpers.dao_voting.executeVote(vote_id, {'from': helper_acct})
-
-        print(f'vote {vote_id} executed')
-
+        # the votes go through Voting's EVM script executor; VOTE_MODE=direct is opt-in
+        pass_and_exec_dao_votes([vote_id], get_vote_mode())
 
 
 @pytest.fixture(scope='module')
@@ -112,6 +90,13 @@ def helpers(accounts, dao_voting):
     return Helpers
 
 
+# The scenarios using this fixture run against both the original contract
+# and its gas-optimized variant, which must behave identically.
+@pytest.fixture(scope='module', params=['PurchaseExecutor', 'PurchaseExecutorOptimized'])
+def executor_contract(request):
+    return request.getfixturevalue(request.param)
+
+
 @pytest.fixture(scope='module')
 def deploy_executor_and_pass_dao_vote(accounts, ldo_holder, ldo_token, dao_acl, dao_token_manager, helpers):
     def deploy(
@@ -120,7 +105,8 @@ def deploy_executor_and_pass_dao_vote(accounts, ldo_holder, ldo_token, dao_acl,
         vesting_end_delay,
         offer_expiration_delay,
         ldo_purchasers,
-        allocations_total
+        allocations_total,
+        executor_contract=None
     ):
         (executor, vote_id) = deploy_and_start_dao_vote(
             {'from': ldo_holder},
@@ -129,7 +115,8 @@ def deploy_executor_and_pass_dao_vote(accounts, ldo_holder, ldo_token, dao_acl,
             vesting_end_delay=vesting_end_delay,
             offer_expiration_delay=offer_expiration_delay,
             ldo_purchasers=ldo_purchasers,
-            allocations_total=allocations_total
+            allocations_total=allocations_total,
+            executor_contract=executor_contract
         )
 
         helpers.pass_and_exec_dao_vote(vote_id)
@@ -143,3 +130,29 @@ def deploy_executor_and_pass_dao_vote(accounts, ldo_holder, ldo_token, dao_acl,
         return executor
 
     return deploy
+
+
+def hash_executor_params(params):
+    normalized_params = dict(params)
+    normalized_params['ldo_purchasers'] = [ (str(p[0]), int(p[1])) for p in params['ldo_purchasers'] ]
+    if params.get('executor_contract') is not None:
+        normalized_params['executor_contract'] = params['executor_contract']._name
+    return hashlib.sha256(repr(sorted(normalized_params.items())).encode()).hexdigest()
+
+
+# Deploys an executor and passes the DAO vote once per unique set of parameters.
+# Must only be used from module-scoped fixtures: the resulting chain state is then
+# captured by the fn_isolation snapshot of every test in the module, so each test
+# reverts to the deployed and funded executor instead of rebuilding it. The chain
+# is reset between modules by module_isolation, so the cache is per module.
+@pytest.fixture(scope='module')
+def executor_snapshot(module_isolation, deploy_executor_and_pass_dao_vote):
+    executors = {}
+
+    def get(**params):
+        key = hash_executor_params(params)
+        if key not in executors:
+            executors[key] = deploy_executor_and_pass_dao_vote(**params)
+        return executors[key]
+
+    return get
@@ -0,0 +1,53 @@
+import pytest
+
+from utils.aragon_constants import (
+    APP_NAMES,
+    load_table,
+    find_stale_entries,
+    get_role_hash,
+    get_selector
+)
+from utils.config import lido_dao_finance_address
+from utils.dao import encode_permission_grant, encode_permission_revoke
+
+
+def test_table_matches_the_abis():
+    assert find_stale_entries() == []
+
+
+def test_role_hashes_match_the_deployed_apps(dao_acl, dao_agent, dao_voting, dao_token_manager, interface):
+    apps = {
+        'ACL': dao_acl,
+        'Agent': dao_agent,
+        'Voting': dao_voting,
+        'TokenManager': dao_token_manager,
+        'Finance': interface.Finance(lido_dao_finance_address)
+    }
+    for app_name in APP_NAMES:
+        for (role_name, role_hash) in load_table()['roles'][app_name].items():
+            assert getattr(apps[app_name], role_name)() == role_hash
+
+
+def test_selectors_match_the_abis(dao_acl):
+    assert get_selector('ACL', 'grantPermission(address,address,bytes32)') == dao_acl.grantPermission.signature
+
+
+def test_unknown_entries_are_rejected():
+    with pytest.raises(KeyError):
+        get_role_hash('TokenManager', 'UNKNOWN_ROLE')
+    with pytest.raises(KeyError):
+        get_selector('Voting', 'unknown()')
+
+
+def test_permission_encoding_makes_no_calls(dao_acl, dao_token_manager, stranger, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('the role hash must not be read from the chain')
+
+    expected_role = dao_token_manager.ASSIGN_ROLE()
+    monkeypatch.setattr(type(dao_token_manager.ASSIGN_ROLE), '__call__', fail)
+
+    (_, grant_data) = encode_permission_grant(dao_token_manager, 'ASSIGN_ROLE', stranger, dao_acl)
+    (_, revoke_data) = encode_permission_revoke(dao_token_manager, 'ASSIGN_ROLE', stranger, dao_acl)
+
+    assert grant_data == dao_acl.grantPermission.encode_input(stranger, dao_token_manager, expected_role)
+    assert revoke_data == dao_acl.revokePermission.encode_input(stranger, dao_token_manager, expected_role)
@@ -0,0 +1,77 @@
+import hashlib
+import json
+
+import pytest
+
+from scripts.deploy import deploy
+from utils import artifact_cache
+from utils.evm_script import strip_byte_prefix
+
+SOURCE = '# @version 0.2.8\n\nx: public(uint256)\n'
+
+
+@pytest.fixture(scope='function')
+def cache_dirs(tmp_path, monkeypatch):
+    contracts_dir = tmp_path / 'contracts'
+    build_dir = tmp_path / 'build' / 'contracts'
+    cache_dir = tmp_path / 'cache'
+    contracts_dir.mkdir()
+    (contracts_dir / 'Foo.vy').write_text(SOURCE)
+    monkeypatch.setattr(artifact_cache, 'CONTRACTS_DIR', str(contracts_dir))
+    monkeypatch.setattr(artifact_cache, 'BUILD_CONTRACTS_DIR', str(build_dir))
+    monkeypatch.setenv('ARTIFACT_CACHE_DIR', str(cache_dir))
+    return (build_dir, cache_dir)
+
+
+def test_artifact_key_depends_on_source_compiler_and_evm_version():
+    key = artifact_cache.get_artifact_key(SOURCE, 'istanbul')
+    assert key == artifact_cache.get_artifact_key(SOURCE, 'istanbul')
+    assert key != artifact_cache.get_artifact_key(SOURCE + '\n', 'istanbul')
+    assert key != artifact_cache.get_artifact_key(SOURCE.replace('0.2.8', '0.2.12'), 'istanbul')
+    assert key != artifact_cache.get_artifact_key(SOURCE, 'berlin')
+
+
+def test_artifacts_are_restored_from_cache(cache_dirs):
+    (build_dir, cache_dir) = cache_dirs
+    build_artifact = {
+        'sha1': hashlib.sha1(SOURCE.encode()).hexdigest(),
+        'abi': [],
+        'bytecode': '6001',
+        'deployedBytecode': '6002'
+    }
+    build_dir.mkdir(parents=True)
+    (build_dir / 'Foo.json').write_text(json.dumps(build_artifact))
+
+    assert artifact_cache.save_artifacts() == ['Foo']
+
+    (build_dir / 'Foo.json').unlink()
+
+    assert artifact_cache.restore_artifacts() == ['Foo']
+    assert json.loads((build_dir / 'Foo.json').read_text()) == build_artifact
+    assert artifact_cache.load_artifact('Foo') == build_artifact
+
+
+def test_stale_build_artifacts_are_not_cached(cache_dirs):
+    (build_dir, cache_dir) = cache_dirs
+    build_dir.mkdir(parents=True)
+    (build_dir / 'Foo.json').write_text(json.dumps({'sha1': 'stale'}))
+
+    assert artifact_cache.save_artifacts() == []
+    assert artifact_cache.load_artifact('Foo') is None
+
+
+def test_cached_artifact_matches_deployed_executor(accounts, web3):
+    executor = deploy(
+        {'from': accounts[0]},
+        eth_to_ldo_rate=10**18,
+        vesting_start_delay=0,
+        vesting_end_delay=0,
+        offer_expiration_delay=1,
+        ldo_purchasers=[(accounts[1], 1)],
+        allocations_total=1
+    )
+    artifact = artifact_cache.load_artifact('PurchaseExecutor')
+    assert artifact is not None
+
+    deployed_bytecode = strip_byte_prefix(web3.eth.get_code(executor.address).hex())
+    assert deployed_bytecode == strip_byte_prefix(artifact['deployedBytecode']).lower()
@@ -0,0 +1,29 @@
+import pytest
+
+from utils.async_rpc import AsyncRpcClient, run_reads
+from utils.config import lido_dao_agent_address
+
+
+def test_reads_match_sync_calls(accounts, ldo_token):
+    addresses = [ accounts[i].address for i in range(5) ] + [lido_dao_agent_address]
+
+    async def read(client):
+        return await client.gather(
+            client.gather(*[ client.call(ldo_token.balanceOf, address) for address in addresses ]),
+            client.gather(*[ client.get_balance(address) for address in addresses ])
+        )
+
+    (ldo_balances, eth_balances) = run_reads(read, max_concurrency=2)
+
+    assert ldo_balances == [ ldo_token.balanceOf(address) for address in addresses ]
+    assert eth_balances == [ accounts.at(address, force=True).balance() for address in addresses ]
+
+
+def test_requests_are_counted_and_errors_raised():
+    async def read(client):
+        await client.request('eth_chainId', [])
+        with pytest.raises(ValueError):
+            await client.request('eth_noSuchMethod', [])
+        return client.requests_count
+
+    assert run_reads(read) == 2
@@ -0,0 +1,134 @@
+import pytest
+from brownie import chain, reverts
+
+from purchase_config import ETH_TO_LDO_RATE_PRECISION
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18 + 1
+]
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+def get_eth_cost(ldo_allocation):
+    return ldo_allocation * ETH_TO_LDO_RATE_PRECISION // ETH_TO_LDO_RATE
+
+
+@pytest.fixture(scope='module')
+def executor(accounts, PurchaseExecutorOptimized, executor_snapshot):
+    executor = executor_snapshot(
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
+        allocations_total=sum(LDO_ALLOCATIONS),
+        executor_contract=PurchaseExecutorOptimized
+    )
+    executor.start({ 'from': accounts[0] })
+    return executor
+
+
+@pytest.fixture(scope='module')
+def funder(accounts):
+    return accounts[5]
+
+
+def test_batch_purchase(accounts, executor, funder, dao_agent, helpers, ldo_token, dao_token_manager):
+    receivers = accounts[0:len(LDO_ALLOCATIONS)]
+    eth_cost = sum(get_eth_cost(a) for a in LDO_ALLOCATIONS)
+
+    helpers.fund_with_eth(funder, eth_cost)
+
+    dao_eth_balance_before = dao_agent.balance()
+
+    tx = executor.execute_purchases(receivers, { 'from': funder, 'value': eth_cost })
+
+    assert dao_agent.balance() - dao_eth_balance_before == eth_cost
+    assert tx.return_value == [ evt['vesting_id'] for evt in tx.events['PurchaseExecuted'] ]
+
+    purchase_events = helpers.filter_events_from(executor, tx.events['PurchaseExecuted'])
+    assert len(purchase_events) == len(receivers)
+
+    for (receiver, ldo_allocation, evt) in zip(receivers, LDO_ALLOCATIONS, purchase_events):
+        assert evt['ldo_receiver'] == receiver
+        assert evt['ldo_allocation'] == ldo_allocation
+        assert evt['eth_cost'] == get_eth_cost(ldo_allocation)
+        assert executor.get_allocation(receiver) == (0, 0)
+        assert ldo_token.balanceOf(receiver) == ldo_allocation
+
+        vesting = dao_token_manager.getVesting(receiver, evt['vesting_id'])
+
+        assert vesting['amount'] == ldo_allocation
+        assert vesting['start'] == tx.timestamp + VESTING_START_DELAY
+        assert vesting['cliff'] == tx.timestamp + VESTING_START_DELAY
+        assert vesting['vesting'] == tx.timestamp + VESTING_END_DELAY
+        assert vesting['revokable'] == False
+
+    assert ldo_token.balanceOf(executor) == 0
+
+
+def test_batch_purchase_refunds_excess_once(accounts, executor, funder, helpers):
+    receivers = accounts[0:2]
+    eth_cost = sum(get_eth_cost(a) for a in LDO_ALLOCATIONS[0:2])
+
+    helpers.fund_with_eth(funder, eth_cost + 10**18)
+    funder_balance_before = funder.balance()
+
+    tx = executor.execute_purchases(receivers, { 'from': funder, 'value': eth_cost + 10**18, 'gas_price': 0 })
+
+    assert funder_balance_before - funder.balance() == eth_cost
+    assert executor.balance() == 0
+    assert len(tx.events['PurchaseExecuted']) == 2
+
+
+def test_batch_purchase_not_allowed_with_insufficient_funds(accounts, executor, funder, helpers):
+    receivers = accounts[0:2]
+    eth_cost = sum(get_eth_cost(a) for a in LDO_ALLOCATIONS[0:2])
+
+    helpers.fund_with_eth(funder, eth_cost)
+
+    with reverts("insufficient funds"):
+        executor.execute_purchases(receivers, { 'from': funder, 'value': eth_cost - 1 })
+
+
+def test_batch_purchase_not_allowed_with_duplicate_receivers(accounts, executor, funder, helpers):
+    eth_cost = 2 * get_eth_cost(LDO_ALLOCATIONS[0])
+
+    helpers.fund_with_eth(funder, eth_cost)
+
+    with reverts("no allocation"):
+        executor.execute_purchases([accounts[0], accounts[0]], { 'from': funder, 'value': eth_cost })
+
+
+def test_batch_purchase_not_allowed_for_stranger(accounts, executor, funder, helpers):
+    eth_cost = get_eth_cost(LDO_ALLOCATIONS[0])
+
+    helpers.fund_with_eth(funder, eth_cost)
+
+    with reverts("no allocation"):
+        executor.execute_purchases([accounts[0], accounts[6]], { 'from': funder, 'value': eth_cost })
+
+
+def test_batch_purchase_not_allowed_without_receivers(executor, funder):
+    with reverts("no receivers"):
+        executor.execute_purchases([], { 'from': funder })
+
+
+def test_batch_purchase_not_allowed_after_expiration(accounts, executor, funder, helpers):
+    eth_cost = get_eth_cost(LDO_ALLOCATIONS[0])
+
+    helpers.fund_with_eth(funder, eth_cost)
+
+    chain.sleep(OFFER_EXPIRATION_DELAY + 1)
+    chain.mine()
+
+    with reverts("offer expired"):
+        executor.execute_purchases([accounts[0]], { 'from': funder, 'value': eth_cost })
@@ -0,0 +1,119 @@
+import pytest
+from brownie import web3
+
+from purchase_config import ETH_TO_LDO_RATE_PRECISION
+from scripts.deploy import deploy
+from utils.batch_reads import BatchReader, RpcError, batch_request
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+class StubTransport:
+    def __init__(self):
+        self.requests_count = 0
+        self.calls_count = 0
+
+    def __call__(self, payload):
+        self.requests_count += 1
+        self.calls_count += len(payload)
+        responses = []
+        for item in reversed(payload):
+            response = web3.provider.make_request(item['method'], item['params'])
+            responses.append({**response, 'id': item['id']})
+        return responses
+
+
+@pytest.fixture(scope='function')
+def executor(accounts, ldo_holder):
+    return deploy(
+        {'from': ldo_holder},
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
+        allocations_total=sum(LDO_ALLOCATIONS)
+    )
+
+
+def test_reads_are_packed_into_single_request(accounts, executor):
+    transport = StubTransport()
+    reader = BatchReader(transport=transport)
+
+    reader.add(executor.eth_to_ldo_rate)
+    reader.add(executor.ldo_allocations_total)
+    for i in range(0, len(LDO_ALLOCATIONS) + 1):
+        reader.add(executor.get_allocation, accounts[i])
+
+    (eth_to_ldo_rate, allocations_total, *allocations) = reader.execute()
+
+    assert transport.requests_count == 1
+    assert transport.calls_count == len(LDO_ALLOCATIONS) + 3
+
+    assert eth_to_ldo_rate == ETH_TO_LDO_RATE
+    assert allocations_total == sum(LDO_ALLOCATIONS)
+
+    for i in range(0, len(LDO_ALLOCATIONS)):
+        expected_cost = LDO_ALLOCATIONS[i] * ETH_TO_LDO_RATE_PRECISION // ETH_TO_LDO_RATE
+        assert allocations[i] == (LDO_ALLOCATIONS[i], expected_cost)
+
+    assert allocations[-1] == (0, 0)
+
+
+def test_reads_are_split_into_batches_of_given_size(accounts, executor):
+    transport = StubTransport()
+    reader = BatchReader(transport=transport, batch_size=2)
+
+    for i in range(0, len(LDO_ALLOCATIONS)):
+        reader.add(executor.get_allocation, accounts[i])
+
+    allocations = reader.execute()
+
+    assert transport.requests_count == 2
+    assert [a[0] for a in allocations] == LDO_ALLOCATIONS
+
+
+def test_batch_request_raises_on_error_response():
+    def transport(payload):
+        return [{'jsonrpc': '2.0', 'id': item['id'], 'error': {'code': -32000, 'message': 'boom'}} for item in payload]
+
+    with pytest.raises(ValueError):
+        batch_request([('eth_blockNumber', [])], transport=transport)
+
+
+def test_batch_request_returns_errors_per_item():
+    def transport(payload):
+        return [
+            {'jsonrpc': '2.0', 'id': item['id'], 'error': {'code': -32000, 'message': 'boom'}}
+            if item['method'] == 'eth_sendTransaction'
+            else {'jsonrpc': '2.0', 'id': item['id'], 'result': '0x1'}
+            for item in payload
+        ]
+
+    results = batch_request([('eth_blockNumber', []), ('eth_sendTransaction', [{}]), ('eth_chainId', [])], transport=transport, return_errors=True)
+
+    assert results[0] == '0x1'
+    assert isinstance(results[1], RpcError)
+    assert results[1].message == 'boom'
+    assert results[2] == '0x1'
+
+
+def test_batch_request_raises_when_the_whole_batch_is_rejected():
+    def transport(payload):
+        return {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32005, 'message': 'rate limit exceeded'}}
+
+    with pytest.raises(RpcError) as error:
+        batch_request([('eth_blockNumber', []), ('eth_chainId', [])], transport=transport, return_errors=True)
+
+    assert error.value.message == 'rate limit exceeded'
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from purchase_config import InvalidPurchasersError
+from scripts.check_fleet import load_manifest
+from scripts.deploy import deploy
+
+PURCHASER_1 = '0x09F82Ccd6baE2AeBe46bA7dd2cf08d87355ac430'
+PURCHASER_2 = '0x9B5ea8C719e29A5bd0959FaF79C9E5c8206d0499'
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18
+]
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+@pytest.fixture(scope='module')
+def executor(ldo_holder):
+    return deploy(
+        {'from': ldo_holder},
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=[ (PURCHASER_1, LDO_ALLOCATIONS[0]), (PURCHASER_2, LDO_ALLOCATIONS[1]) ],
+        allocations_total=sum(LDO_ALLOCATIONS)
+    )
+
+
+def write_manifest(tmp_path, item):
+    (tmp_path / 'purchasers.csv').write_text(f'{PURCHASER_1},{LDO_ALLOCATIONS[0]}\n{PURCHASER_2},{LDO_ALLOCATIONS[1]}\n')
+    manifest_path = tmp_path / 'fleet.json'
+    manifest_path.write_text(json.dumps({'executors': [item]}))
+    return str(manifest_path)
+
+
+def make_item(executor, **fields):
+    # the values are strings, as in the manifests written by deploy_sharded
+    return {
+        'name': 'main offer',
+        'address': executor.address,
+        'eth_to_ldo_rate': str(ETH_TO_LDO_RATE),
+        'vesting_start_delay': str(VESTING_START_DELAY),
+        'vesting_end_delay': str(VESTING_END_DELAY),
+        'offer_expiration_delay': str(OFFER_EXPIRATION_DELAY),
+        'allocations_total': str(sum(LDO_ALLOCATIONS)),
+        **fields
+    }
+
+
+def test_csv_purchasers_are_loaded_with_string_total(tmp_path, executor):
+    [entry] = load_manifest(write_manifest(tmp_path, make_item(executor, purchasers_csv='purchasers.csv')))
+
+    assert entry['name'] == 'main offer'
+    assert entry['contract_name'] == 'PurchaseExecutor'
+    assert entry['executor'].address == executor.address
+    assert list(entry['allocation_table'].addresses) == [PURCHASER_1, PURCHASER_2]
+    assert entry['config'] == {
+        'eth_to_ldo_rate': ETH_TO_LDO_RATE,
+        'vesting_start_delay': VESTING_START_DELAY,
+        'vesting_end_delay': VESTING_END_DELAY,
+        'offer_expiration_delay': OFFER_EXPIRATION_DELAY
+    }
+
+
+def test_inline_purchasers_are_loaded_with_string_total(tmp_path, executor):
+    purchasers = [ [PURCHASER_1.lower(), str(LDO_ALLOCATIONS[0])], [PURCHASER_2.lower(), str(LDO_ALLOCATIONS[1])] ]
+    [entry] = load_manifest(write_manifest(tmp_path, make_item(executor, purchasers=purchasers)))
+
+    assert list(entry['allocation_table'].addresses) == [PURCHASER_1, PURCHASER_2]
+    assert list(entry['allocation_table'].allocations) == LDO_ALLOCATIONS
+
+
+def test_allocations_total_is_optional(tmp_path, executor):
+    item = make_item(executor, purchasers_csv='purchasers.csv')
+    del item['allocations_total']
+
+    [entry] = load_manifest(write_manifest(tmp_path, item))
+
+    assert entry['allocation_table'].allocations_total == sum(LDO_ALLOCATIONS)
+
+
+def test_invalid_totals_are_rejected(tmp_path, executor):
+    with pytest.raises(InvalidPurchasersError):
+        load_manifest(write_manifest(tmp_path, make_item(executor, purchasers_csv='purchasers.csv', allocations_total='1')))
+
+    purchasers = [ [PURCHASER_1, str(LDO_ALLOCATIONS[0])] ]
+    with pytest.raises(ValueError):
+        load_manifest(write_manifest(tmp_path, make_item(executor, purchasers=purchasers)))
+
+
+def test_invalid_inline_purchasers_are_reported(tmp_path, executor):
+    purchasers = [
+        [PURCHASER_1, str(LDO_ALLOCATIONS[0])],
+        [PURCHASER_1.lower(), str(LDO_ALLOCATIONS[1])],
+        [PURCHASER_2, '0'],
+        ['0x1234', '1'],
+        ['0x' + '11' * 20, 1.5]
+    ]
+    item = make_item(executor, purchasers=purchasers)
+    del item['allocations_total']
+
+    with pytest.raises(InvalidPurchasersError) as exc_info:
+        load_manifest(write_manifest(tmp_path, item))
+
+    assert exc_info.value.errors == [
+        (2, f'duplicate purchaser {PURCHASER_1}, first seen on line 1'),
+        (3, 'allocation is not positive: 0'),
+        (4, 'invalid address: 0x1234'),
+        (5, 'allocation is not an integer: 1.5')
+    ]
@@ -0,0 +1,67 @@
+from utils.checkpoint import Checkpoint
+
+
+KEY = {'executor': '0xabc', 'fork_block': 100, 'vote_ids': [64]}
+
+
+def test_progress_is_resumed_with_the_same_key(tmp_path):
+    path = str(tmp_path / 'check.checkpoint.json')
+
+    checkpoint = Checkpoint(path, KEY)
+    assert not checkpoint.resumed
+    checkpoint.set('0x1', {'status': 'reverted'})
+    checkpoint.flush()
+
+    resumed = Checkpoint(path, KEY)
+    assert resumed.resumed
+    assert '0x1' in resumed
+    assert resumed.get('0x1') == {'status': 'reverted'}
+
+
+def test_progress_is_discarded_with_another_key(tmp_path):
+    path = str(tmp_path / 'check.checkpoint.json')
+
+    checkpoint = Checkpoint(path, KEY)
+    checkpoint.set('0x1', {'status': 'reverted'})
+    checkpoint.flush()
+
+    other = Checkpoint(path, {**KEY, 'fork_block': 200})
+    assert not other.resumed
+    assert '0x1' not in other
+
+
+def test_remove(tmp_path):
+    path = tmp_path / 'check.checkpoint.json'
+
+    checkpoint = Checkpoint(str(path), KEY)
+    checkpoint.set('0x1', {'status': 'executed'})
+    checkpoint.flush()
+    assert path.exists()
+
+    checkpoint.remove()
+    assert not path.exists()
+
+
+def test_in_memory_checkpoint(tmp_path):
+    checkpoint = Checkpoint(None, None)
+    checkpoint.set('0x1', {'status': 'reverted'})
+    assert '0x1' in checkpoint
+    checkpoint.remove()
+
+
+def test_progress_is_saved_in_batches(tmp_path):
+    path = tmp_path / 'check.checkpoint.json'
+
+    checkpoint = Checkpoint(str(path), KEY, save_every=3)
+    checkpoint.set('0x1', {'status': 'reverted'})
+    checkpoint.set('0x2', {'status': 'reverted'})
+    assert not path.exists()
+
+    checkpoint.set('0x3', {'status': 'reverted'})
+    assert len(Checkpoint(str(path), KEY).items) == 3
+
+    checkpoint.set('0x4', {'status': 'executed'})
+    assert len(Checkpoint(str(path), KEY).items) == 3
+
+    checkpoint.flush()
+    assert Checkpoint(str(path), KEY).get('0x4') == {'status': 'executed'}
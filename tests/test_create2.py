@@ -0,0 +1,109 @@
+from brownie import web3
+
+from scripts.deploy import deploy_executor_factory, deploy_create2, deploy_create2_and_start_dao_vote, get_create2_executor_address
+from utils.create2 import get_create2_address, get_blueprint_deploy_code, encode_constructor_args, decode_constructor_args, BLUEPRINT_PREAMBLE
+from utils.evm_script import strip_byte_prefix
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+def test_create2_address_matches_eip_1014_examples():
+    assert get_create2_address('0x' + '00' * 20, b'\0' * 32, '0x00') == '0x4D1A2e2bB4F88F0250f26Ffff098B0b30B26BF38'
+    assert get_create2_address(
+        '0xdeadbeef00000000000000000000000000000000',
+        '0x000000000000000000000000feed000000000000000000000000000000000000',
+        '0x00'
+    ) == '0xD04116cDd17beBE565EB2422F2497E06cC1C9833'
+
+
+def test_blueprint_deploy_code():
+    code = get_blueprint_deploy_code('0x6001')
+    assert code[0:1] == b'\x61'
+    assert int.from_bytes(code[1:3], 'big') == len(BLUEPRINT_PREAMBLE) + 2
+    assert code[10:] == BLUEPRINT_PREAMBLE + b'\x60\x01'
+
+
+def test_constructor_args_take_a_word_each():
+    args = encode_constructor_args(1, 2, 3, 4, ['0x' + '11' * 20] * 50, [5] * 50, 250)
+    assert len(args) == 32 * (4 + 50 + 50 + 1)
+    assert args[4 * 32:5 * 32] == b'\0' * 12 + b'\x11' * 20
+
+
+def test_constructor_args_are_decoded():
+    recipients = [ web3.toChecksumAddress('0x' + f'{i + 1:02x}' * 20) for i in range(50) ]
+    allocations = list(range(1, 51))
+    args = encode_constructor_args(1, 2, 3, 4, recipients, allocations, sum(allocations))
+    assert decode_constructor_args(args) == (1, 2, 3, 4, recipients, allocations, sum(allocations))
+
+
+def test_executor_is_deployed_at_precomputed_address(accounts, ldo_holder, ldo_token, dao_acl, dao_token_manager, helpers, PurchaseExecutor):
+    ldo_purchasers = [ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ]
+    factory = deploy_executor_factory({'from': ldo_holder})
+
+    expected_address = get_create2_executor_address(
+        factory_address=factory.address,
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=ldo_purchasers,
+        allocations_total=sum(LDO_ALLOCATIONS)
+    )
+    assert len(web3.eth.get_code(expected_address)) == 0
+
+    (executor, vote_id) = deploy_create2_and_start_dao_vote(
+        {'from': ldo_holder},
+        factory=factory,
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=ldo_purchasers,
+        allocations_total=sum(LDO_ALLOCATIONS)
+    )
+
+    assert executor.address == expected_address
+    assert strip_byte_prefix(web3.eth.get_code(executor.address).hex()) == strip_byte_prefix(PurchaseExecutor._build['deployedBytecode'])
+    assert executor.eth_to_ldo_rate() == ETH_TO_LDO_RATE
+    assert executor.ldo_allocations_total() == sum(LDO_ALLOCATIONS)
+
+    helpers.pass_and_exec_dao_vote(vote_id)
+
+    assert ldo_token.balanceOf(executor) == sum(LDO_ALLOCATIONS)
+    assert dao_acl.hasPermission(executor, dao_token_manager, dao_token_manager.ASSIGN_ROLE())
+
+
+def test_executor_deployed_by_someone_else_is_reused(accounts, ldo_holder, stranger, ldo_token, helpers):
+    ldo_purchasers = [ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ]
+    factory = deploy_executor_factory({'from': ldo_holder})
+    config = dict(
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=ldo_purchasers,
+        allocations_total=sum(LDO_ALLOCATIONS)
+    )
+
+    # the factory is permissionless, so anyone can deploy the same config first
+    deploy_tx = deploy_create2({'from': stranger}, factory=factory, **config)
+    front_run_address = deploy_tx.events['ExecutorDeployed']['executor']
+
+    (executor, vote_id) = deploy_create2_and_start_dao_vote({'from': ldo_holder}, factory=factory, **config)
+
+    assert executor.address == front_run_address
+
+    helpers.pass_and_exec_dao_vote(vote_id)
+
+    assert ldo_token.balanceOf(executor) == sum(LDO_ALLOCATIONS)
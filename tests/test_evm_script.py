@@ -0,0 +1,48 @@
+import pytest
+
+from utils.evm_script import EMPTY_CALLSCRIPT, encode_call_script, decode_call_script
+
+TARGET_1 = '0xB9E5CBB9CA5b0d659238807E84D0176930753d86'
+TARGET_2 = '0x9895F0F17cc1d1891b6f18ee0b483B6f221b37Bb'
+
+
+def test_call_script_encoding():
+    script = encode_call_script([
+        (TARGET_1, '0xdeadbeef'),
+        (TARGET_2, '0x')
+    ])
+    assert script == (
+        '0x00000001' +
+        TARGET_1[2:].lower() + '00000004' + 'deadbeef' +
+        TARGET_2[2:].lower() + '00000000'
+    )
+
+
+def test_empty_call_script():
+    assert encode_call_script([]) == EMPTY_CALLSCRIPT
+    assert decode_call_script(EMPTY_CALLSCRIPT) == []
+
+
+def test_call_script_round_trip():
+    actions = [ (TARGET_1 if i % 2 else TARGET_2, '0x' + 'ab' * i) for i in range(0, 300) ]
+    decoded = decode_call_script(encode_call_script(actions))
+    assert decoded == [ (to.lower(), calldata) for (to, calldata) in actions ]
+
+
+def test_bytes_are_accepted():
+    script = encode_call_script([(bytes.fromhex(TARGET_1[2:]), b'\x01\x02')])
+    assert decode_call_script(script) == [(TARGET_1.lower(), '0x0102')]
+
+
+def test_invalid_call_scripts_are_rejected():
+    with pytest.raises(ValueError):
+        encode_call_script([('0x1234', '0x')])
+
+    with pytest.raises(ValueError):
+        decode_call_script('0x00000002')
+
+    with pytest.raises(ValueError):
+        decode_call_script('0x00000001' + TARGET_1[2:])
+
+    with pytest.raises(ValueError):
+        decode_call_script('0x00000001' + TARGET_1[2:] + '00000004' + 'dead')
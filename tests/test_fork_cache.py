@@ -0,0 +1,102 @@
+import json
+import threading
+from urllib import request
+
+from utils.fork_cache import CachingRpcProxy, ForkStateCache, make_server
+
+FORK_BLOCK = 12_000_000
+ADDRESS = '0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32'
+
+
+class StubUpstream:
+    def __init__(self):
+        self.requests = []
+        self.calls = 0
+
+    def __call__(self, payload):
+        self.calls += 1
+        self.requests.extend(payload)
+        return [ {'jsonrpc': '2.0', 'id': item['id'], 'result': f'0x{len(self.requests):x}'} for item in payload ]
+
+
+def make_request(method, *params):
+    return {'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': list(params)}
+
+
+def test_state_at_fork_block_is_cached(tmp_path):
+    upstream = StubUpstream()
+    proxy = CachingRpcProxy(ForkStateCache(str(tmp_path / 'cache.sqlite')), FORK_BLOCK, upstream)
+
+    req = make_request('eth_getStorageAt', ADDRESS, '0x0', hex(FORK_BLOCK))
+    first = proxy.handle(req)
+    second = proxy.handle(make_request('eth_getStorageAt', ADDRESS.lower(), '0x0', hex(FORK_BLOCK)))
+
+    assert first['result'] == second['result']
+    assert upstream.calls == 1
+    assert (proxy.hits, proxy.misses) == (1, 1)
+
+
+def test_latest_state_is_not_cached(tmp_path):
+    upstream = StubUpstream()
+    proxy = CachingRpcProxy(ForkStateCache(str(tmp_path / 'cache.sqlite')), FORK_BLOCK, upstream)
+
+    proxy.handle(make_request('eth_getBalance', ADDRESS, 'latest'))
+    proxy.handle(make_request('eth_getBalance', ADDRESS, 'latest'))
+    proxy.handle(make_request('eth_getBalance', ADDRESS, hex(FORK_BLOCK + 1)))
+
+    assert upstream.calls == 3
+
+
+def test_batch_misses_are_forwarded_together(tmp_path):
+    upstream = StubUpstream()
+    proxy = CachingRpcProxy(ForkStateCache(str(tmp_path / 'cache.sqlite')), FORK_BLOCK, upstream)
+
+    proxy.handle(make_request('eth_getCode', ADDRESS, hex(FORK_BLOCK)))
+
+    responses = proxy.handle([
+        {**make_request('eth_getCode', ADDRESS, hex(FORK_BLOCK)), 'id': 10},
+        {**make_request('eth_getBalance', ADDRESS, hex(FORK_BLOCK)), 'id': 11},
+        {**make_request('eth_getTransactionCount', ADDRESS, hex(FORK_BLOCK)), 'id': 12},
+        {**make_request('eth_blockNumber'), 'id': 13}
+    ])
+
+    assert [ r['id'] for r in responses ] == [10, 11, 12, 13]
+    assert responses[3]['result'] == hex(FORK_BLOCK)
+    assert upstream.calls == 2
+    assert [ r['method'] for r in upstream.requests ] == ['eth_getCode', 'eth_getBalance', 'eth_getTransactionCount']
+
+
+def test_warm_cache_works_offline(tmp_path):
+    db_path = str(tmp_path / 'cache.sqlite')
+    req = make_request('eth_getStorageAt', ADDRESS, '0x1', hex(FORK_BLOCK))
+
+    online_proxy = CachingRpcProxy(ForkStateCache(db_path), FORK_BLOCK, StubUpstream())
+    expected_result = online_proxy.handle(req)['result']
+    online_proxy.cache.close()
+
+    offline_proxy = CachingRpcProxy(ForkStateCache(db_path), FORK_BLOCK)
+    assert offline_proxy.handle(req)['result'] == expected_result
+    assert 'error' in offline_proxy.handle(make_request('eth_getStorageAt', ADDRESS, '0x2', hex(FORK_BLOCK)))
+
+    other_block_proxy = CachingRpcProxy(ForkStateCache(db_path), FORK_BLOCK + 1)
+    assert 'error' in other_block_proxy.handle(req)
+
+
+def test_proxy_is_served_over_http(tmp_path):
+    upstream = StubUpstream()
+    proxy = CachingRpcProxy(ForkStateCache(str(tmp_path / 'cache.sqlite')), FORK_BLOCK, upstream)
+    server = make_server(proxy)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}'
+        payload = json.dumps(make_request('eth_chainId')).encode()
+        for _ in range(2):
+            req = request.Request(url, data=payload, headers={'Content-Type': 'application/json'})
+            with request.urlopen(req) as response:
+                assert json.loads(response.read())['result'] == '0x1'
+    finally:
+        server.shutdown()
+
+    assert upstream.calls == 1
@@ -18,15 +18,16 @@ VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
 OFFER_EXPIRATION_DELAY = 2629746 # one month
 
 
-@pytest.fixture(scope='function')
-def executor(accounts, deploy_executor_and_pass_dao_vote):
-    executor = deploy_executor_and_pass_dao_vote(
+@pytest.fixture(scope='module')
+def executor(accounts, executor_contract, executor_snapshot):
+    executor = executor_snapshot(
         eth_to_ldo_rate=ETH_TO_LDO_RATE,
         vesting_start_delay=VESTING_START_DELAY,
         vesting_end_delay=VESTING_END_DELAY,
         offer_expiration_delay=OFFER_EXPIRATION_DELAY,
         ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
-        allocations_total=sum(LDO_ALLOCATIONS)
+        allocations_total=sum(LDO_ALLOCATIONS),
+        executor_contract=executor_contract
     )
     executor.start({ 'from': accounts[0] })
     return executor
@@ -0,0 +1,128 @@
+import pytest
+from brownie import reverts
+
+from purchase_config import ETH_TO_LDO_RATE_PRECISION
+from scripts.deploy import deploy_merkle_and_start_dao_vote
+from utils.merkle import AllocationsMerkleTree, get_leaf, verify_proof
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+def make_purchasers(count):
+    return [ (f'0x{i + 1:040x}', (i + 1) * 10**18) for i in range(count) ]
+
+
+@pytest.mark.parametrize('count', [1, 2, 3, 7, 8, 100])
+def test_proofs_are_valid_for_all_purchasers(count):
+    ldo_purchasers = make_purchasers(count)
+    tree = AllocationsMerkleTree(ldo_purchasers)
+
+    assert len(tree) == count
+    assert tree.allocations_total == sum(p[1] for p in ldo_purchasers)
+
+    for (address, allocation) in ldo_purchasers:
+        proof = tree.get_proof(address)
+        assert verify_proof(get_leaf(address, allocation), proof, tree.root)
+        assert not verify_proof(get_leaf(address, allocation + 1), proof, tree.root)
+
+
+def test_duplicate_purchasers_are_rejected():
+    with pytest.raises(AssertionError):
+        AllocationsMerkleTree(make_purchasers(2) + make_purchasers(1))
+
+
+@pytest.fixture(scope='module')
+def executor_and_tree(module_isolation, accounts, ldo_holder, helpers):
+    (executor, tree, vote_id) = deploy_merkle_and_start_dao_vote(
+        {'from': ldo_holder},
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ]
+    )
+    helpers.pass_and_exec_dao_vote(vote_id)
+    executor.start({ 'from': accounts[0] })
+    return (executor, tree)
+
+
+def test_executor_config_is_correct(executor_and_tree):
+    (executor, tree) = executor_and_tree
+
+    assert executor.allocations_merkle_root() == '0x' + tree.root.hex()
+    assert executor.ldo_allocations_total() == sum(LDO_ALLOCATIONS)
+    assert executor.eth_to_ldo_rate() == ETH_TO_LDO_RATE
+    assert executor.offer_expires_at() == executor.offer_started_at() + OFFER_EXPIRATION_DELAY
+
+
+def test_purchase_with_proof(accounts, executor_and_tree, helpers, ldo_token, dao_token_manager):
+    (executor, tree) = executor_and_tree
+    purchaser = accounts[1]
+    purchase_ldo_amount = LDO_ALLOCATIONS[1]
+    proof = tree.get_proof(purchaser.address)
+
+    eth_cost = purchase_ldo_amount * ETH_TO_LDO_RATE_PRECISION // ETH_TO_LDO_RATE
+    assert executor.get_allocation(purchase_ldo_amount, proof, purchaser) == (purchase_ldo_amount, eth_cost)
+
+    helpers.fund_with_eth(purchaser, eth_cost)
+
+    tx = executor.execute_purchase(purchase_ldo_amount, proof, { 'from': purchaser, 'value': eth_cost })
+    purchase_evt = helpers.assert_single_event_named('PurchaseExecuted', tx)
+
+    assert purchase_evt['ldo_receiver'] == purchaser
+    assert purchase_evt['ldo_allocation'] == purchase_ldo_amount
+    assert ldo_token.balanceOf(purchaser) == purchase_ldo_amount
+
+    vesting = dao_token_manager.getVesting(purchaser, purchase_evt['vesting_id'])
+    assert vesting['amount'] == purchase_ldo_amount
+    assert vesting['start'] == tx.timestamp + VESTING_START_DELAY
+    assert vesting['vesting'] == tx.timestamp + VESTING_END_DELAY
+
+    assert executor.purchased(purchaser)
+    assert executor.get_allocation(purchase_ldo_amount, proof, purchaser) == (0, 0)
+
+    with reverts('no allocation'):
+        executor.execute_purchase(purchase_ldo_amount, proof, { 'from': purchaser, 'value': eth_cost })
+
+
+def test_purchase_with_wrong_allocation_fails(accounts, executor_and_tree, helpers):
+    (executor, tree) = executor_and_tree
+    purchaser = accounts[0]
+    proof = tree.get_proof(purchaser.address)
+    wrong_amount = LDO_ALLOCATIONS[0] * 2
+
+    eth_cost = wrong_amount * ETH_TO_LDO_RATE_PRECISION // ETH_TO_LDO_RATE
+    helpers.fund_with_eth(purchaser, eth_cost)
+
+    with reverts('no allocation'):
+        executor.execute_purchase(wrong_amount, proof, { 'from': purchaser, 'value': eth_cost })
+
+
+def test_proof_of_another_purchaser_fails(accounts, executor_and_tree, helpers):
+    (executor, tree) = executor_and_tree
+    stranger = accounts[5]
+    proof = tree.get_proof(accounts[0].address)
+
+    eth_cost = LDO_ALLOCATIONS[0] * ETH_TO_LDO_RATE_PRECISION // ETH_TO_LDO_RATE
+    helpers.fund_with_eth(stranger, eth_cost)
+
+    with reverts('no allocation'):
+        executor.execute_purchase(LDO_ALLOCATIONS[0], proof, { 'from': stranger, 'value': eth_cost })
+
+
+def test_plain_transfers_are_rejected(accounts, executor_and_tree):
+    (executor, _) = executor_and_tree
+
+    with reverts():
+        accounts[0].transfer(to=executor, amount=10**18, gas_limit=400_000)
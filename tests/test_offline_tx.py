@@ -0,0 +1,92 @@
+from eth_account import Account
+
+from scripts.deploy import deploy, encode_vesting_manager_evm_script
+from utils.evm_script import encode_call_script, to_bytes
+from utils.offline_tx import (
+    get_create_address,
+    encode_vesting_manager_calls,
+    build_deploy_and_vote_txs,
+    sign_bundle
+)
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+PRIVATE_KEY = '0x' + '42' * 32
+
+
+def test_create_address_matches_deployment(accounts):
+    deployer = accounts[0]
+    expected_address = get_create_address(deployer.address, deployer.nonce)
+
+    executor = deploy(
+        tx_params={'from': deployer},
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
+        allocations_total=sum(LDO_ALLOCATIONS)
+    )
+
+    assert executor.address == expected_address
+
+
+def test_create_address_of_small_nonces():
+    # the nonce is RLP-encoded as an empty string, a single byte or a length-prefixed string
+    addresses = [ get_create_address('0x6ac7ea33f8831ea9dcc53393aaa88b25a785dbf0', nonce) for nonce in (0, 1, 0x7f, 0x80, 0x1234) ]
+    assert addresses[0] == '0xcd234A471b72ba2F1Ccf0A70FCABA648a5eeCD8d'
+    assert addresses[1] == '0x343c43A37D37dfF08AE8C4A11544c718AbB4fCF8'
+    assert len(set(addresses)) == len(addresses)
+
+
+def test_vote_script_matches_online_encoding(accounts):
+    manager_address = accounts[3].address
+
+    online_script = encode_vesting_manager_evm_script(
+        manager_address=manager_address,
+        total_ldo_amount=sum(LDO_ALLOCATIONS),
+        ldo_transfer_reference='Transfer LDO tokens to be sold for ETH'
+    )
+    offline_script = encode_call_script(encode_vesting_manager_calls(
+        manager_address=manager_address,
+        total_ldo_amount=sum(LDO_ALLOCATIONS),
+        ldo_transfer_reference='Transfer LDO tokens to be sold for ETH'
+    ))
+
+    assert to_bytes(offline_script) == to_bytes(online_script)
+
+
+def test_bundle_is_signed_with_consecutive_nonces(accounts):
+    sender = Account.from_key(PRIVATE_KEY).address
+
+    (txs, executor_address) = build_deploy_and_vote_txs(
+        sender=sender,
+        nonce=7,
+        chain_id=1,
+        fees={'max_fee': 100 * 10**9, 'priority_fee': 2 * 10**9},
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=[ (accounts[i].address, LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
+        allocations_total=sum(LDO_ALLOCATIONS)
+    )
+    bundle = sign_bundle(txs, PRIVATE_KEY, 1, {'executor_address': executor_address})
+
+    assert executor_address == get_create_address(sender, 7)
+    assert bundle['from'] == sender
+    assert [ tx['nonce'] for tx in bundle['transactions'] ] == [7, 8]
+    assert bundle['transactions'][0]['to'] is None
+    for tx in bundle['transactions']:
+        assert Account.recover_transaction(tx['raw']) == sender
@@ -0,0 +1,54 @@
+from utils.parallel_tests import collect_test_ids, shard_test_ids, make_worker_config
+
+
+def test_shards_are_contiguous_and_balanced():
+    test_ids = [ f'tests/test_a.py::test_{i}' for i in range(7) ]
+
+    shards = shard_test_ids(test_ids, 3)
+
+    assert [ len(shard) for shard in shards ] == [3, 2, 2]
+    assert sum(shards, []) == test_ids
+
+
+def test_no_more_shards_than_tests():
+    assert shard_test_ids(['tests/test_a.py::test_1'], 4) == [['tests/test_a.py::test_1']]
+    assert shard_test_ids(['tests/test_a.py::test_1', 'tests/test_a.py::test_2'], 0) == [['tests/test_a.py::test_1', 'tests/test_a.py::test_2']]
+
+
+def test_no_tests_make_no_shards():
+    assert shard_test_ids([], 4) == []
+
+
+def test_test_functions_and_methods_are_collected(tmp_path):
+    (tmp_path / 'test_b.py').write_text(
+        'def test_first():\n    pass\n\n'
+        'def helper():\n    pass\n\n'
+        'async def test_async():\n    pass\n\n'
+        'class TestGroup:\n    def test_method(self):\n        pass\n\n    def helper(self):\n        pass\n\n'
+        'class Helper:\n    def test_ignored(self):\n        pass\n'
+    )
+    (tmp_path / 'test_a.py').write_text('def test_second():\n    pass\n')
+    (tmp_path / 'conftest.py').write_text('def test_not_a_test_module():\n    pass\n')
+
+    assert collect_test_ids(str(tmp_path)) == [
+        'tests/test_a.py::test_second',
+        'tests/test_b.py::test_first',
+        'tests/test_b.py::test_async',
+        'tests/test_b.py::TestGroup::test_method'
+    ]
+
+
+def test_worker_config_only_changes_port_and_fork():
+    config = {
+        'networks': {
+            'development': {'cmd': 'ganache-cli', 'cmd_settings': {'port': 8545, 'accounts': 10}},
+            'default': 'development'
+        }
+    }
+
+    worker_config = make_worker_config(config, 'development', 8547, 'http://node@123')
+
+    assert worker_config['networks']['development']['cmd_settings'] == {'port': 8547, 'accounts': 10, 'fork': 'http://node@123'}
+    assert worker_config['networks']['default'] == 'development'
+    assert config['networks']['development']['cmd_settings'] == {'port': 8545, 'accounts': 10}
+    assert 'fork' not in make_worker_config(config, 'development', 8547, None)['networks']['development']['cmd_settings']
@@ -0,0 +1,73 @@
+import pytest
+
+from scripts.check_deployment import check_purchases_pipelined
+from utils.allocation_table import AllocationTable
+from utils.batch_reads import http_transport
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+@pytest.fixture(scope='module')
+def executor(accounts, executor_snapshot):
+    executor = executor_snapshot(
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
+        allocations_total=sum(LDO_ALLOCATIONS)
+    )
+    executor.start({ 'from': accounts[0] })
+    return executor
+
+
+@pytest.fixture(scope='module')
+def allocation_table(accounts):
+    return AllocationTable.build([ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ], ETH_TO_LDO_RATE)
+
+
+def make_underpaying_transport(purchaser):
+    # sends 1 wei instead of the purchase cost from the given purchaser, so that its purchase reverts
+    def transport(payload):
+        for item in payload:
+            if item['method'] == 'eth_sendTransaction' and item['params'][0]['from'].lower() == purchaser.lower():
+                item['params'][0]['value'] = hex(1)
+        return http_transport(payload)
+    return transport
+
+
+def test_pipelined_purchases_succeed(accounts, executor, allocation_table, ldo_token, helpers):
+    check_purchases_pipelined(executor, allocation_table, ldo_token, helpers.eth_banker)
+
+    for i in range(0, len(LDO_ALLOCATIONS)):
+        assert ldo_token.balanceOf(accounts[i]) == LDO_ALLOCATIONS[i]
+
+
+def test_reverted_purchase_is_reported_without_stopping_the_others(accounts, executor, allocation_table, ldo_token, helpers):
+    failing_purchaser = accounts[1].address
+
+    with pytest.raises(AssertionError) as error:
+        check_purchases_pipelined(executor, allocation_table, ldo_token, helpers.eth_banker, transport=make_underpaying_transport(failing_purchaser))
+
+    assert str(error.value) == f'purchases failed for purchasers: {failing_purchaser}'
+    assert ldo_token.balanceOf(accounts[0]) == LDO_ALLOCATIONS[0]
+    assert ldo_token.balanceOf(accounts[1]) == 0
+    assert ldo_token.balanceOf(accounts[2]) == LDO_ALLOCATIONS[2]
+
+
+def test_eth_banker_must_not_be_a_purchaser(accounts, executor, allocation_table, ldo_token):
+    with pytest.raises(AssertionError) as error:
+        check_purchases_pipelined(executor, allocation_table, ldo_token, accounts[0])
+
+    assert str(error.value) == f'the ETH banker {accounts[0].address} is one of the purchasers'
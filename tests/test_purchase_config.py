@@ -0,0 +1,117 @@
+import pytest
+
+from purchase_config import (
+    ALLOCATIONS_TOTAL,
+    ETH_TO_LDO_RATE,
+    ETH_TO_LDO_RATE_PRECISION,
+    InvalidPurchasersError,
+    get_allocation_table,
+    get_ldo_purchasers,
+    read_csv_purchasers
+)
+from utils.allocation_table import AllocationTable
+
+PURCHASER_1 = '0x09F82Ccd6baE2AeBe46bA7dd2cf08d87355ac430'
+PURCHASER_2 = '0x9B5ea8C719e29A5bd0959FaF79C9E5c8206d0499'
+PURCHASER_3 = '0x91e4f4bC6aE705Eb4e939C147133558c0f906Eeb'
+
+
+def write_csv(tmp_path, lines):
+    filename = tmp_path / 'purchasers.csv'
+    filename.write_text('\n'.join(lines) + '\n')
+    return str(filename)
+
+
+def test_purchasers_are_loaded_once_and_cached():
+    purchasers = get_ldo_purchasers()
+    assert sum([ p[1] for p in purchasers ]) == ALLOCATIONS_TOTAL
+    assert get_ldo_purchasers() is purchasers
+
+
+def test_purchasers_are_read_and_checksummed(tmp_path):
+    filename = write_csv(tmp_path, [
+        f'{PURCHASER_1.lower()},100',
+        f'{PURCHASER_2}, 200'
+    ])
+    assert read_csv_purchasers(filename, allocations_total=300) == [
+        (PURCHASER_1, 100),
+        (PURCHASER_2, 200)
+    ]
+
+
+def test_all_invalid_rows_are_reported(tmp_path):
+    bad_checksum = PURCHASER_3[:-1] + PURCHASER_3[-1].upper()
+    filename = write_csv(tmp_path, [
+        f'{PURCHASER_1},100',
+        f'{PURCHASER_1},100',
+        f'{bad_checksum},100',
+        f'{PURCHASER_2},0',
+        f'{PURCHASER_3},1.5',
+        f'{PURCHASER_3}'
+    ])
+
+    with pytest.raises(InvalidPurchasersError) as exc_info:
+        read_csv_purchasers(filename, allocations_total=100)
+
+    assert [ line_num for (line_num, _) in exc_info.value.errors ] == [2, 3, 4, 5, 6]
+
+
+def test_bad_checksum_is_told_apart_from_a_malformed_address(tmp_path):
+    bad_checksum = PURCHASER_3[:-1] + PURCHASER_3[-1].upper()
+    filename = write_csv(tmp_path, [
+        f'{bad_checksum},100',
+        f'{PURCHASER_1[:-1]},100',
+        f'{PURCHASER_2.upper().replace("0X", "0x")},100'
+    ])
+
+    with pytest.raises(InvalidPurchasersError) as exc_info:
+        read_csv_purchasers(filename, allocations_total=100)
+
+    # the all-uppercase address carries no checksum and is accepted
+    assert exc_info.value.errors == [
+        (1, f'invalid address checksum: {bad_checksum}'),
+        (2, f'invalid address: {PURCHASER_1[:-1]}')
+    ]
+
+
+def test_wrong_allocations_total_is_reported(tmp_path):
+    filename = write_csv(tmp_path, [
+        f'{PURCHASER_1},100',
+        f'{PURCHASER_2},200'
+    ])
+
+    with pytest.raises(InvalidPurchasersError) as exc_info:
+        read_csv_purchasers(filename, allocations_total=301)
+
+    assert exc_info.value.errors == [(None, 'invalid allocations sum: expected 301, actual 300')]
+
+
+def test_allocation_table_matches_purchasers_and_config():
+    table = get_allocation_table()
+    purchasers = get_ldo_purchasers()
+
+    assert table.addresses == tuple(p[0] for p in purchasers)
+    assert table.allocations == tuple(p[1] for p in purchasers)
+    assert table.allocations_total == ALLOCATIONS_TOTAL
+    assert get_allocation_table() is table
+
+    for row in table:
+        assert row.eth_cost == row.allocation * ETH_TO_LDO_RATE_PRECISION // ETH_TO_LDO_RATE
+        assert row.dust == row.allocation * ETH_TO_LDO_RATE_PRECISION - row.eth_cost * ETH_TO_LDO_RATE
+
+    assert table.eth_costs_total == sum(table.eth_costs)
+
+
+def test_allocation_table_can_be_rebuilt_for_another_rate():
+    table = AllocationTable.build([(PURCHASER_1, 10**18), (PURCHASER_2, 3 * 10**18 + 1)], 3 * 10**18)
+
+    assert table.eth_costs == (333333333333333333, 10**18)
+    assert table.eth_costs_running_totals == (333333333333333333, 1333333333333333333)
+    assert table.allocations_running_totals == (10**18, 4 * 10**18 + 1)
+    assert table.index_of(PURCHASER_2) == 1
+
+    what_if = table.with_rate(10**18)
+
+    assert what_if.eth_costs == table.allocations
+    assert what_if.dust_total == 0
+    assert table.eth_costs == (333333333333333333, 10**18)
@@ -0,0 +1,81 @@
+import pytest
+from brownie import chain
+
+from purchase_config import ETH_TO_LDO_RATE_PRECISION
+from utils.purchase_index import PurchaseIndex
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18
+]
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+@pytest.fixture(scope='module')
+def executor(accounts, executor_snapshot):
+    return executor_snapshot(
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
+        allocations_total=sum(LDO_ALLOCATIONS)
+    )
+
+
+@pytest.fixture(scope='function')
+def index(tmp_path):
+    index = PurchaseIndex(str(tmp_path / 'purchases.sqlite'))
+    yield index
+    index.close()
+
+
+def purchase(executor, purchaser, ldo_amount):
+    eth_cost = ldo_amount * ETH_TO_LDO_RATE_PRECISION // ETH_TO_LDO_RATE
+    return executor.execute_purchase(purchaser, { 'from': purchaser, 'value': eth_cost })
+
+
+def test_purchases_are_indexed(accounts, executor, index):
+    from_block = chain.height
+    start_tx = executor.start({ 'from': accounts[0] })
+    tx = purchase(executor, accounts[1], LDO_ALLOCATIONS[1])
+
+    assert index.index(executor, from_block=from_block) == 2
+
+    assert index.get_offer_started(executor.address) == {
+        'started_at': start_tx.timestamp,
+        'expires_at': start_tx.timestamp + OFFER_EXPIRATION_DELAY
+    }
+
+    purchasers = [ (accounts[i].address, LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ]
+    status = index.get_purchase_status(executor.address, purchasers)
+
+    assert status[0] == (accounts[0].address, 0, LDO_ALLOCATIONS[0], None)
+    assert status[1] == (accounts[1].address, LDO_ALLOCATIONS[1], 0, tx.return_value)
+    assert status[2] == (accounts[2].address, 0, LDO_ALLOCATIONS[2], None)
+
+    assert index.get_purchases(executor.address)[accounts[1].address]['block_timestamp'] == tx.timestamp
+
+
+def test_reindexing_only_fetches_new_blocks(accounts, executor, index):
+    from_block = chain.height
+    purchase(executor, accounts[0], LDO_ALLOCATIONS[0])
+
+    assert index.index(executor, from_block=from_block) == 2
+    cursor = index.get_cursor(executor.address)
+    assert cursor == chain.height
+
+    assert index.index(executor, from_block=from_block) == 0
+
+    purchase(executor, accounts[2], LDO_ALLOCATIONS[2])
+
+    assert index.index(executor, from_block=from_block) == 1
+    assert index.get_cursor(executor.address) == chain.height
+    assert set(index.get_purchases(executor.address)) == {accounts[0].address, accounts[2].address}
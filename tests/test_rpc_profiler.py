@@ -0,0 +1,94 @@
+import io
+import json
+
+from utils.aragon_constants import verify_on_chain
+from utils.rpc_profiler import RpcProfiler, LATENCY_BUCKETS_MS, get_batch_method, get_caller
+
+
+class StubProvider:
+    def make_request(self, method, params):
+        if method == 'eth_noSuchMethod':
+            return {'jsonrpc': '2.0', 'id': 0, 'error': {'code': -32601, 'message': 'not found'}}
+        return {'jsonrpc': '2.0', 'id': 0, 'result': '0x1'}
+
+
+def test_provider_requests_are_recorded():
+    profiler = RpcProfiler()
+    provider = StubProvider()
+    profiler.wrap_provider(provider)
+
+    assert provider.make_request('eth_call', [{'to': '0x0'}, 'latest'])['result'] == '0x1'
+    provider.make_request('eth_call', [{'to': '0x0'}, 'latest'])
+    provider.make_request('eth_noSuchMethod', [])
+
+    rows = { row['method']: row for row in profiler.get_summary() }
+
+    assert rows['eth_call']['count'] == 2
+    assert rows['eth_call']['category'] == 'view'
+    assert rows['eth_call']['errors'] == 0
+    assert rows['eth_call']['bytes_sent'] > 0
+    assert rows['eth_call']['bytes_received'] > 0
+    assert sum(rows['eth_call']['histogram']) == 2
+    assert rows['eth_noSuchMethod']['errors'] == 1
+    assert rows['eth_noSuchMethod']['category'] == 'other'
+    assert profiler.requests_count == 3
+
+
+def test_latency_histogram():
+    profiler = RpcProfiler()
+    profiler.record('evm_mine', 0.0005, 10, 10, 'provider', caller='test')
+    profiler.record('evm_mine', 0.007, 10, 10, 'provider', caller='test')
+    profiler.record('evm_mine', 60, 10, 10, 'provider', caller='test')
+
+    [row] = profiler.get_summary()
+
+    assert row['category'] == 'mining'
+    assert row['histogram'][0] == 1
+    assert row['histogram'][LATENCY_BUCKETS_MS.index(10)] == 1
+    assert row['histogram'][-1] == 1
+
+
+def test_callers_are_recorded_separately():
+    profiler = RpcProfiler()
+    profiler.record('eth_call', 0.01, 10, 10, 'provider', caller='scripts.check_deployment:check_config')
+    profiler.record('eth_call', 0.01, 10, 10, 'provider', caller='scripts.check_deployment:check_allocations')
+
+    assert sorted(row['caller'] for row in profiler.get_summary()) == [
+        'scripts.check_deployment:check_allocations',
+        'scripts.check_deployment:check_config'
+    ]
+
+
+def test_batch_requests_are_attributed_to_the_calling_function():
+    callers = []
+
+    def transport(payload):
+        # called from utils.batch_reads, which is skipped like the other transports
+        callers.append(get_caller())
+        return [ {'jsonrpc': '2.0', 'id': item['id'], 'result': '0x' + '00' * 32} for item in payload ]
+
+    verify_on_chain(transport)
+
+    assert callers == ['utils.aragon_constants:verify_on_chain']
+
+
+def test_batch_method_name():
+    assert get_batch_method(['eth_call', 'eth_call']) == 'batch:eth_call'
+    assert get_batch_method(['eth_call', 'eth_getBalance']) == 'batch'
+
+
+def test_summary_and_trace(tmp_path):
+    trace_path = tmp_path / 'trace.json'
+    profiler = RpcProfiler(str(trace_path))
+    profiler.record('batch:eth_call', 0.02, 100, 200, 'batch', caller='test')
+
+    out = io.StringIO()
+    profiler.print_summary(file=out)
+    assert 'batch:eth_call' in out.getvalue()
+
+    profiler.write_trace()
+    trace = json.loads(trace_path.read_text())
+
+    assert trace['requests'][0]['method'] == 'batch:eth_call'
+    assert trace['requests'][0]['transport'] == 'batch'
+    assert trace['summary'][0]['category'] == 'view'
@@ -0,0 +1,98 @@
+import pytest
+
+from scripts.deploy import deploy, deploy_sharded_and_start_dao_vote
+from utils.sharding import MAX_SHARD_SIZE, partition_purchasers, make_shards_manifest
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+def make_purchasers(count):
+    return [ (f'0x{i + 1:040x}', (i % 7 + 1) * 10**18) for i in range(count) ]
+
+
+@pytest.mark.parametrize('count', [1, 50, 51, 100, 101, 149, 250])
+def test_shards_are_balanced_and_complete(count):
+    ldo_purchasers = make_purchasers(count)
+    shards = partition_purchasers(ldo_purchasers)
+
+    assert len(shards) == -(-count // MAX_SHARD_SIZE)
+    assert all(len(shard) <= MAX_SHARD_SIZE for shard in shards)
+    assert max(map(len, shards)) - min(map(len, shards)) <= 1
+    assert sorted(p for shard in shards for p in shard) == sorted(ldo_purchasers)
+
+    # the shards keep the original order of the purchasers
+    for shard in shards:
+        assert shard == sorted(shard, key=ldo_purchasers.index)
+
+
+def test_shard_allocations_are_close():
+    ldo_purchasers = make_purchasers(120)
+    sums = [ sum(p[1] for p in shard) for shard in partition_purchasers(ldo_purchasers) ]
+
+    assert max(sums) - min(sums) <= 7 * 10**18
+
+
+def test_no_shards_without_purchasers():
+    assert partition_purchasers([]) == []
+
+
+def test_manifest_maps_purchasers_to_shards():
+    ldo_purchasers = make_purchasers(60)
+    shards = partition_purchasers(ldo_purchasers)
+    addresses = ['0x' + 'a' * 40, '0x' + 'b' * 40]
+
+    manifest = make_shards_manifest(shards, addresses, 'PurchaseExecutor', {'eth_to_ldo_rate': ETH_TO_LDO_RATE})
+
+    assert [ e['address'] for e in manifest['executors'] ] == addresses
+    assert manifest['executors'][0]['eth_to_ldo_rate'] == str(ETH_TO_LDO_RATE)
+    for (i, shard) in enumerate(shards):
+        assert int(manifest['executors'][i]['allocations_total']) == sum(p[1] for p in shard)
+        for (address, _) in shard:
+            assert manifest['purchasers'][address] == i
+    assert len(manifest['purchasers']) == len(ldo_purchasers)
+
+
+def test_deploy_rejects_more_than_max_purchasers(accounts):
+    with pytest.raises(ValueError):
+        deploy(
+            tx_params={'from': accounts[0]},
+            eth_to_ldo_rate=ETH_TO_LDO_RATE,
+            vesting_start_delay=VESTING_START_DELAY,
+            vesting_end_delay=VESTING_END_DELAY,
+            offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+            ldo_purchasers=make_purchasers(MAX_SHARD_SIZE + 1),
+            allocations_total=sum(p[1] for p in make_purchasers(MAX_SHARD_SIZE + 1))
+        )
+
+
+def test_sharded_deployment_is_funded_by_single_vote(ldo_holder, ldo_token, dao_acl, dao_token_manager, helpers):
+    ldo_purchasers = make_purchasers(120)
+
+    (executors, manifest, vote_id) = deploy_sharded_and_start_dao_vote(
+        {'from': ldo_holder},
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=ldo_purchasers
+    )
+
+    assert len(executors) == 3
+
+    helpers.pass_and_exec_dao_vote(vote_id)
+
+    ldo_assign_role = dao_token_manager.ASSIGN_ROLE()
+
+    for (executor, entry) in zip(executors, manifest['executors']):
+        assert entry['address'] == executor.address
+        assert ldo_token.balanceOf(executor) == int(entry['allocations_total'])
+        assert dao_acl.hasPermission(executor, dao_token_manager, ldo_assign_role)
+        executor.start({'from': ldo_holder})
+
+    for (address, allocation) in ldo_purchasers:
+        assert executors[manifest['purchasers'][address]].get_allocation(address)[0] == allocation
@@ -0,0 +1,101 @@
+import pytest
+
+from purchase_config import ETH_TO_LDO_RATE_PRECISION
+from utils.vesting import (
+    SECONDS_PER_DAY,
+    get_vesting_schedules,
+    get_vested_amount,
+    get_unlocked_amount,
+    project_unlocked,
+    project_unlocked_by_receiver,
+    get_daily_unlocks
+)
+
+LDO_ALLOCATIONS = [
+    1_000 * 10**18 + 1,
+    3_000_000 * 10**18,
+    20_000_000 * 10**18 + 7
+]
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 + 13 # two years and change, for uneven rounding
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+SCHEDULES = [
+    ('0x1', 10**18 + 1, 1_000_000, 1_000_000 + 3 * SECONDS_PER_DAY + 7),
+    ('0x2', 7, 1_000_123, 1_000_123 + 10 * SECONDS_PER_DAY),
+    ('0x1', 5 * 10**24, 2_000_000, 2_000_000),
+    ('0x3', 3, 999_999, 5_000_000)
+]
+
+
+def test_vested_amount_follows_token_manager():
+    assert get_vested_amount(100, 10, 20, 9) == 0
+    assert get_vested_amount(100, 10, 20, 10) == 0
+    assert get_vested_amount(100, 10, 20, 13) == 30
+    assert get_vested_amount(10, 0, 3, 1) == 3
+    assert get_vested_amount(100, 10, 20, 20) == 100
+    assert get_vested_amount(100, 10, 10, 9) == 0
+    assert get_vested_amount(100, 10, 10, 10) == 100
+
+
+@pytest.mark.parametrize('step', [61, 4999, SECONDS_PER_DAY])
+def test_projection_matches_pointwise_amounts(step):
+    grid_start = 990_000
+    count = (5_100_000 - grid_start) // step + 1
+
+    unlocked = project_unlocked(SCHEDULES, grid_start, step, count)
+    by_receiver = project_unlocked_by_receiver(SCHEDULES, grid_start, step, count)
+
+    for i in range(count):
+        time = grid_start + i * step
+        assert unlocked[i] == sum(get_vested_amount(tokens, start, end, time) for (_, tokens, start, end) in SCHEDULES)
+        for receiver in ['0x1', '0x2', '0x3']:
+            assert by_receiver[receiver][i] == get_unlocked_amount(SCHEDULES, receiver, time)
+
+
+def test_daily_unlocks_cover_all_vestings():
+    daily_unlocks = get_daily_unlocks(SCHEDULES)
+
+    assert daily_unlocks[0][0] % SECONDS_PER_DAY == 0
+    assert daily_unlocks[0][0] <= 999_999
+    assert daily_unlocks[-1][0] >= 5_000_000
+    assert daily_unlocks[-1][1] == sum(tokens for (_, tokens, _, _) in SCHEDULES)
+    assert sum(unlocked_on_day for (_, _, unlocked_on_day) in daily_unlocks) == daily_unlocks[-1][1]
+
+
+@pytest.fixture(scope='module')
+def executor(accounts, executor_contract, executor_snapshot):
+    executor = executor_snapshot(
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
+        allocations_total=sum(LDO_ALLOCATIONS),
+        executor_contract=executor_contract
+    )
+    executor.start({ 'from': accounts[0] })
+    return executor
+
+
+def test_projection_matches_token_manager(accounts, chain, executor, ldo_token, dao_token_manager):
+    purchases = {}
+    for i in range(0, len(LDO_ALLOCATIONS)):
+        eth_cost = LDO_ALLOCATIONS[i] * ETH_TO_LDO_RATE_PRECISION // ETH_TO_LDO_RATE
+        tx = executor.execute_purchase(accounts[i], { 'from': accounts[i], 'value': eth_cost })
+        purchases[accounts[i].address] = {'ldo_allocation': LDO_ALLOCATIONS[i], 'block_timestamp': tx.timestamp}
+        chain.sleep(SECONDS_PER_DAY // 3)
+
+    schedules = get_vesting_schedules(purchases, VESTING_START_DELAY, VESTING_END_DELAY)
+    first_purchase = min(p['block_timestamp'] for p in purchases.values())
+
+    for offset in [0, VESTING_START_DELAY, VESTING_START_DELAY + 1, VESTING_START_DELAY + 12_345, VESTING_END_DELAY - 1, VESTING_END_DELAY + SECONDS_PER_DAY]:
+        time = first_purchase + offset
+        for (receiver, purchase) in purchases.items():
+            # the purchasers hold no other LDO, so the locked amount is the non-vested part of their vesting
+            locked = ldo_token.balanceOf(receiver) - dao_token_manager.transferableBalance(receiver, time)
+            assert purchase['ldo_allocation'] - get_unlocked_amount(schedules, receiver, time) == locked
@@ -0,0 +1,49 @@
+import pytest
+
+from scripts.deploy import deploy_and_start_dao_vote
+from utils.mainnet_fork import pass_and_exec_dao_votes
+
+LDO_ALLOCATIONS = [1_000 * 10**18, 3_000_000 * 10**18]
+
+# 100 LDO in one ETH
+ETH_TO_LDO_RATE = 100 * 10**18
+
+VESTING_START_DELAY = 1 * 60 * 60 * 24 * 365 # one year
+VESTING_END_DELAY = 2 * 60 * 60 * 24 * 365 # two years
+OFFER_EXPIRATION_DELAY = 2629746 # one month
+
+
+def deploy_executors(accounts, ldo_holder, count):
+    return [
+        deploy_and_start_dao_vote(
+            {'from': ldo_holder},
+            eth_to_ldo_rate=ETH_TO_LDO_RATE,
+            vesting_start_delay=VESTING_START_DELAY,
+            vesting_end_delay=VESTING_END_DELAY,
+            offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+            ldo_purchasers=[ (accounts[i], LDO_ALLOCATIONS[i]) for i in range(0, len(LDO_ALLOCATIONS)) ],
+            allocations_total=sum(LDO_ALLOCATIONS)
+        )
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize('mode', ['faithful', 'batch', 'direct'])
+def test_votes_are_applied_in_each_mode(mode, accounts, ldo_holder, ldo_token, dao_acl, dao_token_manager, dao_voting):
+    executors_and_vote_ids = deploy_executors(accounts, ldo_holder, 2)
+
+    pass_and_exec_dao_votes([ vote_id for (_, vote_id) in executors_and_vote_ids ], mode)
+
+    for (executor, vote_id) in executors_and_vote_ids:
+        assert ldo_token.balanceOf(executor) == sum(LDO_ALLOCATIONS)
+        assert dao_acl.hasPermission(executor, dao_token_manager, dao_token_manager.ASSIGN_ROLE())
+        assert dao_voting.getVote(vote_id)['executed'] == (mode != 'direct')
+
+
+def test_executed_votes_are_skipped(accounts, ldo_holder, ldo_token):
+    [(executor, vote_id)] = deploy_executors(accounts, ldo_holder, 1)
+
+    pass_and_exec_dao_votes([vote_id], 'batch')
+    pass_and_exec_dao_votes([vote_id], 'batch')
+
+    assert ldo_token.balanceOf(executor) == sum(LDO_ALLOCATIONS)
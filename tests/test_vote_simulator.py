@@ -0,0 +1,129 @@
+from scripts.deploy import encode_vesting_manager_evm_script
+from utils.config import ldo_token_address, lido_dao_voting_address
+from utils.evm_script import encode_call_script
+from utils.vote_simulator import decode_evm_script, simulate_call_script, trace_call_script, merge_state_diff
+
+LDO_AMOUNT = 1_000 * 10**18
+
+
+def test_vote_script_is_decoded(stranger, dao_voting, dao_token_manager):
+    evm_script = encode_vesting_manager_evm_script(stranger.address, LDO_AMOUNT, 'reference')
+    actions = decode_evm_script(evm_script)
+
+    assert [ (a.interface_name, a.function_name) for a in actions ] == [
+        ('Finance', 'newImmediatePayment'),
+        ('ACL', 'grantPermission')
+    ]
+    assert [ value for (_, _, value) in actions[0].args ] == [
+        ldo_token_address.lower(),
+        stranger.address.lower(),
+        LDO_AMOUNT,
+        'reference'
+    ]
+    assert actions[1].args[2][2] == bytes(dao_token_manager.ASSIGN_ROLE())
+
+
+def test_nested_vote_script_is_decoded(stranger, dao_voting):
+    evm_script = encode_vesting_manager_evm_script(stranger.address, LDO_AMOUNT, 'reference')
+    forward_script = encode_call_script([(
+        dao_voting.address,
+        dao_voting.newVote.encode_input(evm_script, 'description', False, False)
+    )])
+
+    [new_vote] = decode_evm_script(forward_script)
+
+    assert (new_vote.interface_name, new_vote.function_name) == ('Voting', 'newVote')
+    [(arg_name, nested_actions)] = new_vote.nested
+    assert arg_name == '_executionScript'
+    assert [ a.function_name for a in nested_actions ] == ['newImmediatePayment', 'grantPermission']
+
+
+def test_vote_script_is_simulated_without_side_effects(stranger, ldo_token, dao_acl, dao_token_manager):
+    evm_script = encode_vesting_manager_evm_script(stranger.address, LDO_AMOUNT, 'reference')
+    ldo_balance_before = ldo_token.balanceOf(stranger)
+
+    results = simulate_call_script(evm_script, lido_dao_voting_address)
+
+    assert [ r.success for r in results ] == [True, True]
+    assert all(r.gas_used > 0 for r in results)
+
+    assert ldo_token.balanceOf(stranger) == ldo_balance_before
+    assert not dao_acl.hasPermission(stranger, dao_token_manager, dao_token_manager.ASSIGN_ROLE())
+
+
+def test_failing_action_is_reported(stranger):
+    evm_script = encode_vesting_manager_evm_script(stranger.address, LDO_AMOUNT, 'reference')
+
+    results = simulate_call_script(evm_script, stranger.address)
+
+    assert len(results) == 1
+    assert not results[0].success
+    assert results[0].error is not None
+
+
+def test_actions_are_chained_on_a_fork(stranger):
+    evm_script = encode_vesting_manager_evm_script(stranger.address, LDO_AMOUNT, 'reference')
+
+    results = simulate_call_script(evm_script, lido_dao_voting_address)
+
+    assert all(r.chained for r in results)
+
+
+def test_state_diff_is_merged_into_overrides():
+    state_overrides = {'0xaa': {'stateDiff': {'0x01': '0x' + '11' * 32}}}
+    merge_state_diff(state_overrides, {
+        'pre': {
+            '0xaa': {'balance': '0x10', 'storage': {'0x01': '0x' + '11' * 32, '0x02': '0x' + '22' * 32}},
+            '0xbb': {'nonce': 1}
+        },
+        'post': {
+            '0xaa': {'balance': '0x20', 'storage': {'0x01': '0x' + '33' * 32}},
+            '0xbb': {'nonce': 2}
+        }
+    })
+
+    assert state_overrides == {
+        '0xaa': {'balance': '0x20', 'stateDiff': {'0x01': '0x' + '33' * 32, '0x02': '0x' + '00' * 32}},
+        '0xbb': {'nonce': '0x2'}
+    }
+
+
+def test_traced_actions_see_the_previous_state_changes(stranger):
+    evm_script = encode_vesting_manager_evm_script(stranger.address, LDO_AMOUNT, 'reference')
+    requests = []
+
+    # answers like a node with the debug namespace: each action changes one storage slot
+    def transport(payload):
+        requests.append(payload)
+        slot = hex(len(requests))
+        return [
+            {'jsonrpc': '2.0', 'id': payload[0]['id'], 'result': {'gasUsed': hex(21000 + len(requests))}},
+            {'jsonrpc': '2.0', 'id': payload[1]['id'], 'result': {
+                'pre': {lido_dao_voting_address: {'storage': {slot: '0x' + '00' * 32}}},
+                'post': {lido_dao_voting_address: {'storage': {slot: '0x' + '01' * 32}}}
+            }}
+        ]
+
+    results = trace_call_script(evm_script, lido_dao_voting_address, transport)
+
+    assert [ (r.success, r.gas_used, r.chained) for r in results ] == [(True, 21001, True), (True, 21002, True)]
+    assert requests[0][0]['params'][2]['stateOverrides'] == {}
+    assert requests[1][0]['params'][2]['stateOverrides'] == {
+        lido_dao_voting_address: {'stateDiff': {'0x1': '0x' + '01' * 32}}
+    }
+
+
+def test_traced_script_stops_at_the_first_revert(stranger):
+    evm_script = encode_vesting_manager_evm_script(stranger.address, LDO_AMOUNT, 'reference')
+
+    def transport(payload):
+        return [
+            {'jsonrpc': '2.0', 'id': payload[0]['id'], 'result': {'gasUsed': '0x5208', 'error': 'execution reverted'}},
+            {'jsonrpc': '2.0', 'id': payload[1]['id'], 'result': {'pre': {}, 'post': {}}}
+        ]
+
+    results = trace_call_script(evm_script, stranger.address, transport)
+
+    assert len(results) == 1
+    assert not results[0].success
+    assert results[0].error == 'execution reverted'
@@ -0,0 +1,103 @@
+from collections import namedtuple
+from itertools import accumulate
+
+
+ETH_TO_LDO_RATE_PRECISION = 10**18
+
+
+AllocationRow = namedtuple('AllocationRow', [
+    'address',
+    'allocation',
+    'eth_cost',
+    'allocations_running_total',
+    'eth_costs_running_total',
+    'dust'
+])
+
+
+# Immutable column-oriented table of purchaser allocations and their exact ETH costs.
+# Each column is a tuple of Python ints, so all the math is exact. The ETH cost of a
+# row is computed the same way PurchaseExecutor._get_allocation does it, and `dust`
+# is the remainder of that division, in LDO wei multiplied by ETH_TO_LDO_RATE_PRECISION.
+class AllocationTable:
+    __slots__ = (
+        'eth_to_ldo_rate',
+        'addresses',
+        'allocations',
+        'eth_costs',
+        'allocations_running_totals',
+        'eth_costs_running_totals',
+        'dust',
+        '_index'
+    )
+
+    def __init__(self, eth_to_ldo_rate, addresses, allocations, eth_costs, allocations_running_totals, eth_costs_running_totals, dust):
+        for (name, value) in (
+            ('eth_to_ldo_rate', eth_to_ldo_rate),
+            ('addresses', addresses),
+            ('allocations', allocations),
+            ('eth_costs', eth_costs),
+            ('allocations_running_totals', allocations_running_totals),
+            ('eth_costs_running_totals', eth_costs_running_totals),
+            ('dust', dust),
+            ('_index', {address: i for (i, address) in enumerate(addresses)})
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('AllocationTable is immutable')
+
+    @classmethod
+    def build(cls, ldo_purchasers, eth_to_ldo_rate):
+        addresses = tuple(str(p[0]) for p in ldo_purchasers)
+        allocations = tuple(int(p[1]) for p in ldo_purchasers)
+        return cls.from_columns(addresses, allocations, eth_to_ldo_rate)
+
+    @classmethod
+    def from_columns(cls, addresses, allocations, eth_to_ldo_rate):
+        assert eth_to_ldo_rate > 0, 'rate must be positive'
+        costs_and_dust = [ divmod(a * ETH_TO_LDO_RATE_PRECISION, eth_to_ldo_rate) for a in allocations ]
+        eth_costs = tuple(c for (c, _) in costs_and_dust)
+        return cls(
+            eth_to_ldo_rate=eth_to_ldo_rate,
+            addresses=addresses,
+            allocations=allocations,
+            eth_costs=eth_costs,
+            allocations_running_totals=tuple(accumulate(allocations)),
+            eth_costs_running_totals=tuple(accumulate(eth_costs)),
+            dust=tuple(d for (_, d) in costs_and_dust)
+        )
+
+    def with_rate(self, eth_to_ldo_rate):
+        return AllocationTable.from_columns(self.addresses, self.allocations, eth_to_ldo_rate)
+
+    @property
+    def allocations_total(self):
+        return self.allocations_running_totals[-1] if len(self) else 0
+
+    @property
+    def eth_costs_total(self):
+        return self.eth_costs_running_totals[-1] if len(self) else 0
+
+    @property
+    def dust_total(self):
+        return sum(self.dust)
+
+    def row(self, i):
+        return AllocationRow(
+            self.addresses[i],
+            self.allocations[i],
+            self.eth_costs[i],
+            self.allocations_running_totals[i],
+            self.eth_costs_running_totals[i],
+            self.dust[i]
+        )
+
+    def index_of(self, address):
+        return self._index[str(address)]
+
+    def __iter__(self):
+        return (self.row(i) for i in range(len(self.addresses)))
+
+    def __len__(self):
+        return len(self.addresses)
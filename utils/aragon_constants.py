@@ -0,0 +1,163 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+
+from eth_utils import keccak, function_abi_to_4byte_selector
+
+from utils.interfaces import INTERFACES_DIR, INTERFACE_NAMES_BY_ADDRESS, load_interface_abi, get_function_signature
+
+
+# Aragon role hashes and function selectors of the DAO apps, generated from the ABIs
+# in interfaces/ by `python -m utils.aragon_constants generate`. Bump the version when
+# the layout of the table changes; the ABI hashes tell when it is stale.
+TABLE_VERSION = 1
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aragon_constants.json')
+
+APP_NAMES = ('ACL', 'Agent', 'Finance', 'TokenManager', 'Voting')
+
+APP_ADDRESSES = { name: address for (address, name) in INTERFACE_NAMES_BY_ADDRESS.items() }
+
+
+def is_role_abi(fn_abi):
+    return (
+        fn_abi.get('type') == 'function'
+        and fn_abi['name'].endswith('_ROLE')
+        and len(fn_abi['inputs']) == 0
+        and [ o['type'] for o in fn_abi['outputs'] ] == ['bytes32']
+    )
+
+
+def get_abi_hash(app_name):
+    with open(os.path.join(INTERFACES_DIR, f'{app_name}.json'), 'rb') as abi_file:
+        return hashlib.sha256(abi_file.read()).hexdigest()
+
+
+def generate_table():
+    roles = {}
+    selectors = {}
+
+    for app_name in APP_NAMES:
+        abi = load_interface_abi(app_name)
+        # Aragon apps define each role as keccak256 of its name
+        roles[app_name] = {
+            fn_abi['name']: '0x' + keccak(text=fn_abi['name']).hex()
+            for fn_abi in sorted(abi, key=lambda fn_abi: fn_abi.get('name', ''))
+            if is_role_abi(fn_abi)
+        }
+        selectors[app_name] = {
+            get_function_signature(fn_abi): '0x' + function_abi_to_4byte_selector(fn_abi).hex()
+            for fn_abi in sorted(abi, key=lambda fn_abi: get_function_signature(fn_abi) if fn_abi.get('type') == 'function' else '')
+            if fn_abi.get('type') == 'function'
+        }
+
+    return {
+        'version': TABLE_VERSION,
+        'abi_hashes': { app_name: get_abi_hash(app_name) for app_name in APP_NAMES },
+        'roles': roles,
+        'selectors': selectors
+    }
+
+
+def write_table(table, path=TABLE_FILE):
+    with open(path, 'w') as table_file:
+        json.dump(table, table_file, indent=2)
+        table_file.write('\n')
+
+
+@lru_cache(maxsize=None)
+def load_table(path=TABLE_FILE):
+    with open(path) as table_file:
+        table = json.load(table_file)
+    if table.get('version') != TABLE_VERSION:
+        raise ValueError(f'{path} has version {table.get("version")}, expected {TABLE_VERSION}; regenerate it')
+    return table
+
+
+def get_role_hash(app_name, role_name):
+    roles = load_table()['roles']
+    if role_name not in roles.get(app_name, {}):
+        raise KeyError(f'unknown role {app_name}.{role_name}')
+    return roles[app_name][role_name]
+
+
+def get_selector(app_name, signature):
+    selectors = load_table()['selectors']
+    if signature not in selectors.get(app_name, {}):
+        raise KeyError(f'unknown function {app_name}.{signature}')
+    return selectors[app_name][signature]
+
+
+def find_stale_entries(table=None):
+    # compares the table with the one generated from the current ABIs
+    table = table or load_table()
+    fresh = generate_table()
+    return [
+        key
+        for key in ('abi_hashes', 'roles', 'selectors')
+        for app_name in APP_NAMES
+        if table[key].get(app_name) != fresh[key][app_name]
+    ]
+
+
+def verify_on_chain(transport=None, table=None):
+    # reads every role getter of the deployed apps; returns (app, role, expected, actual) mismatches
+    from utils.batch_reads import batch_request
+
+    table = table or load_table()
+    checks = [
+        (app_name, role_name, role_hash)
+        for app_name in APP_NAMES
+        for (role_name, role_hash) in table['roles'][app_name].items()
+    ]
+    results = batch_request([
+        ('eth_call', [{'to': APP_ADDRESSES[app_name], 'data': table['selectors'][app_name][f'{role_name}()']}, 'latest'])
+        for (app_name, role_name, _) in checks
+    ], transport)
+
+    return [
+        (app_name, role_name, role_hash, result)
+        for ((app_name, role_name, role_hash), result) in zip(checks, results)
+        if result.lower() != role_hash.lower()
+    ]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m utils.aragon_constants')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('generate', help='regenerate the table from the ABIs in interfaces/')
+    subparsers.add_parser('check', help='check that the table matches the ABIs in interfaces/')
+
+    verify_parser = subparsers.add_parser('verify', help='check the role hashes against the deployed apps')
+    verify_parser.add_argument('--rpc', required=True)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        write_table(generate_table())
+        print(f'Table written to {TABLE_FILE}')
+        return 0
+
+    if args.command == 'check':
+        stale = find_stale_entries()
+        for entry in stale:
+            print(f'[FAIL] stale {entry}')
+        if len(stale) == 0:
+            print('[ok] The table matches the ABIs')
+        return 1 if len(stale) != 0 else 0
+
+    from utils.fork_cache import make_http_transport
+
+    mismatches = verify_on_chain(make_http_transport(args.rpc))
+    for (app_name, role_name, expected, actual) in mismatches:
+        print(f'[FAIL] {app_name}.{role_name}: expected {expected}, got {actual}')
+    if len(mismatches) == 0:
+        print('[ok] All role hashes match the deployed apps')
+    return 1 if len(mismatches) != 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
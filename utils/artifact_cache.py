@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import re
+import sys
+
+import yaml
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTRACTS_DIR = os.path.join(PROJECT_DIR, 'contracts')
+BUILD_CONTRACTS_DIR = os.path.join(PROJECT_DIR, 'build', 'contracts')
+BROWNIE_CONFIG = os.path.join(PROJECT_DIR, 'brownie-config.yaml')
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ldo-purchase-executor', 'artifacts')
+
+VYPER_VERSION_PRAGMA = re.compile(r'^#\s*@version\s+([^\s]+)', re.MULTILINE)
+
+
+def get_cache_dir():
+    return os.environ.get('ARTIFACT_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+
+def get_configured_evm_version():
+    with open(BROWNIE_CONFIG) as config_file:
+        config = yaml.safe_load(config_file) or {}
+    return (config.get('compiler') or {}).get('evm_version') or 'default'
+
+
+def get_compiler_version(source):
+    match = VYPER_VERSION_PRAGMA.search(source)
+    if match is None:
+        raise ValueError('no vyper version pragma found in the source')
+    return match.group(1)
+
+
+def get_artifact_key(source, evm_version=None):
+    if evm_version is None:
+        evm_version = get_configured_evm_version()
+    compiler_version = get_compiler_version(source)
+    source_hash = hashlib.sha256(source.encode()).hexdigest()
+    key_preimage = f'vyper-{compiler_version}:{evm_version}:{source_hash}'
+    return hashlib.sha256(key_preimage.encode()).hexdigest()
+
+
+def read_contract_source(contract_name):
+    with open(os.path.join(CONTRACTS_DIR, f'{contract_name}.vy')) as source_file:
+        return source_file.read()
+
+
+def list_contract_names():
+    return sorted(
+        os.path.splitext(filename)[0]
+        for filename in os.listdir(CONTRACTS_DIR)
+        if filename.endswith('.vy')
+    )
+
+
+def get_cached_artifact_path(key):
+    return os.path.join(get_cache_dir(), f'{key}.json')
+
+
+def get_build_artifact_path(contract_name):
+    return os.path.join(BUILD_CONTRACTS_DIR, f'{contract_name}.json')
+
+
+def read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as json_file:
+        return json.load(json_file)
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # write to a temp file first so that concurrent readers never see a partial artifact
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as json_file:
+        json.dump(data, json_file)
+    os.replace(tmp_path, path)
+
+
+def is_build_artifact_fresh(build_artifact, source):
+    return build_artifact is not None and build_artifact.get('sha1') == hashlib.sha1(source.encode()).hexdigest()
+
+
+def load_artifact(contract_name):
+    source = read_contract_source(contract_name)
+    artifact = read_json(get_cached_artifact_path(get_artifact_key(source)))
+    if artifact is not None:
+        return artifact
+    build_artifact = read_json(get_build_artifact_path(contract_name))
+    return build_artifact if is_build_artifact_fresh(build_artifact, source) else None
+
+
+def save_artifacts():
+    saved = []
+    for contract_name in list_contract_names():
+        source = read_contract_source(contract_name)
+        build_artifact = read_json(get_build_artifact_path(contract_name))
+        if not is_build_artifact_fresh(build_artifact, source):
+            print(f'  {contract_name}: no up-to-date build artifact, skipping')
+            continue
+        key = get_artifact_key(source)
+        write_json(get_cached_artifact_path(key), build_artifact)
+        print(f'  {contract_name}: saved as {key}')
+        saved.append(contract_name)
+    return saved
+
+
+def restore_artifacts():
+    restored = []
+    for contract_name in list_contract_names():
+        source = read_contract_source(contract_name)
+        build_path = get_build_artifact_path(contract_name)
+        if is_build_artifact_fresh(read_json(build_path), source):
+            print(f'  {contract_name}: build artifact is up to date')
+            continue
+        key = get_artifact_key(source)
+        cached_artifact = read_json(get_cached_artifact_path(key))
+        if cached_artifact is None:
+            print(f'  {contract_name}: not cached')
+            continue
+        write_json(build_path, cached_artifact)
+        print(f'  {contract_name}: restored from {key}')
+        restored.append(contract_name)
+    return restored
+
+
+def main(argv):
+    commands = {'save': save_artifacts, 'restore': restore_artifacts}
+    if len(argv) != 1 or argv[0] not in commands:
+        print(f'Usage: python -m utils.artifact_cache {"|".join(commands)}')
+        return 1
+    print(f'Using artifact cache at {get_cache_dir()}')
+    commands[argv[0]]()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
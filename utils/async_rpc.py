@@ -0,0 +1,93 @@
+import asyncio
+import itertools
+import json
+import os
+import time
+
+import aiohttp
+from brownie import web3
+
+from utils.rpc_profiler import get_profiler, get_caller
+
+
+DEFAULT_MAX_CONCURRENCY = 16
+HTTP_TIMEOUT = 120
+
+
+def is_async_rpc_enabled():
+    return os.environ.get('ASYNC_RPC') == '1'
+
+
+def get_max_concurrency():
+    return int(os.environ.get('ASYNC_RPC_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+
+
+# Read-only JSON-RPC client running requests concurrently over a pool of keep-alive
+# HTTP connections. The number of requests in flight is bounded by max_concurrency.
+# View calls are made through brownie contract methods, which are only used to
+# encode the calldata and decode the results. The requests run in tasks whose stacks
+# don't include the code that started them, so the profiled caller is captured when
+# the client is created.
+class AsyncRpcClient:
+    def __init__(self, url=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, block_identifier='latest', caller=None):
+        self.url = url or web3.provider.endpoint_uri
+        self.caller = caller or get_caller()
+        self.max_concurrency = max_concurrency
+        self.block_identifier = block_identifier
+        self.request_ids = itertools.count()
+        self.requests_count = 0
+        self.session = None
+        self.semaphore = None
+
+    async def __aenter__(self):
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT)
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def request(self, method, params):
+        payload = {'jsonrpc': '2.0', 'id': next(self.request_ids), 'method': method, 'params': params}
+        data = json.dumps(payload).encode()
+        async with self.semaphore:
+            self.requests_count += 1
+            started_at = time.perf_counter()
+            async with self.session.post(self.url, data=data, headers={'Content-Type': 'application/json'}) as response:
+                response.raise_for_status()
+                raw_body = await response.read()
+            duration = time.perf_counter() - started_at
+        body = json.loads(raw_body)
+        profiler = get_profiler()
+        if profiler is not None:
+            profiler.record(method, duration, len(data), len(raw_body), 'async', error='error' in body, caller=self.caller)
+        if 'error' in body:
+            raise ValueError(body['error'])
+        return body['result']
+
+    async def call(self, contract_method, *args):
+        calldata = contract_method.encode_input(*args)
+        result = await self.request('eth_call', [{'to': contract_method._address, 'data': calldata}, self.block_identifier])
+        return contract_method.decode_output(result)
+
+    async def get_balance(self, address):
+        return int(await self.request('eth_getBalance', [address, self.block_identifier]), 16)
+
+    async def get_code(self, address):
+        return await self.request('eth_getCode', [address, self.block_identifier])
+
+    async def gather(self, *awaitables):
+        return await asyncio.gather(*awaitables)
+
+
+def run_reads(read, url=None, max_concurrency=None):
+    # runs `read(client)`, a coroutine function, with a fresh client and returns its result
+    caller = get_caller()
+
+    async def run():
+        async with AsyncRpcClient(url, max_concurrency or get_max_concurrency(), caller=caller) as client:
+            return await read(client)
+    return asyncio.run(run())
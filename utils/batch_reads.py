@@ -0,0 +1,96 @@
+import json
+import time
+from urllib import request
+
+from brownie import web3
+
+from utils.rpc_profiler import get_profiler, get_batch_method
+
+
+DEFAULT_BATCH_SIZE = 100
+HTTP_TIMEOUT = 120
+
+
+def http_transport(payload):
+    data = json.dumps(payload).encode()
+    req = request.Request(
+        web3.provider.endpoint_uri,
+        data=data,
+        headers={'Content-Type': 'application/json'}
+    )
+    started_at = time.perf_counter()
+    with request.urlopen(req, timeout=HTTP_TIMEOUT) as response:
+        body = response.read()
+
+    profiler = get_profiler()
+    if profiler is not None:
+        profiler.record(
+            get_batch_method(item['method'] for item in payload),
+            time.perf_counter() - started_at,
+            len(data),
+            len(body),
+            'batch'
+        )
+
+    return json.loads(body)
+
+
+class RpcError(ValueError):
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+        self.message = error.get('message', str(error)) if isinstance(error, dict) else str(error)
+
+
+def batch_request(requests, transport=None, batch_size=DEFAULT_BATCH_SIZE, return_errors=False):
+    # sends (method, params) pairs as JSON-RPC batches, returns results in request order;
+    # with `return_errors`, failed items are returned as RpcError instead of raising
+    transport = transport or http_transport
+    results = []
+
+    for offset in range(0, len(requests), batch_size):
+        chunk = requests[offset:offset + batch_size]
+        payload = [
+            {'jsonrpc': '2.0', 'id': offset + i, 'method': method, 'params': params}
+            for i, (method, params) in enumerate(chunk)
+        ]
+        response = transport(payload)
+        # a node rejecting the whole batch (rate limit, batch too large) answers with a single error
+        if isinstance(response, dict):
+            raise RpcError(response.get('error', response))
+        responses = {r['id']: r for r in response}
+
+        for i in range(offset, offset + len(chunk)):
+            response = responses[i]
+            if 'error' not in response:
+                results.append(response['result'])
+            elif return_errors:
+                results.append(RpcError(response['error']))
+            else:
+                raise RpcError(response['error'])
+
+    return results
+
+
+# collects view calls made through brownie contract methods and executes them
+# as batched `eth_call` requests, decoding all the results together
+class BatchReader:
+    def __init__(self, transport=None, batch_size=DEFAULT_BATCH_SIZE, block_identifier='latest'):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.block_identifier = block_identifier
+        self.calls = []
+
+    def add(self, contract_method, *args):
+        calldata = contract_method.encode_input(*args)
+        self.calls.append((contract_method, calldata))
+        return len(self.calls) - 1
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        requests = [
+            ('eth_call', [{'to': method._address, 'data': calldata}, self.block_identifier])
+            for (method, calldata) in calls
+        ]
+        results = batch_request(requests, self.transport, self.batch_size)
+        return [method.decode_output(result) for ((method, _), result) in zip(calls, results)]
@@ -0,0 +1,64 @@
+import json
+import os
+
+
+DEFAULT_SAVE_EVERY = 50
+
+
+# Progress of a long-running check, stored as JSON. The stored progress is only
+# resumed when its key (e.g. the executor and the block the check started at)
+# matches, otherwise it is discarded as stale. Without a path the progress is only
+# kept in memory. The file is rewritten after every `save_every` new items rather
+# than after each one, so call `flush` when the check stops to store the rest.
+class Checkpoint:
+    def __init__(self, path, key, save_every=DEFAULT_SAVE_EVERY):
+        self.path = path
+        self.key = key
+        self.save_every = save_every
+        self.items = {}
+        self.unsaved_count = 0
+        self.resumed = False
+
+        stored = read_json(path) if path is not None else None
+        if stored is not None and stored.get('key') == key:
+            self.items = stored['items']
+            self.resumed = True
+
+    def __contains__(self, name):
+        return name in self.items
+
+    def get(self, name):
+        return self.items.get(name)
+
+    def set(self, name, value):
+        self.items[name] = value
+        self.unsaved_count += 1
+        if self.unsaved_count >= self.save_every:
+            self.save()
+
+    def flush(self):
+        if self.unsaved_count != 0:
+            self.save()
+
+    def save(self):
+        self.unsaved_count = 0
+        if self.path is None:
+            return
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as checkpoint_file:
+            json.dump({'key': self.key, 'items': self.items}, checkpoint_file, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as json_file:
+        try:
+            return json.load(json_file)
+        except ValueError:
+            return None
@@ -0,0 +1,81 @@
+from eth_utils import keccak, to_canonical_address, to_checksum_address
+
+from utils.evm_script import to_bytes
+
+
+# EIP-5202 blueprint preamble: the invalid opcode, the magic byte and version 0,
+# with no extra data; must match BLUEPRINT_CODE_OFFSET of PurchaseExecutorFactory.vy
+BLUEPRINT_PREAMBLE = b'\xfe\x71\x00'
+
+# PUSH2 <length> RETURNDATASIZE DUP2 PUSH1 10 RETURNDATASIZE CODECOPY RETURN: returns
+# the code following these 10 bytes as the code of the deployed contract
+BLUEPRINT_DEPLOYER_PREFIX_LEN = 10
+
+
+def encode_word(value):
+    if isinstance(value, int):
+        return value.to_bytes(32, 'big')
+    return to_canonical_address(value).rjust(32, b'\0')
+
+
+def encode_constructor_args(
+    eth_to_ldo_rate,
+    vesting_start_delay,
+    vesting_end_delay,
+    offer_expiration_delay,
+    ldo_recipients,
+    ldo_allocations,
+    allocations_total
+):
+    # all the constructor args of the executors are static, so each of them,
+    # including each element of the fixed-size arrays, takes a single word
+    words = [
+        int(eth_to_ldo_rate),
+        int(vesting_start_delay),
+        int(vesting_end_delay),
+        int(offer_expiration_delay),
+        *[ str(r) for r in ldo_recipients ],
+        *[ int(a) for a in ldo_allocations ],
+        int(allocations_total)
+    ]
+    return b''.join(encode_word(w) for w in words)
+
+
+def decode_constructor_args(constructor_args):
+    # the inverse of encode_constructor_args, with the recipients checksummed
+    words = [ constructor_args[i:i + 32] for i in range(0, len(constructor_args), 32) ]
+    purchasers_count = (len(words) - 5) // 2
+    assert len(words) == 5 + 2 * purchasers_count, 'malformed constructor args'
+    values = [ int.from_bytes(word, 'big') for word in words ]
+    return (
+        *values[:4],
+        [ to_checksum_address(word[12:]) for word in words[4:4 + purchasers_count] ],
+        values[4 + purchasers_count:4 + 2 * purchasers_count],
+        values[-1]
+    )
+
+
+def get_config_salt(constructor_args):
+    # the salt commits to the whole config, so the same config always yields the same address
+    return keccak(constructor_args)
+
+
+def get_create2_address(deployer_address, salt, init_code):
+    return to_checksum_address(keccak(
+        b'\xff' + to_canonical_address(deployer_address) + to_bytes(salt) + keccak(to_bytes(init_code))
+    )[12:])
+
+
+def get_executor_address(factory_address, executor_bytecode, constructor_args, salt=None):
+    # create_from_blueprint runs the blueprint code following the preamble with the
+    # ABI-encoded constructor args appended, the same init code as a regular deployment
+    if salt is None:
+        salt = get_config_salt(constructor_args)
+    return get_create2_address(factory_address, salt, to_bytes(executor_bytecode) + constructor_args)
+
+
+def get_blueprint_deploy_code(executor_bytecode):
+    blueprint = BLUEPRINT_PREAMBLE + to_bytes(executor_bytecode)
+    prefix = b'\x61' + len(blueprint).to_bytes(2, 'big') + b'\x3d\x81\x60' + bytes([BLUEPRINT_DEPLOYER_PREFIX_LEN]) + b'\x3d\x39\xf3'
+    assert len(prefix) == BLUEPRINT_DEPLOYER_PREFIX_LEN
+    return prefix + blueprint
@@ -1,4 +1,6 @@
+from utils.aragon_constants import get_role_hash
 from utils.evm_script import encode_call_script, EMPTY_CALLSCRIPT
+from utils.interfaces import INTERFACE_NAMES_BY_ADDRESS
 
 
 def create_vote(voting, token_manager, vote_desc, evm_script, tx_params):
@@ -28,11 +30,19 @@ def encode_token_transfer(token_address, recipient, amount, reference, finance):
     )
 
 
+def get_permission_id(target_app, permission_name):
+    # the role hashes of the DAO apps come from the precomputed table, only other apps are queried
+    app_name = INTERFACE_NAMES_BY_ADDRESS.get(str(target_app.address).lower())
+    if app_name is not None:
+        return get_role_hash(app_name, permission_name)
+    return getattr(target_app, permission_name)()
+
+
 def encode_permission_grant(target_app, permission_name, grant_to, acl):
-    permission_id = getattr(target_app, permission_name)()
+    permission_id = get_permission_id(target_app, permission_name)
     return (acl.address, acl.grantPermission.encode_input(grant_to, target_app, permission_id))
 
 
 def encode_permission_revoke(target_app, permission_name, revoke_from, acl):
-    permission_id = getattr(target_app, permission_name)()
+    permission_id = get_permission_id(target_app, permission_name)
     return (acl.address, acl.revokePermission.encode_input(revoke_from, target_app, permission_id))
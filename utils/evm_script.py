@@ -1,20 +1,67 @@
-import eth_abi
-from web3 import Web3
-from eth_typing.evm import HexAddress
+import struct
 
 EMPTY_CALLSCRIPT = '0x00000001'
 
+SPEC_ID_LEN = 4
+ADDRESS_LEN = 20
+CALLDATA_LENGTH_LEN = 4
+ACTION_HEADER_LEN = ADDRESS_LEN + CALLDATA_LENGTH_LEN
+
+pack_uint32_into = struct.Struct('>I').pack_into
+unpack_uint32_from = struct.Struct('>I').unpack_from
+
 def create_executor_id(id):
     return '0x' + str(id).zfill(8)
 
 def strip_byte_prefix(hexstr):
     return hexstr[2:] if hexstr[0:2] == '0x' else hexstr
 
+def to_bytes(value):
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return bytes.fromhex(strip_byte_prefix(str(value)))
+
 def encode_call_script(actions, spec_id = 1):
-    result = create_executor_id(spec_id)
+    actions = [ (to_bytes(to), to_bytes(calldata)) for to, calldata in actions ]
+
+    # the whole script is written into a single buffer allocated upfront
+    script = bytearray(SPEC_ID_LEN + ACTION_HEADER_LEN * len(actions) + sum(len(calldata) for _, calldata in actions))
+    pack_uint32_into(script, 0, spec_id)
+
+    offset = SPEC_ID_LEN
     for to, calldata in actions:
-        addr_bytes = Web3.toBytes(hexstr=HexAddress(to)).hex()
-        calldata_bytes = strip_byte_prefix(calldata)
-        length = eth_abi.encode_single('int256', len(calldata_bytes) // 2).hex()
-        result += addr_bytes + length[56:] + calldata_bytes
-    return result
+        if len(to) != ADDRESS_LEN:
+            raise ValueError(f'invalid target address: 0x{to.hex()}')
+        calldata_len = len(calldata)
+        script[offset:offset + ADDRESS_LEN] = to
+        pack_uint32_into(script, offset + ADDRESS_LEN, calldata_len)
+        offset += ACTION_HEADER_LEN
+        script[offset:offset + calldata_len] = calldata
+        offset += calldata_len
+
+    return '0x' + script.hex()
+
+def decode_call_script(script, spec_id = 1):
+    script = memoryview(to_bytes(script))
+
+    if len(script) < SPEC_ID_LEN:
+        raise ValueError('call script is too short')
+
+    (actual_spec_id,) = unpack_uint32_from(script, 0)
+    if actual_spec_id != spec_id:
+        raise ValueError(f'unexpected call script spec id: {actual_spec_id}')
+
+    actions = []
+    offset = SPEC_ID_LEN
+    while offset < len(script):
+        if offset + ACTION_HEADER_LEN > len(script):
+            raise ValueError(f'truncated action header at offset {offset}')
+        to = script[offset:offset + ADDRESS_LEN].hex()
+        (calldata_len,) = unpack_uint32_from(script, offset + ADDRESS_LEN)
+        offset += ACTION_HEADER_LEN
+        if offset + calldata_len > len(script):
+            raise ValueError(f'truncated calldata at offset {offset}')
+        actions.append(('0x' + to, '0x' + script[offset:offset + calldata_len].hex()))
+        offset += calldata_len
+
+    return actions
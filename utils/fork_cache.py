@@ -0,0 +1,293 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import request
+from urllib.error import URLError
+
+from utils.addresses import (
+    ldo_token_address,
+    lido_dao_acl_address,
+    lido_dao_agent_address,
+    lido_dao_finance_address,
+    lido_dao_voting_address,
+    lido_dao_token_manager_address
+)
+
+
+DEFAULT_CACHE_DB = os.path.join(os.path.expanduser('~'), '.cache', 'ldo-purchase-executor', 'fork-state.sqlite')
+HTTP_TIMEOUT = 120
+
+LIDO_DAO_ADDRESSES = [
+    ldo_token_address,
+    lido_dao_acl_address,
+    lido_dao_agent_address,
+    lido_dao_finance_address,
+    lido_dao_voting_address,
+    lido_dao_token_manager_address
+]
+
+# ERCProxy.implementation(), implemented by the Aragon app proxies
+IMPLEMENTATION_SELECTOR = '0x5c60da1b'
+
+# position of the block parameter for the methods whose result only depends on it
+BLOCK_PARAM_POSITIONS = {
+    'eth_getStorageAt': 2,
+    'eth_getCode': 1,
+    'eth_getBalance': 1,
+    'eth_getTransactionCount': 1,
+    'eth_getProof': 2,
+    'eth_call': 1,
+    'eth_getBlockByNumber': 0
+}
+
+# methods whose non-null result never changes
+IMMUTABLE_METHODS = {
+    'eth_chainId',
+    'net_version',
+    'eth_getBlockByHash',
+    'eth_getTransactionByHash',
+    'eth_getTransactionReceipt'
+}
+
+BLOCK_TAGS = {'latest', 'pending', 'earliest', 'safe', 'finalized'}
+
+
+def get_cache_db_path():
+    return os.environ.get('FORK_CACHE_DB', DEFAULT_CACHE_DB)
+
+
+def is_cacheable(method, params, fork_block):
+    if method in IMMUTABLE_METHODS:
+        return True
+    position = BLOCK_PARAM_POSITIONS.get(method)
+    if position is None or len(params) <= position:
+        return False
+    block = params[position]
+    if isinstance(block, dict):
+        # EIP-1898 block parameter
+        return 'blockHash' in block or int(block.get('blockNumber', '0x0'), 16) <= fork_block
+    if block in BLOCK_TAGS:
+        return False
+    # the state at blocks up to the fork block cannot change anymore
+    return int(block, 16) <= fork_block
+
+
+def get_params_key(params):
+    # lowercased so that checksummed and lowercase addresses share the entry
+    return json.dumps(params, sort_keys=True, separators=(',', ':')).lower()
+
+
+# Responses of an archive node, stored per fork block. Only the responses
+# that cannot change anymore are stored, see is_cacheable.
+class ForkStateCache:
+    def __init__(self, db_path):
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                fork_block INTEGER NOT NULL,
+                method TEXT NOT NULL,
+                params TEXT NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (fork_block, method, params)
+            )
+        ''')
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def get(self, fork_block, method, params):
+        with self.lock:
+            row = self.db.execute(
+                'SELECT result FROM responses WHERE fork_block = ? AND method = ? AND params = ?',
+                (fork_block, method, get_params_key(params))
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_many(self, fork_block, entries):
+        with self.lock:
+            self.db.executemany(
+                'INSERT OR REPLACE INTO responses (fork_block, method, params, result) VALUES (?, ?, ?, ?)',
+                [ (fork_block, method, get_params_key(params), json.dumps(result)) for (method, params, result) in entries ]
+            )
+            self.db.commit()
+
+    def count(self, fork_block):
+        with self.lock:
+            return self.db.execute('SELECT COUNT(*) FROM responses WHERE fork_block = ?', (fork_block,)).fetchone()[0]
+
+
+def make_http_transport(url):
+    def transport(payload):
+        req = request.Request(url, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'})
+        with request.urlopen(req, timeout=HTTP_TIMEOUT) as response:
+            return json.loads(response.read())
+    return transport
+
+
+def make_error(request_id, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32000, 'message': message}}
+
+
+# JSON-RPC proxy between the local fork and the archive node. Cached responses are
+# served locally, and the misses of a request batch are forwarded as a single batch.
+# Without an upstream, misses are answered with an error, so a warm cache works offline.
+class CachingRpcProxy:
+    def __init__(self, cache, fork_block, upstream=None):
+        self.cache = cache
+        self.fork_block = fork_block
+        self.upstream = upstream
+        self.hits = 0
+        self.misses = 0
+
+    def handle(self, payload):
+        if isinstance(payload, list):
+            return self.handle_batch(payload)
+        return self.handle_batch([payload])[0]
+
+    def handle_batch(self, requests):
+        responses = [None] * len(requests)
+        misses = []
+
+        for (i, req) in enumerate(requests):
+            (method, params) = (req.get('method'), req.get('params', []))
+            if method == 'eth_blockNumber':
+                # the fork never needs to see blocks past the one it was pinned to
+                responses[i] = {'jsonrpc': '2.0', 'id': req.get('id'), 'result': hex(self.fork_block)}
+                continue
+            if is_cacheable(method, params, self.fork_block):
+                result = self.cache.get(self.fork_block, method, params)
+                if result is not None:
+                    self.hits += 1
+                    responses[i] = {'jsonrpc': '2.0', 'id': req.get('id'), 'result': result}
+                    continue
+            misses.append(i)
+
+        self.misses += len(misses)
+
+        if len(misses) != 0:
+            for (i, response) in zip(misses, self.forward([ requests[i] for i in misses ])):
+                responses[i] = response
+
+        return responses
+
+    def forward(self, requests):
+        if self.upstream is None:
+            return [ make_error(req.get('id'), f'fork state cache miss: {req.get("method")}') for req in requests ]
+
+        payload = [ {**req, 'id': i} for (i, req) in enumerate(requests) ]
+        try:
+            upstream_responses = {r['id']: r for r in self.upstream(payload)}
+        except (URLError, OSError) as err:
+            return [ make_error(req.get('id'), f'upstream unavailable: {err}') for req in requests ]
+
+        responses = []
+        entries = []
+
+        for (i, req) in enumerate(requests):
+            response = {**upstream_responses[i], 'id': req.get('id')}
+            responses.append(response)
+            (method, params) = (req.get('method'), req.get('params', []))
+            if response.get('result') is not None and is_cacheable(method, params, self.fork_block):
+                entries.append((method, params, response['result']))
+
+        if len(entries) != 0:
+            self.cache.put_many(self.fork_block, entries)
+
+        return responses
+
+
+def make_request_handler(proxy):
+    class RpcRequestHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            data = json.dumps(proxy.handle(payload)).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return RpcRequestHandler
+
+
+def make_server(proxy, host='127.0.0.1', port=0):
+    return ThreadingHTTPServer((host, port), make_request_handler(proxy))
+
+
+def warm(proxy, addresses=LIDO_DAO_ADDRESSES):
+    # Fetches the account state of the given addresses and of their implementation
+    # contracts. Storage slots cannot be enumerated over JSON-RPC, so these get
+    # cached by the first run of a script through the proxy.
+    block = hex(proxy.fork_block)
+    proxy.handle({'jsonrpc': '2.0', 'id': 0, 'method': 'eth_getBlockByNumber', 'params': [block, False]})
+
+    implementation_calls = [
+        {'jsonrpc': '2.0', 'id': i, 'method': 'eth_call', 'params': [{'to': address, 'data': IMPLEMENTATION_SELECTOR}, block]}
+        for (i, address) in enumerate(addresses)
+    ]
+    implementations = [
+        '0x' + response['result'][-40:]
+        for response in proxy.handle(implementation_calls)
+        if len(response.get('result') or '') == 66
+    ]
+
+    all_addresses = list(addresses) + [ a for a in implementations if int(a, 16) != 0 ]
+    proxy.handle([
+        {'jsonrpc': '2.0', 'id': i, 'method': method, 'params': [address, block]}
+        for (i, (method, address)) in enumerate(
+            (method, address)
+            for address in all_addresses
+            for method in ('eth_getCode', 'eth_getBalance', 'eth_getTransactionCount')
+        )
+    ])
+
+    return all_addresses
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m utils.fork_cache')
+    parser.add_argument('--db', default=get_cache_db_path())
+    parser.add_argument('--fork-block', type=int, required=True)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='run the caching proxy for a local fork')
+    serve_parser.add_argument('--upstream', help='archive node URL, omit to work offline')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8549)
+
+    warm_parser = subparsers.add_parser('warm', help='pre-fetch the state of the Lido DAO contracts')
+    warm_parser.add_argument('--upstream', required=True, help='archive node URL')
+
+    args = parser.parse_args(argv)
+    upstream = make_http_transport(args.upstream) if args.upstream else None
+    proxy = CachingRpcProxy(ForkStateCache(args.db), args.fork_block, upstream)
+
+    if args.command == 'warm':
+        addresses = warm(proxy)
+        print(f'Warmed {len(addresses)} accounts at block {args.fork_block}: {proxy.misses} fetched, {proxy.hits} cached')
+        return 0
+
+    server = make_server(proxy, args.host, args.port)
+    mode = f'forwarding misses to {args.upstream}' if upstream else 'offline'
+    print(f'Serving block {args.fork_block} on http://{args.host}:{args.port}, {mode}, {proxy.cache.count(args.fork_block)} cached responses')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f'Cache hits: {proxy.hits}, misses: {proxy.misses}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,100 @@
+import json
+import os
+from functools import lru_cache
+
+from eth_abi import decode_abi, encode_abi
+from eth_utils import function_abi_to_4byte_selector
+
+from utils.addresses import (
+    lido_dao_acl_address,
+    lido_dao_agent_address,
+    lido_dao_finance_address,
+    lido_dao_voting_address,
+    lido_dao_token_manager_address
+)
+
+
+INTERFACES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'interfaces')
+
+INTERFACE_NAMES_BY_ADDRESS = {
+    lido_dao_acl_address.lower(): 'ACL',
+    lido_dao_agent_address.lower(): 'Agent',
+    lido_dao_finance_address.lower(): 'Finance',
+    lido_dao_voting_address.lower(): 'Voting',
+    lido_dao_token_manager_address.lower(): 'TokenManager'
+}
+
+
+def list_interface_names():
+    return sorted(
+        os.path.splitext(filename)[0]
+        for filename in os.listdir(INTERFACES_DIR)
+        if filename.endswith('.json')
+    )
+
+
+@lru_cache(maxsize=None)
+def load_interface_abi(name):
+    with open(os.path.join(INTERFACES_DIR, f'{name}.json')) as abi_file:
+        return json.load(abi_file)
+
+
+def get_function_signature(fn_abi):
+    return f'{fn_abi["name"]}({",".join(get_arg_types(fn_abi["inputs"]))})'
+
+
+def get_arg_types(args_abi):
+    types = []
+    for arg in args_abi:
+        if arg['type'].startswith('tuple'):
+            types.append(f'({",".join(get_arg_types(arg["components"]))}){arg["type"][5:]}')
+        else:
+            types.append(arg['type'])
+    return types
+
+
+@lru_cache(maxsize=None)
+def get_function_abis_by_selector(interface_name):
+    return {
+        function_abi_to_4byte_selector(fn_abi): fn_abi
+        for fn_abi in load_interface_abi(interface_name)
+        if fn_abi.get('type') == 'function'
+    }
+
+
+def find_function_abi(selector, target=None, extra_abis=None):
+    # returns (interface name, function ABI), preferring the interface known for the target address
+    candidates = list_interface_names()
+    known_name = INTERFACE_NAMES_BY_ADDRESS.get(str(target).lower())
+    if known_name is not None:
+        candidates = [known_name] + [name for name in candidates if name != known_name]
+
+    for name in candidates:
+        fn_abi = get_function_abis_by_selector(name).get(selector)
+        if fn_abi is not None:
+            return (name, fn_abi)
+
+    for (name, abi) in (extra_abis or {}).items():
+        for fn_abi in abi:
+            if fn_abi.get('type') == 'function' and function_abi_to_4byte_selector(fn_abi) == selector:
+                return (name, fn_abi)
+
+    return (None, None)
+
+
+def decode_function_args(fn_abi, args_data):
+    values = decode_abi(get_arg_types(fn_abi['inputs']), args_data)
+    return [ (arg['name'], arg['type'], value) for (arg, value) in zip(fn_abi['inputs'], values) ]
+
+
+def find_function_abi_by_name(interface_name, fn_name, args_count):
+    # overloads are told apart by the number of args, which is enough for the DAO apps
+    for fn_abi in load_interface_abi(interface_name):
+        if fn_abi.get('type') == 'function' and fn_abi['name'] == fn_name and len(fn_abi['inputs']) == args_count:
+            return fn_abi
+    raise KeyError(f'{interface_name} has no function {fn_name} taking {args_count} args')
+
+
+def encode_function_call(interface_name, fn_name, args):
+    fn_abi = find_function_abi_by_name(interface_name, fn_name, len(args))
+    return function_abi_to_4byte_selector(fn_abi) + encode_abi(get_arg_types(fn_abi['inputs']), args)
@@ -1,7 +1,25 @@
+import os
 from contextlib import contextmanager
-from brownie import chain, accounts, interface
+from brownie import chain, accounts, interface, web3
 
 from utils.config import lido_dao_voting_address
+from utils.evm_script import decode_call_script
+
+
+# faithful: each vote is voted for by LDO holders and executed after its own time jump
+# batch: all pending votes are voted for, then executed after a single time jump
+# direct: the EVM script of each vote is executed from the impersonated Voting app,
+#         leaving the vote itself open
+VOTE_MODES = ('faithful', 'batch', 'direct')
+
+# together these accounts hold 15% of LDO total supply
+LDO_HOLDERS = [
+    '0x3e40d73eb977dc6a537af587d48316fee66e9c8c',
+    '0xb8d83908aab38a159f3da47a59d84db8e1838712',
+    '0xa2dfc431297aee387c05beef507e5335e684fbcd'
+]
+
+VOTE_DURATION = 3 * 60 * 60 * 24
 
 
 @contextmanager
@@ -15,40 +33,95 @@ def chain_snapshot():
         chain.revert()
 
 
-def pass_and_exec_dao_vote(vote_id):
+@contextmanager
+def nested_chain_snapshot():
+    # unlike chain.snapshot(), which has a single slot, raw snapshots can be nested
+    # inside each other and inside the one held by chain_snapshot()
+    snapshot_id = web3.provider.make_request('evm_snapshot', [])['result']
+    try:
+        yield
+    finally:
+        web3.provider.make_request('evm_revert', [snapshot_id])
+
+
+def get_vote_mode(default='batch'):
+    mode = os.environ.get('VOTE_MODE', default)
+    if mode not in VOTE_MODES:
+        raise EnvironmentError(f'VOTE_MODE must be one of: {", ".join(VOTE_MODES)}')
+    return mode
+
+
+def pass_and_exec_dao_vote(vote_id, mode=None):
+    pass_and_exec_dao_votes([vote_id], mode)
+
+
+def pass_and_exec_dao_votes(vote_ids, mode=None):
+    mode = mode or get_vote_mode()
     dao_voting = interface.Voting(lido_dao_voting_address)
 
-    if dao_voting.getVote(vote_id)['executed']:
-        print(f'[ok] Vote {vote_id} already executed')
+    pending_vote_ids = []
+    for vote_id in vote_ids:
+        if dao_voting.getVote(vote_id)['executed']:
+            print(f'[ok] Vote {vote_id} already executed')
+        else:
+            pending_vote_ids.append(vote_id)
+
+    if len(pending_vote_ids) == 0:
         return
 
+    if mode == 'direct':
+        for vote_id in pending_vote_ids:
+            apply_dao_vote_script(dao_voting, vote_id)
+    elif mode == 'batch':
+        pass_dao_votes(dao_voting, pending_vote_ids)
+        for vote_id in pending_vote_ids:
+            exec_dao_vote(dao_voting, vote_id)
+    else:
+        for vote_id in pending_vote_ids:
+            pass_dao_votes(dao_voting, [vote_id])
+            exec_dao_vote(dao_voting, vote_id)
+
+
+def pass_dao_votes(dao_voting, vote_ids):
     helper_acct = accounts[0]
+    vote_ids = [ vote_id for vote_id in vote_ids if not dao_voting.canExecute(vote_id) ]
 
-    if not dao_voting.canExecute(vote_id):
-        print(f'Passing vote {vote_id}')
+    if len(vote_ids) == 0:
+        return
 
-        # together these accounts hold 15% of LDO total supply
-        ldo_holders = [
-            '0x3e40d73eb977dc6a537af587d48316fee66e9c8c',
-            '0xb8d83908aab38a159f3da47a59d84db8e1838712',
-            '0xa2dfc431297aee387c05beef507e5335e684fbcd'
-        ]
+    print(f'Passing votes {", ".join(str(vote_id) for vote_id in vote_ids)}')
 
-        for holder_addr in ldo_holders:
-            print(f'  voting from {holder_addr}')
-            helper_acct.transfer(holder_addr, '0.1 ether', silent=True)
-            account = accounts.at(holder_addr, force=True)
+    for holder_addr in LDO_HOLDERS:
+        print(f'  voting from {holder_addr}')
+        helper_acct.transfer(holder_addr, '0.1 ether', silent=True)
+        account = accounts.at(holder_addr, force=True)
+        for vote_id in vote_ids:
             dao_voting.vote(vote_id, True, False, {'from': account, 'silent': True})
 
-        # wait for the vote to end
-        chain.sleep(3 * 60 * 60 * 24)
-        chain.mine()
+    # wait for the votes to end
+    chain.sleep(VOTE_DURATION)
+    chain.mine()
 
+    for vote_id in vote_ids:
         assert dao_voting.canExecute(vote_id)
 
+
+def exec_dao_vote(dao_voting, vote_id):
     print(f'Executing vote {vote_id}')
 
-    dao_voting.executeVote(vote_id, {'from': helper_acct, 'silent': True})
+    dao_voting.executeVote(vote_id, {'from': accounts[0], 'silent': True})
     assert dao_voting.getVote(vote_id)['executed']
 
     print(f'[ok] Vote {vote_id} executed')
+
+
+def apply_dao_vote_script(dao_voting, vote_id):
+    # Voting runs the script through the call script executor on its own behalf,
+    # so the actions are sent from the impersonated Voting app one by one
+    print(f'Applying the script of vote {vote_id}')
+
+    voting_acct = accounts.at(lido_dao_voting_address, force=True)
+    for (to, calldata) in decode_call_script(dao_voting.getVote(vote_id)['script']):
+        voting_acct.transfer(to=web3.toChecksumAddress(to), amount=0, data=calldata, gas_price=0, silent=True)
+
+    print(f'[ok] Vote {vote_id} script applied')
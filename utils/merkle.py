@@ -0,0 +1,154 @@
+import argparse
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from eth_utils import keccak, to_canonical_address, to_checksum_address
+
+
+# Must match MAX_PROOF_LENGTH of MerklePurchaseExecutor.vy
+MAX_PROOF_LENGTH = 32
+
+
+def get_leaf(address, allocation):
+    # the same as MerklePurchaseExecutor._get_leaf: the leaf is hashed twice so that
+    # a pair of inner nodes can never be passed off as a (purchaser, allocation) leaf
+    encoded = to_canonical_address(address).rjust(32, b'\0') + int(allocation).to_bytes(32, 'big')
+    return keccak(keccak(encoded))
+
+
+def hash_pair(a, b):
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+def verify_proof(leaf, proof, root):
+    node = leaf
+    for sibling in proof:
+        node = hash_pair(node, sibling)
+    return node == root
+
+
+# Merkle tree of (purchaser, allocation) pairs with sorted-pair hashing. Leaves are kept in
+# the order of the purchasers list; a node without a sibling is moved to the next layer as is.
+class AllocationsMerkleTree:
+    def __init__(self, ldo_purchasers):
+        ldo_purchasers = [ (to_checksum_address(p[0]), int(p[1])) for p in ldo_purchasers ]
+        assert len(ldo_purchasers) > 0, 'no purchasers'
+
+        self.allocations = dict(ldo_purchasers)
+        assert len(self.allocations) == len(ldo_purchasers), 'duplicate purchasers'
+
+        self.allocations_total = sum(self.allocations.values())
+        self._leaf_indices = {address: i for (i, (address, _)) in enumerate(ldo_purchasers)}
+        self.layers = [[ get_leaf(address, allocation) for (address, allocation) in ldo_purchasers ]]
+
+        while len(self.layers[-1]) > 1:
+            layer = self.layers[-1]
+            next_layer = [ hash_pair(layer[i], layer[i + 1]) for i in range(0, len(layer) - 1, 2) ]
+            if len(layer) % 2 == 1:
+                next_layer.append(layer[-1])
+            self.layers.append(next_layer)
+
+        assert len(self.layers) - 1 <= MAX_PROOF_LENGTH, 'too many purchasers'
+
+    @property
+    def root(self):
+        return self.layers[-1][0]
+
+    def __len__(self):
+        return len(self.layers[0])
+
+    def __contains__(self, address):
+        return to_checksum_address(address) in self._leaf_indices
+
+    def get_allocation(self, address):
+        return self.allocations[to_checksum_address(address)]
+
+    def get_proof(self, address):
+        index = self._leaf_indices[to_checksum_address(address)]
+        proof = []
+        for layer in self.layers[:-1]:
+            sibling_index = index ^ 1
+            if sibling_index < len(layer):
+                proof.append(layer[sibling_index])
+            index //= 2
+        return proof
+
+    def to_json(self):
+        return {
+            'root': '0x' + self.root.hex(),
+            'allocations_total': str(self.allocations_total),
+            'claims': {
+                address: get_claim_json(self, address)
+                for address in self.allocations
+            }
+        }
+
+
+def get_claim_json(tree, address):
+    return {
+        'allocation': str(tree.get_allocation(address)),
+        'proof': [ '0x' + node.hex() for node in tree.get_proof(address) ]
+    }
+
+
+def make_proof_request_handler(tree):
+    class ProofRequestHandler(BaseHTTPRequestHandler):
+        # GET /root and GET /proof/<address>
+        def do_GET(self):
+            parts = self.path.strip('/').split('/')
+            if parts == ['root']:
+                return self.send_json(200, {'root': '0x' + tree.root.hex(), 'allocations_total': str(tree.allocations_total)})
+            if len(parts) == 2 and parts[0] == 'proof':
+                try:
+                    if parts[1] in tree:
+                        return self.send_json(200, {'address': to_checksum_address(parts[1]), **get_claim_json(tree, parts[1])})
+                except ValueError:
+                    return self.send_json(400, {'error': f'invalid address: {parts[1]}'})
+                return self.send_json(404, {'error': f'not a purchaser: {parts[1]}'})
+            return self.send_json(404, {'error': 'not found'})
+
+        def send_json(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return ProofRequestHandler
+
+
+def read_tree(csv_filename):
+    # imported here so that the module doesn't depend on the project config when used as a library
+    from purchase_config import read_csv_purchasers
+    return AllocationsMerkleTree(read_csv_purchasers(csv_filename, allocations_total=None))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m utils.merkle')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    dump_parser = subparsers.add_parser('dump', help='print the root and the proofs of all purchasers as JSON')
+    dump_parser.add_argument('csv_filename')
+
+    serve_parser = subparsers.add_parser('serve', help='serve the proofs over HTTP')
+    serve_parser.add_argument('csv_filename')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8000)
+
+    args = parser.parse_args(argv)
+    tree = read_tree(args.csv_filename)
+
+    if args.command == 'dump':
+        json.dump(tree.to_json(), sys.stdout, indent=2)
+        print()
+        return 0
+
+    print(f'Serving proofs for {len(tree)} purchasers, root 0x{tree.root.hex()}, on http://{args.host}:{args.port}')
+    ThreadingHTTPServer((args.host, args.port), make_proof_request_handler(tree)).serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,305 @@
+import argparse
+import getpass
+import json
+import sys
+import time
+
+from eth_account import Account
+from eth_utils import keccak, to_canonical_address, to_checksum_address
+
+from utils.aragon_constants import get_role_hash
+from utils.artifact_cache import load_artifact
+from utils.create2 import encode_constructor_args
+from utils.evm_script import encode_call_script, to_bytes, EMPTY_CALLSCRIPT
+from utils.interfaces import encode_function_call
+from utils.sharding import pad_purchasers
+
+from utils.addresses import (
+    ldo_token_address,
+    lido_dao_acl_address,
+    lido_dao_finance_address,
+    lido_dao_voting_address,
+    lido_dao_token_manager_address
+)
+
+
+DEFAULT_DEPLOY_GAS_LIMIT = 4_000_000
+DEFAULT_VOTE_GAS_LIMIT = 1_000_000
+RECEIPT_POLL_INTERVAL = 5
+
+
+# Builds the deployment and the DAO vote of deploy_and_start_dao_vote without a node:
+# the calls are encoded from the ABIs in interfaces/, the role hashes come from the
+# precomputed table of utils.aragon_constants, the executor address is derived from
+# the sender and the nonce, and the transactions are signed with explicit nonces,
+# gas limits and fees.
+
+
+def encode_rlp_bytes(value):
+    if len(value) == 1 and value[0] < 0x80:
+        return value
+    assert len(value) < 56
+    return bytes([0x80 + len(value)]) + value
+
+
+def get_create_address(sender, nonce):
+    # keccak256(rlp([sender, nonce]))[12:]
+    nonce_bytes = nonce.to_bytes((nonce.bit_length() + 7) // 8, 'big')
+    payload = encode_rlp_bytes(to_canonical_address(sender)) + encode_rlp_bytes(nonce_bytes)
+    return to_checksum_address(keccak(bytes([0xc0 + len(payload)]) + payload)[12:])
+
+
+def encode_vesting_manager_calls(manager_address, total_ldo_amount, ldo_transfer_reference):
+    # the same calls as scripts.deploy.encode_vesting_manager_calls
+    return [
+        (
+            lido_dao_finance_address,
+            encode_function_call('Finance', 'newImmediatePayment', [ldo_token_address, manager_address, total_ldo_amount, ldo_transfer_reference])
+        ),
+        (
+            lido_dao_acl_address,
+            encode_function_call('ACL', 'grantPermission', [manager_address, lido_dao_token_manager_address, to_bytes(get_role_hash('TokenManager', 'ASSIGN_ROLE'))])
+        )
+    ]
+
+
+def encode_create_vote_forward(vote_desc, evm_script):
+    # the same calldata as utils.dao.create_vote sends to TokenManager.forward
+    new_vote_script = encode_call_script([(
+        lido_dao_voting_address,
+        encode_function_call('Voting', 'newVote', [to_bytes(evm_script if evm_script is not None else EMPTY_CALLSCRIPT), vote_desc, False, False])
+    )])
+    return encode_function_call('TokenManager', 'forward', [new_vote_script])
+
+
+def encode_executor_deployment(
+    contract_name,
+    eth_to_ldo_rate,
+    vesting_start_delay,
+    vesting_end_delay,
+    offer_expiration_delay,
+    ldo_purchasers,
+    allocations_total
+):
+    artifact = load_artifact(contract_name)
+    if artifact is None:
+        raise FileNotFoundError(f'no cached or fresh build artifact of {contract_name}, compile it or restore the artifacts cache first')
+
+    (ldo_recipients, ldo_allocations) = pad_purchasers(ldo_purchasers)
+    return to_bytes(artifact['bytecode']) + encode_constructor_args(
+        eth_to_ldo_rate,
+        vesting_start_delay,
+        vesting_end_delay,
+        offer_expiration_delay,
+        ldo_recipients,
+        ldo_allocations,
+        allocations_total
+    )
+
+
+def make_tx(nonce, gas, data, chain_id, fees, to=None, value=0):
+    # fees: {'gas_price': wei} for a legacy transaction, or
+    # {'max_fee': wei, 'priority_fee': wei} for an EIP-1559 one
+    tx = {
+        'nonce': nonce,
+        'gas': gas,
+        'value': value,
+        'data': '0x' + to_bytes(data).hex(),
+        'chainId': chain_id
+    }
+    if to is not None:
+        tx['to'] = to_checksum_address(to)
+    if 'gas_price' in fees:
+        tx['gasPrice'] = fees['gas_price']
+    else:
+        tx['maxFeePerGas'] = fees['max_fee']
+        tx['maxPriorityFeePerGas'] = fees['priority_fee']
+        tx['type'] = 2
+    return tx
+
+
+def build_deploy_and_vote_txs(
+    sender,
+    nonce,
+    chain_id,
+    fees,
+    eth_to_ldo_rate,
+    vesting_start_delay,
+    vesting_end_delay,
+    offer_expiration_delay,
+    ldo_purchasers,
+    allocations_total,
+    contract_name='PurchaseExecutor',
+    deploy_gas_limit=DEFAULT_DEPLOY_GAS_LIMIT,
+    vote_gas_limit=DEFAULT_VOTE_GAS_LIMIT
+):
+    # returns [(description, unsigned tx)] and the address the executor will be deployed at
+    executor_address = get_create_address(sender, nonce)
+
+    deploy_data = encode_executor_deployment(
+        contract_name,
+        eth_to_ldo_rate,
+        vesting_start_delay,
+        vesting_end_delay,
+        offer_expiration_delay,
+        ldo_purchasers,
+        allocations_total
+    )
+
+    evm_script = encode_call_script(encode_vesting_manager_calls(
+        manager_address=executor_address,
+        total_ldo_amount=allocations_total,
+        ldo_transfer_reference='Transfer LDO tokens to be sold for ETH'
+    ))
+    vote_data = encode_create_vote_forward(
+        f'Make {executor_address} a vesting manager for total {allocations_total} LDO',
+        evm_script
+    )
+
+    txs = [
+        (f'deploy {contract_name} at {executor_address}', make_tx(nonce, deploy_gas_limit, deploy_data, chain_id, fees)),
+        ('start the DAO vote', make_tx(nonce + 1, vote_gas_limit, vote_data, chain_id, fees, to=lido_dao_token_manager_address))
+    ]
+    return (txs, executor_address)
+
+
+def sign_bundle(txs, private_key, chain_id, metadata=None):
+    account = Account.from_key(private_key)
+    transactions = []
+    for (description, tx) in txs:
+        signed = Account.sign_transaction(tx, private_key)
+        transactions.append({
+            'description': description,
+            'nonce': tx['nonce'],
+            'to': tx.get('to'),
+            'hash': signed.hash.hex(),
+            'raw': signed.rawTransaction.hex()
+        })
+    return {
+        'chain_id': chain_id,
+        'from': account.address,
+        **(metadata or {}),
+        'transactions': transactions
+    }
+
+
+def broadcast_bundle(bundle, transport, wait=True):
+    # checks the sender nonce, sends all transactions as a single batch and waits for the receipts
+    from utils.batch_reads import batch_request
+
+    (nonce, chain_id) = batch_request([
+        ('eth_getTransactionCount', [bundle['from'], 'pending']),
+        ('eth_chainId', [])
+    ], transport)
+
+    if int(chain_id, 16) != bundle['chain_id']:
+        raise ValueError(f'the bundle is for chain {bundle["chain_id"]}, the node is on chain {int(chain_id, 16)}')
+    if int(nonce, 16) != bundle['transactions'][0]['nonce']:
+        raise ValueError(f'the bundle starts at nonce {bundle["transactions"][0]["nonce"]}, the sender nonce is {int(nonce, 16)}')
+
+    hashes = batch_request([ ('eth_sendRawTransaction', [tx['raw']]) for tx in bundle['transactions'] ], transport)
+    if not wait:
+        return hashes
+
+    receipts = [None] * len(hashes)
+    while any(r is None for r in receipts):
+        pending = [ i for (i, r) in enumerate(receipts) if r is None ]
+        for (i, receipt) in zip(pending, batch_request([ ('eth_getTransactionReceipt', [hashes[i]]) for i in pending ], transport)):
+            receipts[i] = receipt
+        if any(r is None for r in receipts):
+            time.sleep(RECEIPT_POLL_INTERVAL)
+
+    return receipts
+
+
+def read_private_key(keystore_path):
+    with open(keystore_path) as keystore_file:
+        keystore = json.load(keystore_file)
+    return Account.decrypt(keystore, getpass.getpass(f'Password for {keystore_path}: '))
+
+
+def get_fees(args):
+    if args.gas_price is not None:
+        return {'gas_price': args.gas_price}
+    if args.max_fee is None or args.priority_fee is None:
+        raise ValueError('set either --gas-price or both --max-fee and --priority-fee')
+    return {'max_fee': args.max_fee, 'priority_fee': args.priority_fee}
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m utils.offline_tx')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='build and sign the deployment and the DAO vote without a node')
+    build_parser.add_argument('--keystore', required=True, help='the sender keystore, e.g. ~/.brownie/accounts/deployer.json')
+    build_parser.add_argument('--nonce', type=int, required=True, help='the current nonce of the sender')
+    build_parser.add_argument('--chain-id', type=int, default=1)
+    build_parser.add_argument('--gas-price', type=int, help='in wei, for legacy transactions')
+    build_parser.add_argument('--max-fee', type=int, help='in wei, for EIP-1559 transactions')
+    build_parser.add_argument('--priority-fee', type=int, help='in wei, for EIP-1559 transactions')
+    build_parser.add_argument('--deploy-gas', type=int, default=DEFAULT_DEPLOY_GAS_LIMIT)
+    build_parser.add_argument('--vote-gas', type=int, default=DEFAULT_VOTE_GAS_LIMIT)
+    build_parser.add_argument('--contract', default='PurchaseExecutor')
+    build_parser.add_argument('--out', default='bundle.json')
+
+    broadcast_parser = subparsers.add_parser('broadcast', help='send a signed bundle in a single batch')
+    broadcast_parser.add_argument('bundle')
+    broadcast_parser.add_argument('--rpc', required=True)
+    broadcast_parser.add_argument('--no-wait', action='store_true')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'broadcast':
+        # imported here so that building a bundle needs neither brownie nor a node
+        from utils.fork_cache import make_http_transport
+
+        with open(args.bundle) as bundle_file:
+            bundle = json.load(bundle_file)
+        result = broadcast_bundle(bundle, make_http_transport(args.rpc), wait=not args.no_wait)
+        for (tx, item) in zip(bundle['transactions'], result):
+            status = item if isinstance(item, str) else f'status {int(item["status"], 16)} in block {int(item["blockNumber"], 16)}'
+            print(f'{tx["description"]}: {status}')
+        return 0
+
+    # imported here so that broadcasting doesn't need the purchasers file
+    from purchase_config import (
+        ETH_TO_LDO_RATE,
+        VESTING_START_DELAY,
+        VESTING_END_DELAY,
+        OFFER_EXPIRATION_DELAY,
+        ALLOCATIONS_TOTAL,
+        get_ldo_purchasers
+    )
+
+    private_key = read_private_key(args.keystore)
+    sender = Account.from_key(private_key).address
+
+    (txs, executor_address) = build_deploy_and_vote_txs(
+        sender=sender,
+        nonce=args.nonce,
+        chain_id=args.chain_id,
+        fees=get_fees(args),
+        eth_to_ldo_rate=ETH_TO_LDO_RATE,
+        vesting_start_delay=VESTING_START_DELAY,
+        vesting_end_delay=VESTING_END_DELAY,
+        offer_expiration_delay=OFFER_EXPIRATION_DELAY,
+        ldo_purchasers=get_ldo_purchasers(),
+        allocations_total=ALLOCATIONS_TOTAL,
+        contract_name=args.contract,
+        deploy_gas_limit=args.deploy_gas,
+        vote_gas_limit=args.vote_gas
+    )
+
+    bundle = sign_bundle(txs, private_key, args.chain_id, {'executor_address': executor_address})
+
+    with open(args.out, 'w') as bundle_file:
+        json.dump(bundle, bundle_file, indent=2)
+        bundle_file.write('\n')
+
+    print(f'Signed {len(txs)} transactions from {sender} starting at nonce {args.nonce}, executor address {executor_address}')
+    print(f'Bundle written to {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
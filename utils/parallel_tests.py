@@ -0,0 +1,201 @@
+import argparse
+import ast
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from urllib import request
+
+import yaml
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TESTS_DIR = os.path.join(PROJECT_DIR, 'tests')
+BROWNIE_CONFIG = 'brownie-config.yaml'
+
+# per-worker files that must not be shared between the worker projects
+WORKER_LOCAL_FILES = {BROWNIE_CONFIG, 'reports', '.git', '.pytest_cache', '__pycache__'}
+
+
+def collect_test_ids(tests_dir=TESTS_DIR):
+    # the test functions and the test methods of `Test*` classes, in file order
+    test_ids = []
+    for filename in sorted(os.listdir(tests_dir)):
+        if not (filename.startswith('test_') and filename.endswith('.py')):
+            continue
+        with open(os.path.join(tests_dir, filename)) as test_file:
+            tree = ast.parse(test_file.read())
+        for node in tree.body:
+            if is_test_function(node):
+                test_ids.append(f'tests/{filename}::{node.name}')
+            elif isinstance(node, ast.ClassDef) and node.name.startswith('Test'):
+                test_ids.extend(f'tests/{filename}::{node.name}::{item.name}' for item in node.body if is_test_function(item))
+    return test_ids
+
+
+def is_test_function(node):
+    return isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith('test_')
+
+
+def shard_test_ids(test_ids, shards_count):
+    # contiguous shards keep the tests of a module together, so each worker
+    # pays for module-scoped fixtures as few times as possible; no tests make
+    # no shards, as a worker given no test ids would run the whole suite
+    if len(test_ids) == 0:
+        return []
+    shards_count = max(1, min(shards_count, len(test_ids)))
+    (shard_len, remainder) = divmod(len(test_ids), shards_count)
+    shards = []
+    offset = 0
+    for i in range(shards_count):
+        size = shard_len + (1 if i < remainder else 0)
+        shards.append(test_ids[offset:offset + size])
+        offset += size
+    return shards
+
+
+def get_block_number(rpc_url):
+    payload = {'jsonrpc': '2.0', 'id': 1, 'method': 'eth_blockNumber', 'params': []}
+    req = request.Request(rpc_url, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'})
+    with request.urlopen(req, timeout=60) as response:
+        return int(json.loads(response.read())['result'], 16)
+
+
+def pin_fork_block(fork):
+    # all workers must fork from the very same block
+    if fork is None or '@' in fork:
+        return fork
+    return f'{fork}@{get_block_number(fork)}'
+
+
+def load_config():
+    with open(os.path.join(PROJECT_DIR, BROWNIE_CONFIG)) as config_file:
+        return yaml.safe_load(config_file)
+
+
+def make_worker_config(config, network, port, fork):
+    worker_config = json.loads(json.dumps(config))
+    cmd_settings = worker_config['networks'][network]['cmd_settings']
+    cmd_settings['port'] = port
+    if fork is not None:
+        cmd_settings['fork'] = fork
+    return worker_config
+
+
+def create_worker_project(root_dir, worker_id, worker_config):
+    worker_dir = os.path.join(root_dir, f'worker-{worker_id}')
+    os.makedirs(worker_dir)
+    for filename in os.listdir(PROJECT_DIR):
+        if filename not in WORKER_LOCAL_FILES:
+            os.symlink(os.path.join(PROJECT_DIR, filename), os.path.join(worker_dir, filename))
+    with open(os.path.join(worker_dir, BROWNIE_CONFIG), 'w') as config_file:
+        yaml.safe_dump(worker_config, config_file)
+    return worker_dir
+
+
+def read_junit_report(path):
+    totals = {'tests': 0, 'failures': 0, 'errors': 0, 'skipped': 0}
+    if not os.path.exists(path):
+        return None
+    root = ET.parse(path).getroot()
+    suites = [root] if root.tag == 'testsuite' else root.findall('testsuite')
+    for suite in suites:
+        for key in totals:
+            totals[key] += int(suite.get(key, 0))
+    return totals
+
+
+def run_workers(shards, config, network, base_port, fork, pytest_args):
+    root_dir = tempfile.mkdtemp(prefix='ldo-purchase-tests-')
+    workers = []
+
+    try:
+        for (worker_id, test_ids) in enumerate(shards):
+            port = base_port + worker_id
+            worker_config = make_worker_config(config, network, port, fork)
+            worker_dir = create_worker_project(root_dir, worker_id, worker_config)
+            report_path = os.path.join(root_dir, f'worker-{worker_id}.xml')
+            log_path = os.path.join(root_dir, f'worker-{worker_id}.log')
+            log_file = open(log_path, 'w')
+            cmd = ['brownie', 'test', *test_ids, '--network', network, f'--junitxml={report_path}', *pytest_args]
+            print(f'Worker {worker_id}: {len(test_ids)} test(s) on port {port}')
+            process = subprocess.Popen(cmd, cwd=worker_dir, stdout=log_file, stderr=subprocess.STDOUT)
+            workers.append((worker_id, process, log_file, log_path, report_path))
+
+        results = []
+        for (worker_id, process, log_file, log_path, report_path) in workers:
+            returncode = process.wait()
+            log_file.close()
+            results.append((worker_id, returncode, log_path, read_junit_report(report_path)))
+
+        return merge_results(results)
+    finally:
+        for (_, process, log_file, _, _) in workers:
+            if process.poll() is None:
+                process.kill()
+            log_file.close()
+        shutil.rmtree(root_dir, ignore_errors=True)
+
+
+def merge_results(results):
+    totals = {'tests': 0, 'failures': 0, 'errors': 0, 'skipped': 0}
+    failed = False
+
+    for (worker_id, returncode, log_path, report) in results:
+        if report is None:
+            report = {'tests': 0, 'failures': 0, 'errors': 1, 'skipped': 0}
+        for key in totals:
+            totals[key] += report[key]
+        if returncode != 0:
+            failed = True
+            print(f'\n===== worker {worker_id} failed (exit code {returncode}) =====')
+            with open(log_path) as log_file:
+                print(log_file.read())
+
+    passed = totals['tests'] - totals['failures'] - totals['errors'] - totals['skipped']
+    print(
+        f'\n{passed} passed, {totals["failures"]} failed, '
+        f'{totals["errors"]} errors, {totals["skipped"]} skipped'
+    )
+    return 1 if failed else 0
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m utils.parallel_tests',
+        description='Shards the test suite across several brownie processes, each with its own local chain.'
+    )
+    parser.add_argument('-n', '--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--network', default='development')
+    parser.add_argument('--base-port', type=int, default=None)
+    (args, pytest_args) = parser.parse_known_args(argv)
+
+    shards = shard_test_ids(collect_test_ids(), args.workers)
+    if len(shards) == 0:
+        print('No tests collected')
+        return 1
+
+    config = load_config()
+    cmd_settings = config['networks'][args.network]['cmd_settings']
+    base_port = args.base_port or cmd_settings['port'] + 1
+    fork = pin_fork_block(cmd_settings.get('fork'))
+
+    if fork is not None:
+        print(f'Forking from {fork}')
+
+    # compile once so that the workers find up-to-date artifacts and never write to the shared build dir
+    subprocess.run(['brownie', 'compile'], cwd=PROJECT_DIR, check=True)
+
+    started_at = time.time()
+    exit_code = run_workers(shards, config, args.network, base_port, fork, pytest_args)
+    print(f'Finished in {time.time() - started_at:.1f}s using {len(shards)} worker(s)')
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
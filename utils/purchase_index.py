@@ -0,0 +1,171 @@
+import sqlite3
+
+from brownie import web3
+from eth_utils import event_abi_to_log_topic
+
+
+INITIAL_CHUNK_SIZE = 2_000
+MAX_CHUNK_SIZE = 100_000
+# keep growing the block range while responses stay below this many logs
+TARGET_LOGS_PER_CHUNK = 1_000
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cursors (
+    executor TEXT PRIMARY KEY,
+    last_block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS offers_started (
+    executor TEXT PRIMARY KEY,
+    started_at INTEGER NOT NULL,
+    expires_at INTEGER NOT NULL,
+    block_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS purchases (
+    executor TEXT NOT NULL,
+    ldo_receiver TEXT NOT NULL,
+    ldo_allocation TEXT NOT NULL,
+    eth_cost TEXT NOT NULL,
+    vesting_id INTEGER NOT NULL,
+    block_number INTEGER NOT NULL,
+    block_timestamp INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS purchases_by_receiver ON purchases (executor, ldo_receiver);
+'''
+
+
+def iter_log_chunks(filter_params, from_block, to_block, chunk_size=INITIAL_CHUNK_SIZE):
+    while from_block <= to_block:
+        chunk_end = min(from_block + chunk_size - 1, to_block)
+        try:
+            logs = web3.eth.get_logs({**filter_params, 'fromBlock': from_block, 'toBlock': chunk_end})
+        except ValueError:
+            # providers reject ranges with too many results, retry with a smaller one
+            if chunk_size == 1:
+                raise
+            chunk_size = max(1, chunk_size // 2)
+            continue
+
+        yield (chunk_end, logs)
+
+        from_block = chunk_end + 1
+        if len(logs) < TARGET_LOGS_PER_CHUNK:
+            chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+
+
+class PurchaseIndex:
+    def __init__(self, db_path):
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        self.block_timestamps = {}
+
+    def close(self):
+        self.db.close()
+
+    def get_cursor(self, executor_address):
+        row = self.db.execute('SELECT last_block FROM cursors WHERE executor = ?', (executor_address,)).fetchone()
+        return None if row is None else row[0]
+
+    def index(self, executor, from_block=0, to_block=None, confirmations=0):
+        contract = web3.eth.contract(address=executor.address, abi=executor.abi)
+        events_by_topic = {
+            event_abi_to_log_topic(event.abi): event
+            for event in (contract.events.PurchaseExecuted(), contract.events.OfferStarted())
+        }
+        filter_params = {
+            'address': executor.address,
+            'topics': [[web3.toHex(topic) for topic in events_by_topic]]
+        }
+
+        cursor = self.get_cursor(executor.address)
+        if cursor is not None:
+            from_block = max(from_block, cursor + 1)
+
+        if to_block is None:
+            to_block = web3.eth.block_number - confirmations
+
+        logs_count = 0
+
+        for (chunk_end, logs) in iter_log_chunks(filter_params, from_block, to_block):
+            # rows and the cursor are committed together, so an interrupted run resumes cleanly
+            with self.db:
+                for log in logs:
+                    event = events_by_topic[bytes(log['topics'][0])]
+                    self._store_event(executor.address, event.processLog(log))
+                self.db.execute(
+                    'INSERT OR REPLACE INTO cursors (executor, last_block) VALUES (?, ?)',
+                    (executor.address, chunk_end)
+                )
+            logs_count += len(logs)
+
+        return logs_count
+
+    def _get_block_timestamp(self, block_number):
+        if block_number not in self.block_timestamps:
+            self.block_timestamps[block_number] = web3.eth.get_block(block_number)['timestamp']
+        return self.block_timestamps[block_number]
+
+    def _store_event(self, executor_address, event_data):
+        args = event_data['args']
+
+        if event_data['event'] == 'OfferStarted':
+            self.db.execute(
+                'INSERT OR REPLACE INTO offers_started (executor, started_at, expires_at, block_number) VALUES (?, ?, ?, ?)',
+                (executor_address, args['started_at'], args['expires_at'], event_data['blockNumber'])
+            )
+            return
+
+        self.db.execute(
+            'INSERT OR REPLACE INTO purchases '
+            '(executor, ldo_receiver, ldo_allocation, eth_cost, vesting_id, block_number, block_timestamp, tx_hash, log_index) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                executor_address,
+                args['ldo_receiver'],
+                # amounts don't fit into SQLite integers
+                str(args['ldo_allocation']),
+                str(args['eth_cost']),
+                args['vesting_id'],
+                event_data['blockNumber'],
+                self._get_block_timestamp(event_data['blockNumber']),
+                event_data['transactionHash'].hex(),
+                event_data['logIndex']
+            )
+        )
+
+    def get_offer_started(self, executor_address):
+        row = self.db.execute(
+            'SELECT started_at, expires_at FROM offers_started WHERE executor = ?',
+            (executor_address,)
+        ).fetchone()
+        return None if row is None else {'started_at': row[0], 'expires_at': row[1]}
+
+    def get_purchases(self, executor_address):
+        rows = self.db.execute(
+            'SELECT ldo_receiver, ldo_allocation, eth_cost, vesting_id, block_number, block_timestamp '
+            'FROM purchases WHERE executor = ? ORDER BY block_number, log_index',
+            (executor_address,)
+        )
+        return {
+            ldo_receiver: {
+                'ldo_allocation': int(ldo_allocation),
+                'eth_cost': int(eth_cost),
+                'vesting_id': vesting_id,
+                'block_number': block_number,
+                'block_timestamp': block_timestamp
+            }
+            for (ldo_receiver, ldo_allocation, eth_cost, vesting_id, block_number, block_timestamp) in rows
+        }
+
+    def get_purchase_status(self, executor_address, ldo_purchasers):
+        purchases = self.get_purchases(executor_address)
+        status = []
+        for (purchaser, allocation) in ldo_purchasers:
+            purchase = purchases.get(str(purchaser))
+            if purchase is None:
+                status.append((purchaser, 0, allocation, None))
+            else:
+                status.append((purchaser, purchase['ldo_allocation'], allocation - purchase['ldo_allocation'], purchase['vesting_id']))
+        return status
@@ -0,0 +1,206 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from brownie import web3
+
+
+# upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, float('inf'))
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CALLER_DIRS = tuple(os.path.join(REPO_ROOT, name) + os.sep for name in ('scripts', 'utils'))
+# the modules sending the requests, whose frames are never reported as the caller
+TRANSPORT_FILES = tuple(os.path.join(REPO_ROOT, 'utils', f'{name}.py') for name in ('rpc_profiler', 'batch_reads', 'async_rpc'))
+
+# the time of a request to a fork includes fetching the state missing on the fork,
+# so view calls to an untouched account are slow on a cold fork
+METHOD_CATEGORIES = {
+    'eth_call': 'view',
+    'eth_getBalance': 'view',
+    'eth_getCode': 'view',
+    'eth_getStorageAt': 'view',
+    'eth_getTransactionCount': 'view',
+    'eth_estimateGas': 'view',
+    'eth_sendTransaction': 'mining',
+    'eth_sendRawTransaction': 'mining',
+    'eth_getTransactionReceipt': 'mining',
+    'evm_mine': 'mining',
+    'evm_increaseTime': 'mining',
+    'evm_snapshot': 'snapshot',
+    'evm_revert': 'snapshot'
+}
+
+_profiler = None
+
+
+def is_rpc_profile_enabled():
+    return os.environ.get('RPC_PROFILE') == '1'
+
+
+def get_profiler():
+    return _profiler
+
+
+def get_caller():
+    # the innermost function of scripts/ or utils/ that led to the request,
+    # skipping the transports themselves
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename not in TRANSPORT_FILES and filename.startswith(CALLER_DIRS):
+            module = os.path.relpath(filename, REPO_ROOT)[:-len('.py')].replace(os.sep, '.')
+            return f'{module}:{frame.f_code.co_name}'
+        frame = frame.f_back
+    return '<other>'
+
+
+def get_json_size(value):
+    return len(json.dumps(value, default=str).encode())
+
+
+def get_batch_method(methods):
+    methods = set(methods)
+    return f'batch:{methods.pop()}' if len(methods) == 1 else 'batch'
+
+
+# Records every JSON-RPC request made through the wrapped provider, the batch transport
+# and the async client. Requests made through the provider are measured after web3 has
+# encoded them, so their sizes are the sizes of the JSON payloads, not of the HTTP bodies.
+class RpcProfiler:
+    def __init__(self, trace_path=None):
+        self.trace_path = trace_path
+        self.trace = []
+        self.stats = defaultdict(lambda: {
+            'count': 0,
+            'errors': 0,
+            'duration': 0.0,
+            'bytes_sent': 0,
+            'bytes_received': 0,
+            'histogram': [0] * len(LATENCY_BUCKETS_MS)
+        })
+        self.requests_count = 0
+        self.reports_at_exit = False
+        self.started_at = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def record(self, method, duration, bytes_sent, bytes_received, transport, error=False, caller=None):
+        caller = caller or get_caller()
+        bucket = next(i for (i, bound) in enumerate(LATENCY_BUCKETS_MS) if duration * 1000 <= bound)
+
+        with self.lock:
+            self.requests_count += 1
+            stats = self.stats[(method, caller)]
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['duration'] += duration
+            stats['bytes_sent'] += bytes_sent
+            stats['bytes_received'] += bytes_received
+            stats['histogram'][bucket] += 1
+
+            if self.trace_path is not None:
+                self.trace.append({
+                    'time': time.perf_counter() - self.started_at,
+                    'method': method,
+                    'caller': caller,
+                    'transport': transport,
+                    'duration': duration,
+                    'bytes_sent': bytes_sent,
+                    'bytes_received': bytes_received,
+                    'error': error
+                })
+
+    def wrap_provider(self, provider):
+        make_request = provider.make_request
+
+        def profiled_make_request(method, params):
+            started_at = time.perf_counter()
+            response = make_request(method, params)
+            self.record(
+                method,
+                time.perf_counter() - started_at,
+                get_json_size({'jsonrpc': '2.0', 'id': 0, 'method': method, 'params': params}),
+                get_json_size(response),
+                'provider',
+                error='error' in response
+            )
+            return response
+
+        provider.make_request = profiled_make_request
+
+    def get_summary(self):
+        rows = []
+        with self.lock:
+            for ((method, caller), stats) in self.stats.items():
+                rows.append({
+                    'method': method,
+                    'category': METHOD_CATEGORIES.get(method.split(':')[-1], 'other'),
+                    'caller': caller,
+                    **stats,
+                    'histogram': list(stats['histogram'])
+                })
+        return sorted(rows, key=lambda row: row['duration'], reverse=True)
+
+    def print_summary(self, file=None):
+        file = file or sys.stderr
+        rows = self.get_summary()
+        bucket_names = [ f'<={bound}ms' if bound != float('inf') else 'more' for bound in LATENCY_BUCKETS_MS ]
+
+        print(f'\nRPC profile, {time.perf_counter() - self.started_at:.1f} s in total:', file=file)
+        print(
+            f'{"method":<32}{"category":<10}{"caller":<56}{"count":>7}{"errors":>7}{"total s":>9}{"mean ms":>9}{"sent":>10}{"received":>11}  '
+            + ' '.join(f'{name:>7}' for name in bucket_names),
+            file=file
+        )
+        for row in rows:
+            print(
+                f'{row["method"]:<32}{row["category"]:<10}{row["caller"]:<56}{row["count"]:>7}{row["errors"]:>7}'
+                f'{row["duration"]:>9.2f}{row["duration"] * 1000 / row["count"]:>9.1f}'
+                f'{row["bytes_sent"]:>10}{row["bytes_received"]:>11}  '
+                + ' '.join(f'{count:>7}' for count in row['histogram']),
+                file=file
+            )
+
+        totals = defaultdict(lambda: [0, 0.0])
+        for row in rows:
+            totals[row['category']][0] += row['count']
+            totals[row['category']][1] += row['duration']
+        print('By category: ' + ', '.join(f'{name} {count} requests in {duration:.2f} s' for (name, (count, duration)) in totals.items()), file=file)
+
+    def write_trace(self):
+        if self.trace_path is None:
+            return
+        with open(self.trace_path, 'w') as trace_file:
+            json.dump({'requests': self.trace, 'summary': self.get_summary()}, trace_file, indent=2)
+            trace_file.write('\n')
+
+    def finish(self):
+        self.print_summary()
+        self.write_trace()
+
+
+def install(trace_path=None, report_at_exit=False):
+    # wraps the brownie provider once, later calls return the same profiler
+    global _profiler
+    if _profiler is None:
+        if web3.provider is None:
+            return None
+        _profiler = RpcProfiler(trace_path)
+        _profiler.wrap_provider(web3.provider)
+    if report_at_exit and not _profiler.reports_at_exit:
+        _profiler.reports_at_exit = True
+        atexit.register(_profiler.finish)
+    return _profiler
+
+
+def install_from_env():
+    # Called first thing by the scripts' main(). RPC_PROFILE=1 profiles the requests
+    # of the running script and prints a summary at exit, RPC_PROFILE_TRACE additionally
+    # writes every request and the summary to the given file.
+    if not is_rpc_profile_enabled():
+        return _profiler
+    return install(os.environ.get('RPC_PROFILE_TRACE'), report_at_exit=True)
@@ -0,0 +1,83 @@
+import json
+import math
+
+
+MAX_SHARD_SIZE = 50
+
+
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+
+def pad_purchasers(ldo_purchasers):
+    # the executor constructor takes fixed-size lists padded by zeroes
+    if len(ldo_purchasers) > MAX_SHARD_SIZE:
+        raise ValueError(f'an executor takes at most {MAX_SHARD_SIZE} purchasers, got {len(ldo_purchasers)}; use deploy_sharded instead')
+
+    zero_padding_len = MAX_SHARD_SIZE - len(ldo_purchasers)
+    ldo_recipients = [ p[0] for p in ldo_purchasers ] + [ZERO_ADDRESS] * zero_padding_len
+    ldo_allocations = [ p[1] for p in ldo_purchasers ] + [0] * zero_padding_len
+
+    return (ldo_recipients, ldo_allocations)
+
+
+def partition_purchasers(ldo_purchasers, max_shard_size=MAX_SHARD_SIZE):
+    # Splits the purchasers into as few shards as the size limit allows, with sizes
+    # differing by at most one. The largest allocations are placed first, each into
+    # the shard with the smallest allocations sum that still has room, so that the
+    # shards hold similar amounts of LDO. Each shard keeps the original order.
+    ldo_purchasers = list(ldo_purchasers)
+    if len(ldo_purchasers) == 0:
+        return []
+
+    shards_count = math.ceil(len(ldo_purchasers) / max_shard_size)
+    # `extra_count` shards get one purchaser more than the others
+    (base_size, extra_count) = divmod(len(ldo_purchasers), shards_count)
+
+    indices = [ [] for _ in range(shards_count) ]
+    sums = [0] * shards_count
+
+    def has_room(shard):
+        size = len(indices[shard])
+        if size < base_size:
+            return True
+        return size == base_size and sum(len(i) > base_size for i in indices) < extra_count
+
+    by_allocation = sorted(range(len(ldo_purchasers)), key=lambda i: (-ldo_purchasers[i][1], i))
+    for i in by_allocation:
+        shard = min(
+            (s for s in range(shards_count) if has_room(s)),
+            key=lambda s: (sums[s], len(indices[s]), s)
+        )
+        indices[shard].append(i)
+        sums[shard] += ldo_purchasers[i][1]
+
+    return [ [ ldo_purchasers[i] for i in sorted(shard_indices) ] for shard_indices in indices ]
+
+
+def make_shards_manifest(shards, executor_addresses, contract_name, config):
+    # the manifest is read by scripts/check_fleet.py; `purchasers` maps each
+    # purchaser to the index of their shard in `executors`
+    return {
+        'executors': [
+            {
+                'name': f'shard {i}',
+                'address': str(address),
+                'contract': contract_name,
+                'purchasers': [ [str(p[0]), str(p[1])] for p in shard ],
+                'allocations_total': str(sum(p[1] for p in shard)),
+                **{ name: str(value) for (name, value) in config.items() }
+            }
+            for (i, (shard, address)) in enumerate(zip(shards, executor_addresses))
+        ],
+        'purchasers': {
+            str(p[0]): i
+            for (i, shard) in enumerate(shards)
+            for p in shard
+        }
+    }
+
+
+def write_shards_manifest(path, manifest):
+    with open(path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+        manifest_file.write('\n')
@@ -0,0 +1,116 @@
+import csv
+from collections import defaultdict
+from datetime import datetime, timezone
+
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+# Projects the LDO unlocked by the vestings the executors assign, without a node.
+# An executor assigns each purchase a vesting with the cliff at the vesting start,
+# starting `vesting_start_delay` and ending `vesting_end_delay` seconds after the
+# purchase block. The amounts use integer math with the same rounding as
+# TokenManager._calculateNonVestedTokens, so they match transferableBalance exactly.
+
+
+def get_vesting_schedules(purchases, vesting_start_delay, vesting_end_delay):
+    # purchases: the result of PurchaseIndex.get_purchases;
+    # returns (receiver, LDO amount, vesting start, vesting end) tuples
+    return [
+        (
+            receiver,
+            purchase['ldo_allocation'],
+            purchase['block_timestamp'] + vesting_start_delay,
+            purchase['block_timestamp'] + vesting_end_delay
+        )
+        for (receiver, purchase) in purchases.items()
+    ]
+
+
+def get_vested_amount(tokens, start, end, time):
+    # the checks go in the order of TokenManager, so start == end never divides by zero
+    if time >= end:
+        return tokens
+    if time < start:
+        return 0
+    return tokens * (time - start) // (end - start)
+
+
+def get_unlocked_amount(schedules, receiver, time):
+    return sum(
+        get_vested_amount(tokens, start, end, time)
+        for (schedule_receiver, tokens, start, end) in schedules
+        if str(schedule_receiver).lower() == str(receiver).lower()
+    )
+
+
+def get_grid_index(grid_start, step, count, time):
+    # the index of the first grid point at or after `time`, clamped to [0, count]
+    return min(max(-((grid_start - time) // step), 0), count)
+
+
+def add_schedule(curve, full_from, tokens, start, end, grid_start, step):
+    # Adds a vesting to a curve of `len(curve)` grid points. The points inside the
+    # vesting ramp are computed one by one, since the floors of the individual
+    # vestings don't add up to a floor of the sum. The fully vested tail only
+    # costs a single add to the `full_from` difference array.
+    count = len(curve)
+    ramp_from = get_grid_index(grid_start, step, count, start)
+    ramp_to = get_grid_index(grid_start, step, count, end)
+    duration = end - start
+    for i in range(ramp_from, ramp_to):
+        curve[i] += tokens * (grid_start + i * step - start) // duration
+    full_from[ramp_to] += tokens
+
+
+def accumulate(curve, full_from):
+    unlocked_in_full = 0
+    for i in range(len(curve)):
+        unlocked_in_full += full_from[i]
+        curve[i] += unlocked_in_full
+    return curve
+
+
+def project_unlocked(schedules, grid_start, step, count):
+    # the total LDO unlocked at each of the `count` points `grid_start + i * step`
+    curve = [0] * count
+    full_from = [0] * (count + 1)
+    for (_, tokens, start, end) in schedules:
+        add_schedule(curve, full_from, tokens, start, end, grid_start, step)
+    return accumulate(curve, full_from)
+
+
+def project_unlocked_by_receiver(schedules, grid_start, step, count):
+    curves = defaultdict(lambda: ([0] * count, [0] * (count + 1)))
+    for (receiver, tokens, start, end) in schedules:
+        (curve, full_from) = curves[str(receiver)]
+        add_schedule(curve, full_from, tokens, start, end, grid_start, step)
+    return { receiver: accumulate(curve, full_from) for (receiver, (curve, full_from)) in curves.items() }
+
+
+def get_daily_grid(schedules):
+    # from the UTC midnight preceding the first vesting start to the first midnight
+    # at which all vestings have ended; returns (grid start, points count)
+    grid_start = min(start for (_, _, start, _) in schedules) // SECONDS_PER_DAY * SECONDS_PER_DAY
+    last_end = max(end for (_, _, _, end) in schedules)
+    return (grid_start, -((grid_start - last_end) // SECONDS_PER_DAY) + 1)
+
+
+def get_daily_unlocks(schedules, grid_start=None, days_count=None):
+    # (day start, total unlocked by the day start, unlocked during the previous day)
+    if grid_start is None or days_count is None:
+        (grid_start, days_count) = get_daily_grid(schedules)
+    unlocked = project_unlocked(schedules, grid_start, SECONDS_PER_DAY, days_count)
+    return [
+        (grid_start + i * SECONDS_PER_DAY, total, total - (unlocked[i - 1] if i > 0 else 0))
+        for (i, total) in enumerate(unlocked)
+    ]
+
+
+def write_daily_unlocks_csv(path, daily_unlocks):
+    with open(path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['date', 'timestamp', 'unlocked_total', 'unlocked_on_day'])
+        for (timestamp, total, unlocked_on_day) in daily_unlocks:
+            date = datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+            writer.writerow([date, timestamp, total, unlocked_on_day])
@@ -0,0 +1,174 @@
+from collections import namedtuple
+
+import brownie
+from brownie import accounts, rpc, web3
+
+from utils.batch_reads import RpcError, batch_request
+from utils.mainnet_fork import nested_chain_snapshot
+from utils.evm_script import EMPTY_CALLSCRIPT, decode_call_script, to_bytes
+from utils.interfaces import find_function_abi, decode_function_args
+
+
+DecodedAction = namedtuple('DecodedAction', [
+    'target',
+    'interface_name',
+    'function_name',
+    'selector',
+    'args',
+    'calldata',
+    # call scripts found among the bytes args, decoded as lists of actions
+    'nested'
+])
+
+# `chained` is false when the action was run against the current state, without
+# the effects of the previous actions of the script
+ActionResult = namedtuple('ActionResult', ['action', 'success', 'gas_used', 'error', 'chained'])
+
+ZERO_STORAGE_VALUE = '0x' + '00' * 32
+
+
+def decode_evm_script(script, extra_abis=None):
+    return [ decode_action(to, calldata, extra_abis) for (to, calldata) in decode_call_script(script) ]
+
+
+def decode_action(target, calldata, extra_abis=None):
+    data = to_bytes(calldata)
+    selector = data[:4]
+    (interface_name, fn_abi) = find_function_abi(selector, target, extra_abis)
+
+    if fn_abi is None:
+        return DecodedAction(target, None, None, '0x' + selector.hex(), None, calldata, [])
+
+    args = decode_function_args(fn_abi, data[4:])
+    nested = []
+
+    for (name, arg_type, value) in args:
+        if arg_type == 'bytes' and is_call_script(value):
+            nested.append((name, decode_evm_script(value, extra_abis)))
+
+    return DecodedAction(target, interface_name, fn_abi['name'], '0x' + selector.hex(), args, calldata, nested)
+
+
+def is_call_script(value):
+    if len(value) < 4 or value[:4] != to_bytes(EMPTY_CALLSCRIPT):
+        return False
+    try:
+        decode_call_script(value)
+        return True
+    except ValueError:
+        return False
+
+
+def format_decoded_actions(actions, indent=''):
+    lines = []
+    for (i, action) in enumerate(actions):
+        if action.function_name is None:
+            lines.append(f'{indent}{i + 1}. {action.target}: unknown function {action.selector}')
+            continue
+        lines.append(f'{indent}{i + 1}. {action.interface_name}({action.target}).{action.function_name}')
+        for (name, arg_type, value) in action.args:
+            if any(nested_name == name for (nested_name, _) in action.nested):
+                continue
+            printable_value = '0x' + value.hex() if isinstance(value, bytes) else value
+            lines.append(f'{indent}     {name} ({arg_type}): {printable_value}')
+        for (name, nested_actions) in action.nested:
+            lines.append(f'{indent}     {name} (call script):')
+            lines.extend(format_decoded_actions(nested_actions, indent + '       '))
+    return lines
+
+
+def replay_call_script(script, sender):
+    # executes the script actions one by one from the impersonated sender, keeping their effects
+    sender_acct = accounts.at(sender, force=True)
+    results = []
+
+    for (to, calldata) in decode_call_script(script):
+        action = decode_action(to, calldata)
+        try:
+            tx = sender_acct.transfer(to=to, amount=0, data=calldata, gas_price=0, silent=True)
+            results.append(ActionResult(action, True, tx.gas_used, None, True))
+        except brownie.exceptions.VirtualMachineError as err:
+            results.append(ActionResult(action, False, None, str(err), True))
+            break
+
+    return results
+
+
+def trace_call_script(script, sender, transport=None):
+    # runs the actions one by one with debug_traceCall on the latest block, passing the
+    # state changed by the previous actions as state overrides, so that each action
+    # sees their effects as in the vote execution; nothing is sent to the network
+    state_overrides = {}
+    results = []
+
+    for (to, calldata) in decode_call_script(script):
+        action = decode_action(to, calldata)
+        tx = {'from': sender, 'to': web3.toChecksumAddress(to), 'data': calldata}
+        (call_trace, state_diff) = batch_request([
+            ('debug_traceCall', [tx, 'latest', {'tracer': 'callTracer', 'stateOverrides': state_overrides}]),
+            ('debug_traceCall', [tx, 'latest', {
+                'tracer': 'prestateTracer',
+                'tracerConfig': {'diffMode': True},
+                'stateOverrides': state_overrides
+            }])
+        ], transport)
+
+        if 'error' in call_trace:
+            results.append(ActionResult(action, False, None, call_trace.get('revertReason', call_trace['error']), True))
+            break
+
+        results.append(ActionResult(action, True, int(call_trace['gasUsed'], 16), None, True))
+        merge_state_diff(state_overrides, state_diff)
+
+    return results
+
+
+def merge_state_diff(state_overrides, state_diff):
+    # the prestateTracer diff lists the changed fields only: `pre` holds their values
+    # before the call, `post` their values after it, omitting the ones cleared to zero
+    for address in set(state_diff['pre']) | set(state_diff['post']):
+        pre = state_diff['pre'].get(address, {})
+        post = state_diff['post'].get(address, {})
+        override = state_overrides.setdefault(address, {})
+
+        if 'balance' in pre or 'balance' in post:
+            override['balance'] = post.get('balance', '0x0')
+        if 'nonce' in pre or 'nonce' in post:
+            override['nonce'] = hex(post.get('nonce', 0))
+        if 'code' in pre or 'code' in post:
+            override['code'] = post.get('code', '0x')
+
+        changed_slots = set(pre.get('storage', {})) | set(post.get('storage', {}))
+        if len(changed_slots) != 0:
+            storage = override.setdefault('stateDiff', {})
+            for slot in changed_slots:
+                storage[slot] = post.get('storage', {}).get(slot, ZERO_STORAGE_VALUE)
+
+
+def call_call_script(script, sender):
+    # runs each action with eth_call against the current state; effects of
+    # previous actions are not visible to the following ones
+    results = []
+
+    for (to, calldata) in decode_call_script(script):
+        action = decode_action(to, calldata)
+        tx = {'from': sender, 'to': web3.toChecksumAddress(to), 'data': calldata}
+        try:
+            web3.eth.call(tx)
+            results.append(ActionResult(action, True, web3.eth.estimate_gas(tx), None, False))
+        except ValueError as err:
+            results.append(ActionResult(action, False, None, str(err), False))
+
+    return results
+
+
+def simulate_call_script(script, sender):
+    if not rpc.is_active():
+        # nodes without the debug namespace can only check each action separately
+        try:
+            return trace_call_script(script, sender)
+        except RpcError:
+            return call_call_script(script, sender)
+
+    with nested_chain_snapshot():
+        return replay_call_script(script, sender)